@@ -8,17 +8,23 @@ agentnet-feeds-mcp — MCP сервер для AgentNet фидов.
   get_agentnet_signals(days, urgency)— сигналы для Проекта из agentnet-project
   get_morning_briefing(short)        — готовый брифинг для начала сессии
   get_weekly_digest(feed)            — последний недельный дайджест
+  search_feeds(query, feed, limit)   — полнотекстовый поиск (нужен feedstore.py --init)
 
 Регистрация:
   claude mcp add agentnet-feeds /usr/local/bin/python3 \
       /Users/user/agentnet-pilot/tools/agentnet-feeds-mcp.py
 """
 
-import json
-from datetime import datetime, timedelta
+import sys
+from datetime import datetime
 from pathlib import Path
 from mcp.server.fastmcp import FastMCP
 
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import Idea, Signal
+from feedquery import query
+from feedstore import open_store
+
 REPO         = Path(__file__).parent.parent
 MARKET_FILE      = REPO / "feeds" / "market-intel"    / "signals.jsonl"
 CLAUDE_FILE      = REPO / "feeds" / "claude-ideas"    / "ideas.jsonl"
@@ -29,23 +35,26 @@ INTEL_DIR        = REPO / "feeds" / "market-intel"
 mcp = FastMCP("agentnet-feeds")
 
 
+_FEED_NAMES = {
+    MARKET_FILE: "market-intel", CLAUDE_FILE: "claude-ideas",
+    AGENTNET_FILE: "agentnet-project", PERSONALOS_FILE: "personalos",
+}
+
+
+def _store():
+    """SQLite-хранилище, если включено; синхронизируется на каждый вызов."""
+    return open_store()
+
+
 def _load(path: Path, days: int, limit: int) -> list:
-    if not path.exists():
-        return []
-    cutoff = datetime.now() - timedelta(days=days)
-    records = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
+    record = Idea if path == CLAUDE_FILE else Signal
+    store = _store()
+    if store is not None:
         try:
-            r = json.loads(line)
-            ts = datetime.fromisoformat(r.get("ts", "2000-01-01T00:00:00"))
-            if ts >= cutoff:
-                records.append(r)
-        except Exception:
-            continue
-    return records[-limit:]
+            return store.recent(_FEED_NAMES[path], days=days, limit=limit, record=record)
+        finally:
+            store.close()
+    return query(path, record=record).window(days=days).last(limit).list()
 
 
 @mcp.tool()
@@ -62,10 +71,10 @@ def get_market_signals(days: int = 3, limit: int = 15) -> str:
 
     dir_icon = {"рост": "↑", "новое": "★", "спад": "↓", "зрелость": "→"}
     dir_priority = {"новое": 0, "рост": 1, "зрелость": 2, "спад": 3}
-    relevant = [r for r in records if r.get("relevant_to_oleg")]
+    relevant = query(records).where(lambda r: r.get("relevant_to_oleg")).count()
     all_sorted = sorted(records, key=lambda s: dir_priority.get(s.get("direction", ""), 9))
 
-    lines = [f"## Рыночные сигналы — {len(records)} за {days} дн. ({len(relevant)} релевантных)\n"]
+    lines = [f"## Рыночные сигналы — {len(records)} за {days} дн. ({relevant} релевантных)\n"]
     for r in all_sorted:
         icon  = dir_icon.get(r.get("direction", ""), "·")
         rel   = " ✓" if r.get("relevant_to_oleg") else ""
@@ -118,11 +127,9 @@ def get_agentnet_signals(days: int = 7, urgency: str = "") -> str:
     if not records:
         return "Нет agentnet-project сигналов. Появятся после следующего прогона rss-collector (06:00 UTC)."
 
-    if urgency:
-        records = [r for r in records if r.get("urgency") == urgency]
-
     urgency_order = {"now": 0, "week": 1, "month": 2}
-    records.sort(key=lambda r: urgency_order.get(r.get("urgency", ""), 9))
+    records = sorted(query(records).where(lambda r: not urgency or r.get("urgency") == urgency),
+                     key=lambda r: urgency_order.get(r.get("urgency", ""), 9))
 
     icon_map = {"now": "⚡", "week": "📡", "month": "🔭"}
     lines = [f"## AgentNet Project — {len(records)} сигналов за {days} дн.\n"]
@@ -149,11 +156,9 @@ def get_personalos_signals(days: int = 7, domain: str = "") -> str:
     if not records:
         return "Нет personalos сигналов. Появятся после следующего прогона rss-collector (06:00 UTC)."
 
-    if domain:
-        records = [r for r in records if r.get("domain") == domain]
-
     urgency_order = {"now": 0, "week": 1, "month": 2}
-    records.sort(key=lambda r: urgency_order.get(r.get("urgency", ""), 9))
+    records = sorted(query(records).where(lambda r: not domain or r.get("domain") == domain),
+                     key=lambda r: urgency_order.get(r.get("urgency", ""), 9))
 
     domain_icon = {"longevity": "🧬", "health-tech": "⌚", "quantified-self": "📊", "ai-health": "🤖", "biohacking": "⚡"}
     urgency_icon = {"now": "⚡", "week": "📡", "month": "🔭"}
@@ -187,41 +192,41 @@ def get_morning_briefing(short: bool = True) -> str:
     lines = [f"# Брифинг — {now.strftime('%d %b %Y, %H:%M')}\n"]
 
     # Рынок
-    relevant = [s for s in market if s.get("relevant_to_oleg")]
-    new_things = [s for s in relevant if s.get("direction") == "новое"]
-    rising     = [s for s in relevant if s.get("direction") == "рост"]
     limit = 3 if short else 6
+    relevant = query(market).where(lambda s: s.get("relevant_to_oleg")).list()
+    new_things = query(relevant).where(lambda s: s.get("direction") == "новое").first(2).list()
+    rising     = query(relevant).where(lambda s: s.get("direction") == "рост").first(limit).list()
 
     lines.append(f"## 📡 Рынок — {len(market)} сигналов, {len(relevant)} для тебя\n")
     if new_things:
         lines.append("★ НОВОЕ:")
-        for s in new_things[:2]:
+        for s in new_things:
             lines.append(f"  {s.get('topic','')}: {s.get('signal','')[:90]}")
     if rising:
         lines.append("↑ РАСТЁТ:")
-        for s in rising[:limit]:
+        for s in rising:
             lines.append(f"  {s.get('topic','')}: {s.get('signal','')[:90]}")
 
     # AgentNet Project
     if ag_proj:
-        urgent = [s for s in ag_proj if s.get("urgency") == "now"]
+        urgent = query(ag_proj).where(lambda s: s.get("urgency") == "now").first(2).list()
         lines.append(f"\n## 🏗 AgentNet Project — {len(ag_proj)} сигналов\n")
         if urgent:
             lines.append("⚡ СРОЧНО:")
-            for s in urgent[:2]:
+            for s in urgent:
                 lines.append(f"  {s.get('impact','')[:90]}")
                 lines.append(f"  → {s.get('idea','')[:80]}")
         if not short:
-            weekly = [s for s in ag_proj if s.get("urgency") == "week"]
-            for s in weekly[:3]:
+            weekly = query(ag_proj).where(lambda s: s.get("urgency") == "week").first(3)
+            for s in weekly:
                 lines.append(f"  📡 {s.get('trend','')[:90]}")
 
     # Claude-идеи
     if ideas:
         cat_priority = {"memory": 0, "coordination": 1, "autonomy": 2, "tools": 3, "cost": 4}
-        top = sorted(ideas, key=lambda i: cat_priority.get(i.get("category", ""), 9))
+        top = query(ideas).top_k_by(3, key=lambda i: cat_priority.get(i.get("category", ""), 9))
         lines.append(f"\n## 💡 Клод — {len(ideas)} инсайтов\n")
-        for idea in top[:3]:
+        for idea in top:
             lines.append(f"  **{idea.get('pattern','')}** ({idea.get('category','')})")
             lines.append(f"  {idea.get('insight','')[:100]}")
 
@@ -230,13 +235,50 @@ def get_morning_briefing(short: bool = True) -> str:
         topics = list({s.get("topic", "") for s in relevant if s.get("topic")})[:5]
         lines.append(f"\nContext: {', '.join(topics)}")
     if ag_proj:
-        urgent_ideas = [s.get("idea","") for s in ag_proj if s.get("urgency") == "now" and s.get("idea")][:2]
+        urgent_ideas = (query(ag_proj)
+                        .where(lambda s: s.get("urgency") == "now" and s.get("idea"))
+                        .map(lambda s: s.get("idea", ""))
+                        .first(2)
+                        .list())
         if urgent_ideas:
             lines.append(f"AgentNet urgent: {' | '.join(urgent_ideas)}")
 
     return "\n".join(lines)
 
 
+@mcp.tool()
+def search_feeds(text: str, feed: str = "", limit: int = 10) -> str:
+    """Полнотекстовый поиск по сигналам и идеям всех фидов за всю историю.
+
+    Args:
+        text:  Слова для поиска (ищутся в topic/signal/insight)
+        feed:  'market-intel' | 'claude-ideas' | 'agentnet-project' | 'personalos' | '' (все)
+        limit: Максимум результатов (по умолчанию 10)
+    """
+    store = _store()
+    if store is None:
+        return ("Поиск недоступен: SQLite-хранилище не создано. "
+                "Запусти: python3 tools/feedstore.py --init")
+    try:
+        records = store.search(text, feed=feed or None, limit=limit)
+    finally:
+        store.close()
+    if not records:
+        return f"Ничего не найдено: {text}"
+
+    lines = [f"## Поиск «{text}» — {len(records)}\n"]
+    for r in records:
+        title = r.get("topic") or r.get("pattern") or r.get("impact", "")
+        lines.append(f"**{title}** ({r['_feed']}, {r.get('ts', '')[:10]})")
+        body = r.get("signal") or r.get("insight") or r.get("idea", "")
+        if body:
+            lines.append(f"   {body}")
+        if r.get("url"):
+            lines.append(f"   {r['url']}")
+        lines.append("")
+    return "\n".join(lines)
+
+
 @mcp.tool()
 def get_weekly_digest(feed: str = "agentnet-project") -> str:
     """Последний недельный дайджест из фида.
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+briefinglib.py — разбор брифингов (Obsidian: Брифинги/Брифинг DD.MM.YYYY.md).
+
+Решения walkthrough записываются в брифинг строкой «→ *Решение*: ...»
+внутри блока пункта. daily-inject убирает уже решённые пункты из новых
+брифингов, feedstore хранит их в таблице decisions — разбор общий.
+
+DecidedIndex — решения прошлых брифингов без SQLite-хранилища: по каждому
+брифингу окна хранятся (inode, size, mtime_ns) и разобранные блоки
+(URL, topic, текст решения) в ~/.cache/agentnet/decided-<папка>.pickle.
+Заново разбираются только брифинги, которые изменились с прошлого
+запуска, поэтому окно можно расширить до месяцев: каждый запуск — stat
+на день окна и объединение готовых множеств.
+
+  index = DecidedIndex.load(BRIEFINGS_DIR)
+  urls, topics = index.decided(days=14)    # сегодняшний брифинг не входит
+  index.save()                             # только если что-то разобрано
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import CACHE_DIR
+
+DECISION_MARK = "*Решение*:"
+_BRIEFING_NAME = re.compile(r"^Брифинг (\d\d\.\d\d\.\d{4})\.md$")
+_LINK = re.compile(r"\]\((https?://[^)]+)\)")
+_BOLD = re.compile(r"\*\*([^*]+)\*\*")
+_TREND = re.compile(r"^(?:⚡|📡|🔭)\s*(?:🔴|🟡|⚪)?\s*(?:hot|warm|cold)?\s*(.+)$", re.MULTILINE)
+
+
+def briefing_date_str(day: date) -> str:
+    return day.strftime("%d.%m.%Y")
+
+
+def briefing_path(briefings_dir: Path, day: date) -> Path:
+    return briefings_dir / f"Брифинг {briefing_date_str(day)}.md"
+
+
+def briefing_date(path: Path) -> date | None:
+    """Дата брифинга по имени файла или None, если это не брифинг."""
+    m = _BRIEFING_NAME.match(path.name)
+    if not m:
+        return None
+    try:
+        return datetime.strptime(m.group(1), "%d.%m.%Y").date()
+    except ValueError:
+        return None
+
+
+def parse_decision_blocks(text: str) -> list[dict]:
+    """Блоки брифинга, где есть *Решение*: — {"urls", "topics", "decision"}.
+
+    Разбивает текст на блоки (по пустым строкам), берёт только блоки
+    содержащие *Решение*:. Из них извлекает:
+    - URL из markdown-ссылок [text](url) (как есть, без нормализации)
+    - **bold topic** (Развитие Клода, Новости)
+    - текст после ⚡/📡/🔭 маркеров (Тренды)
+    - decision — текст после *Решение*: (первая такая строка блока)
+    """
+    blocks = []
+    if DECISION_MARK not in text:
+        return blocks
+    for block in re.split(r"\n\n+", text):
+        if DECISION_MARK not in block:
+            continue
+        urls = [m.group(1) for m in _LINK.finditer(block)]
+        topics: set[str] = set()
+        for m in _BOLD.finditer(block):
+            val = m.group(1).strip().lower()
+            if val and val != "решение":
+                topics.add(val)
+        for m in _TREND.finditer(block):
+            val = m.group(1).strip().lower()
+            if len(val) > 15:
+                topics.add(val)
+        decision = block.split(DECISION_MARK, 1)[1].split("\n", 1)[0].strip()
+        blocks.append({"urls": urls, "topics": topics, "decision": decision})
+    return blocks
+
+
+def parse_decisions(text: str) -> tuple[list[str], set[str]]:
+    """URL и topic из блоков брифинга, где есть *Решение*: (см. parse_decision_blocks)."""
+    urls: list[str] = []
+    topics: set[str] = set()
+    for block in parse_decision_blocks(text):
+        urls.extend(block["urls"])
+        topics |= block["topics"]
+    return urls, topics
+
+
+# ---------- Индекс решений ----------
+
+DECIDED_VERSION = 1
+
+
+def _stamp(path: Path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class DecidedIndex:
+    """Решения прошлых брифингов: имя файла → (stamp, день, разобранные блоки)."""
+
+    def __init__(self, briefings_dir: Path, path: Path | None = None):
+        self.briefings_dir = Path(briefings_dir)
+        if path is None:
+            key = hashlib.sha1(str(self.briefings_dir.resolve()).encode()).hexdigest()[:12]
+            path = CACHE_DIR / f"decided-{key}.pickle"
+        self.path = path
+        self.files: dict[str, dict] = {}    # имя брифинга → {stamp, day, blocks, urls, topics}
+        self.dirty = False
+        self.parsed = 0                     # брифингов разобрано этим процессом
+
+    @classmethod
+    def load(cls, briefings_dir: Path, path: Path | None = None) -> "DecidedIndex":
+        index = cls(briefings_dir, path)
+        try:
+            with open(index.path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") == DECIDED_VERSION:
+                index.files = data["files"]
+        except Exception:
+            pass
+        return index
+
+    def refresh(self, days: int, today: date | None = None):
+        """Окно [today - days, today): разбирает новые и изменённые брифинги,
+        забывает удалённые и ушедшие из окна."""
+        if today is None:
+            today = datetime.now().date()
+        window = {}
+        for i in range(1, days + 1):
+            day = today - timedelta(days=i)
+            window[f"Брифинг {briefing_date_str(day)}.md"] = day
+        for name in [n for n in self.files if n not in window]:
+            del self.files[name]
+            self.dirty = True
+        base = os.fspath(self.briefings_dir)
+        for name, day in window.items():
+            path = os.path.join(base, name)
+            stamp = _stamp(path)
+            entry = self.files.get(name)
+            if stamp is None:
+                if entry is not None:
+                    del self.files[name]
+                    self.dirty = True
+                continue
+            if entry is not None and entry["stamp"] == stamp:
+                continue
+            try:
+                with open(path, encoding="utf-8") as f:
+                    blocks = parse_decision_blocks(f.read())
+            except Exception:
+                blocks = []
+            urls, topics = set(), set()
+            for block in blocks:
+                urls.update(block["urls"])
+                topics |= block["topics"]
+            # Блоки (с текстом решения) нужны только decisions() — храним
+            # сериализованными, чтобы загрузка индекса их не разбирала
+            self.files[name] = {"stamp": stamp, "day": day,
+                                "blocks": pickle.dumps(blocks, protocol=pickle.HIGHEST_PROTOCOL),
+                                "urls": frozenset(urls), "topics": frozenset(topics)}
+            self.parsed += 1
+            self.dirty = True
+
+    def decisions(self, days: int, today: date | None = None):
+        """(день, имя брифинга, блок) решений окна, от свежих к старым."""
+        self.refresh(days, today)
+        for name, entry in sorted(self.files.items(), key=lambda kv: kv[1]["day"], reverse=True):
+            for block in pickle.loads(entry["blocks"]):
+                yield entry["day"], name, block
+
+    def decided(self, days: int, today: date | None = None) -> tuple[set[str], set[str]]:
+        """URL (как в брифинге) и topic всех решений окна."""
+        self.refresh(days, today)
+        urls: set[str] = set()
+        topics: set[str] = set()
+        for entry in self.files.values():
+            urls |= entry["urls"]
+            topics |= entry["topics"]
+        return urls, topics
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".tmp{os.getpid()}")
+            with open(tmp, "wb") as f:
+                pickle.dump({"version": DECIDED_VERSION, "files": self.files}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError:
+            pass
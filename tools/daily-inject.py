@@ -3,6 +3,13 @@
 daily-inject.py — инжектирует AI-блок в ежедневную заметку Obsidian.
 
 Запускается каждые 10 минут (LaunchAgent com.daily.inject).
+Секции строятся через кэш (tools/sectionmemo.py): пересчитываются только те,
+у которых изменились входы; в конце прогона — строка [sections] с итогом.
+
+--daemon: не выходить, а следить за фидами, индексом задач, алертами и
+дневными заметками (tools/fswatch.py: inotify, без него — опрос) и
+пересобирать через --debounce секунд после пачки изменений; git pull и
+sync-tasks.sh — раз в --sync-every секунд.
 Структура блока:
   ### 🔴 Алерты    — только status: open из active-alerts.yaml (SSoT)
   ### 📡 Разведка  — рыночные тренды и сигналы
@@ -15,12 +22,16 @@ daily-inject.py — инжектирует AI-блок в ежедневную 
   python3 ~/agentnet-pilot/tools/alert-manager.py --list
 """
 
+import argparse
 import json
 import os
 import re
+import signal
 import subprocess
 import sys
-from datetime import datetime, timedelta
+import time
+import traceback
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
 try:
@@ -56,6 +67,21 @@ ECC_INSIGHTS   = AGENTNET / "feeds" / "ecc-insights" / "latest.json"
 RULES_EVAL     = AGENTNET / "feeds" / "rules-eval.jsonl"
 HARNESS_VIOLATIONS = Path.home() / "logs" / "harness-violations.jsonl"
 
+# Общий читатель фидов с индексом ts → offset (tools/feedlib.py)
+sys.path.insert(0, str(AGENTNET / "tools"))
+from feedlib import CACHE_DIR, Idea, Signal, TriageEntry, cached, load_recent_cached, partition_dir
+from feedquery import query
+from urlindex import invalidate_url_index, normalize_url, url_index
+from briefinglib import DecidedIndex
+from kwmatch import KeywordMatcher
+from themecluster import ClusterState, cluster_groups
+from neardup import NearDup, feed_signatures
+from triagecache import TriageCache
+from feedstore import open_store
+from sectionmemo import SECTIONS_DIR, SectionMemo, records_key
+from fswatch import Watcher
+from taskindex import load_tasks
+
 DOW_RU = {0: "пн", 1: "вт", 2: "ср", 3: "чт", 4: "пт", 5: "сб", 6: "вс"}
 
 
@@ -77,41 +103,40 @@ def _sig_link(s: dict) -> str:
     url = s.get("url", "")
     src = s.get("source", "")
     if url:
-        clean = _normalize_url(url)
+        clean = normalize_url(url)
         return f"[{src}]({clean})"
     return src
 
 
-def load_triage_cache() -> dict:
-    """url → triage dict. При дубликатах оставляем запись с наивысшим urgency."""
-    _urg_rank = {"hot": 0, "warm": 1, "cold": 2}
-    cache = {}
-    if not TRIAGE_CACHE.exists():
-        return cache
-    for line in TRIAGE_CACHE.read_text(encoding="utf-8").splitlines():
-        try:
-            r = json.loads(line)
-            url = r["url"]
-            if url in cache:
-                old_rank = _urg_rank.get(cache[url].get("urgency", ""), 9)
-                new_rank = _urg_rank.get(r.get("urgency", ""), 9)
-                if new_rank < old_rank:
-                    cache[url] = r
-            else:
-                cache[url] = r
-        except Exception:
-            pass
-    return cache
+_STORE = False  # lazy: None — хранилище не включено
+
+
+def _feed_store():
+    """SQLite-хранилище (tools/feedstore.py), если включено (--init), иначе None."""
+    global _STORE
+    if _STORE is False:
+        _STORE = open_store(briefings_dir=BRIEFINGS_DIR)
+    return _STORE
+
+
+def load_feed(path: Path, days: int, limit: int, record=None) -> list:
+    """Окно фида: из SQLite-хранилища, если оно включено, иначе из JSONL."""
+    store = _feed_store()
+    if store is not None:
+        feed = {CLAUDE_FILE: "claude-ideas", MARKET_FILE: "market-intel"}[path]
+        return store.recent(feed, days=days, limit=limit, record=record)
+    return load_recent_cached(path, days=days, limit=limit, record=record)
 
 
 URGENCY_ICON = {"hot": "🔴", "warm": "🟡", "cold": "⚪"}
-_TRIAGE = None  # lazy-loaded singleton
+_TRIAGE = None  # lazy: индекс triage-cache (tools/triagecache.py)
 
 
-def get_triage(url: str) -> dict | None:
+def get_triage(url: str) -> TriageEntry | None:
+    """Действующая (последняя) triage-запись по URL — точечный поиск по индексу."""
     global _TRIAGE
     if _TRIAGE is None:
-        _TRIAGE = load_triage_cache()
+        _TRIAGE = TriageCache(TRIAGE_CACHE, record=TriageEntry)
     return _TRIAGE.get(url)
 
 
@@ -134,45 +159,51 @@ def today_note_path() -> Path:
     return DAYS_DIR / name
 
 
-def load_recent(path: Path, days: int = 7, limit: int = 20) -> list:
-    if not path.exists():
-        return []
-    cutoff = datetime.now() - timedelta(days=days)
-    records = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
+MACHINE_LOG_DIRS = {"linux": "Linux", "mac": "Mac", "laptop": "Laptop"}
+_SESSION_LOG = re.compile(r"(\d{4}-\d{2}-\d{2})\.md$")
+_ACTIVITY = None  # (stamp каталогов, {машина: дата}) — пересчёт, только если каталоги менялись
+
+
+def _last_session_log(log_dir: Path):
+    """Дата самого свежего лога сессии YYYY-MM-DD.md в каталоге или None."""
+    try:
+        with os.scandir(log_dir) as it:
+            names = [m.group(1) for m in map(_SESSION_LOG.match, (e.name for e in it)) if m]
+    except OSError:
+        return None
+    # ISO-даты сортируются как строки: первая разбираемая с конца — максимум
+    for name in sorted(names, reverse=True):
         try:
-            r = json.loads(line)
-            ts = datetime.fromisoformat(r.get("ts", "2000-01-01T00:00:00"))
-            if ts >= cutoff:
-                records.append(r)
-        except Exception:
+            return date.fromisoformat(name)
+        except ValueError:
             continue
-    return records[-limit:]
+    return None
+
+
+def machine_activity() -> dict:
+    """{машина: дата последнего лога сессии или None} для Linux/Mac/Laptop.
+
+    Один проход по каждому каталогу логов; пока mtime каталогов не менялся
+    (новый лог — новый файл — меняет mtime каталога), берётся готовая карта.
+    """
+    global _ACTIVITY
+    dirs = {m: VAULT / "AI" / "Claude Code" / d for m, d in MACHINE_LOG_DIRS.items()}
+    stamp = []
+    for d in dirs.values():
+        try:
+            st = os.stat(d)
+            stamp.append((st.st_ino, st.st_mtime_ns))
+        except OSError:
+            stamp.append(None)
+    stamp = tuple(stamp)
+    if _ACTIVITY is None or _ACTIVITY[0] != stamp:
+        _ACTIVITY = (stamp, {m: _last_session_log(d) for m, d in dirs.items()})
+    return _ACTIVITY[1]
 
 
 def get_machine_last_active(machine: str):
     """Возвращает дату последнего лог-файла сессии для машины или None."""
-    machine_dir_map = {"linux": "Linux", "mac": "Mac", "laptop": "Laptop"}
-    dir_name = machine_dir_map.get(machine.lower())
-    if not dir_name:
-        return None
-    machine_log_dir = VAULT / "AI" / "Claude Code" / dir_name
-    if not machine_log_dir.exists():
-        return None
-    import re as _re
-    from datetime import date as _date
-    dates = []
-    for f in machine_log_dir.iterdir():
-        m = _re.match(r"(\d{4}-\d{2}-\d{2})\.md$", f.name)
-        if m:
-            try:
-                dates.append(_date.fromisoformat(m.group(1)))
-            except ValueError:
-                pass
-    return max(dates) if dates else None
+    return machine_activity().get(machine.lower())
 
 
 # Агент → русский алиас для отображения в брифинге
@@ -211,11 +242,14 @@ def _agent_display(assignee: str) -> str:
     return f"`{display}` "
 
 
-def _escalation_tag(assignee: str, overdue_days: int, today) -> str:
-    """Метка для просроченных задач: 💤 спит (catch-up) или 🆘 эскалация (активна но не делает)."""
+def _escalation_tag(assignee: str, overdue_days: int, today, activity: dict | None = None) -> str:
+    """Метка для просроченных задач: 💤 спит (catch-up) или 🆘 эскалация (активна но не делает).
+    activity — карта machine_activity(), посчитанная один раз на секцию."""
     if assignee in ("all", "") or overdue_days < 2:
         return ""
-    last_active = get_machine_last_active(assignee)
+    if activity is None:
+        activity = machine_activity()
+    last_active = activity.get(assignee.lower())
     if last_active is None:
         return ""
     silence_days = (today - last_active).days
@@ -238,48 +272,17 @@ def build_tasks_section() -> str | None:
 
     overdue, today_tasks, upcoming = [], [], []
 
-    in_active = False
-    for line in TASKS_INDEX.read_text(encoding="utf-8").splitlines():
-        if line.startswith("## Активные"):
-            in_active = True
-            continue
-        if line.startswith("## Выполненные"):
-            break  # дальше не читаем
-        if not in_active or not line.startswith("- "):
-            continue
-
-        # Формат: - YYYY-MM-DD | assignee | recurrence | [[title]]
-        parts = line[2:].split("|")
-        if len(parts) < 4:
-            continue
-        raw_date   = parts[0].strip()
-        assignee   = parts[1].strip()
-        recurrence = parts[2].strip()
-        raw_title  = parts[3].strip()
-        # Сохраняем wikilink для кликабельности в Obsidian (R-021)
-        # Формат: [[T-NNN]] Название (номер кликабелен, название читаемо)
-        if raw_title.startswith("[[") and raw_title.endswith("]]"):
-            inner = raw_title[2:-2]
-        else:
-            inner = raw_title
-        import re as _re
-        t_match = _re.match(r"(T-\d{3})\s+(.*)", inner)
-        if t_match:
-            title = f"[[{t_match.group(1)}]] {t_match.group(2)}"
-        else:
-            title = f"[[{inner}]]"
-
-        try:
-            import datetime as dt
-            deadline = dt.date.fromisoformat(raw_date)
-        except ValueError:
+    # Разобранный индекс задач (tools/taskindex.py): один разбор на версию файла
+    for task in load_tasks(TASKS_INDEX):
+        if task.deadline is None:
             continue
-
+        assignee = task.assignee
+        recurrence = task.recurrence
         who = _agent_display(assignee)
         rec_tag = f" `{recurrence}`" if recurrence not in ("once", "none", "") else ""
-        item = (title, who, rec_tag, raw_date, assignee)
+        item = (task.link, who, rec_tag, task.deadline, assignee)
 
-        delta = (today - deadline).days
+        delta = (today - task.deadline).days
         if delta > 0:
             overdue.append((delta, item))
         elif delta == 0:
@@ -301,24 +304,17 @@ def build_tasks_section() -> str | None:
         word = "задач"
     lines = [f"### 📅 Задачи — {total} {word}"]
 
-    def _fmt_date(iso_date: str) -> str:
-        """2026-03-26 → 26.03.26"""
-        try:
-            from datetime import date
-            d = date.fromisoformat(iso_date)
-            return d.strftime("%d.%m.%y")
-        except Exception:
-            return iso_date
-
-    for days, (title, who, rec_tag, raw_date, assignee) in sorted(overdue, reverse=True):
-        esc = _escalation_tag(assignee, days, today)
-        lines.append(f"- [ ] {who}{title}{rec_tag} = {_fmt_date(raw_date)} ⚠️ просрочено {days}д{esc}")
+    # Дата: 2026-03-26 → 26.03.26
+    activity = machine_activity()
+    for days, (title, who, rec_tag, deadline, assignee) in sorted(overdue, reverse=True):
+        esc = _escalation_tag(assignee, days, today, activity)
+        lines.append(f"- [ ] {who}{title}{rec_tag} = {deadline:%d.%m.%y} ⚠️ просрочено {days}д{esc}")
 
-    for title, who, rec_tag, raw_date, _a in today_tasks:
-        lines.append(f"- [ ] {who}{title}{rec_tag} = {_fmt_date(raw_date)} *(сегодня)*")
+    for title, who, rec_tag, deadline, _a in today_tasks:
+        lines.append(f"- [ ] {who}{title}{rec_tag} = {deadline:%d.%m.%y} *(сегодня)*")
 
-    for days, (title, who, rec_tag, raw_date, _a) in sorted(upcoming):
-        lines.append(f"- [ ] {who}{title}{rec_tag} = {_fmt_date(raw_date)}")
+    for days, (title, who, rec_tag, deadline, _a) in sorted(upcoming):
+        lines.append(f"- [ ] {who}{title}{rec_tag} = {deadline:%d.%m.%y}")
 
     return "\n".join(lines)
 
@@ -332,29 +328,13 @@ def build_action_section() -> str | None:
     items = []
 
     # Просроченные задачи
-    if TASKS_INDEX.exists():
-        in_active = False
-        for line in TASKS_INDEX.read_text(encoding="utf-8").splitlines():
-            if line.startswith("## Активные"):
-                in_active = True; continue
-            if line.startswith("## Выполненные"):
-                break
-            if not in_active or not line.startswith("- "):
-                continue
-            parts = line[2:].split("|")
-            if len(parts) < 4: continue
-            try:
-                deadline = dt.date.fromisoformat(parts[0].strip())
-            except ValueError:
-                continue
-            delta = (today - deadline).days
-            if delta > 0:
-                title = parts[3].strip().lstrip("[[").rstrip("]]").rstrip()
-                items.append(f"- 🔴 **{title}** — просрочено {delta}д")
+    for task in load_tasks(TASKS_INDEX):
+        if task.deadline is not None and today > task.deadline:
+            items.append(f"- 🔴 **{task.plain}** — просрочено {(today - task.deadline).days}д")
 
     # P1 алерты
     if ALERTS_FILE.exists() and _YAML_OK:
-        data = _yaml.safe_load(ALERTS_FILE.read_text(encoding="utf-8")) or {}
+        data = _load_alerts()
         for a in data.get("alerts", []):
             if a.get("status") == "open" and a.get("severity") == "P1":
                 items.append(f"- 🔴 **[ALERT]** {a.get('title','?')} (`{a.get('id','?')}`)")
@@ -376,12 +356,18 @@ def build_action_section() -> str | None:
     lines = ["### 🔴 Требует действия сегодня"] + items
     return "\n".join(lines)
 
+def _load_alerts() -> dict:
+    """active-alerts.yaml, разобранный один раз на версию файла."""
+    return cached(ALERTS_FILE, lambda p: _yaml.safe_load(p.read_text(encoding="utf-8")) or {},
+                  "alerts")
+
+
 def build_alerts_section() -> str | None:
     """Читает open-алерты из SSoT. Возвращает markdown или None если нет открытых."""
     if not ALERTS_FILE.exists() or not _YAML_OK:
         return None
 
-    data = _yaml.safe_load(ALERTS_FILE.read_text(encoding="utf-8")) or {}
+    data = _load_alerts()
     open_alerts = [a for a in data.get("alerts", []) if a.get("status") == "open"]
 
     if not open_alerts:
@@ -407,55 +393,55 @@ def build_alerts_section() -> str | None:
     return "\n".join(lines)
 
 
-def _cluster_by_theme(items: list, key_field: str = "topic") -> list:
-    """Кластеризует сигналы по близости тем.
+_CLUSTERS = None  # lazy: кластеры сигналов между запусками (tools/themecluster.py)
+CLUSTER_DAYS = 3
+# Производное состояние, своё на каждой машине — в кэше, не в feeds/ под git
+CLUSTERS_FILE = CACHE_DIR / "clusters" / "market-intel.jsonl"
 
-    Группирует записи по URL-домену + keyword overlap (≥2 общих слов из topic/signal).
-    Возвращает список кластеров: [{"lead": item, "related": [items], "cluster_label": str}].
-    Одиночные записи → кластер из 1.
-    """
-    if not items:
-        return []
 
-    def _words(item):
-        text = f"{item.get(key_field, '')} {item.get('signal', '')} {item.get('insight', '')}"
-        return set(re.findall(r'[a-zA-Zа-яА-ЯёЁ]{3,}', text.lower()))
+def signal_clusters(signals: list) -> ClusterState:
+    """Кластеры market-сигналов из CLUSTERS_FILE, дополненные новыми сигналами окна.
 
-    def _domain(item):
-        url = item.get("url", "")
-        m = re.search(r'https?://(?:www\.)?([^/]+)', url)
-        return m.group(1) if m else ""
+    Распределяются только сигналы, которых ещё нет в состоянии; члены старше
+    CLUSTER_DAYS выбрасываются. Файл переписывается, только если что-то изменилось.
+    """
+    global _CLUSTERS
+    if _CLUSTERS is None:
+        _CLUSTERS = ClusterState.load(CLUSTERS_FILE)
+    if _CLUSTERS.update(signals, cutoff=datetime.now() - timedelta(days=CLUSTER_DAYS)):
+        try:
+            _CLUSTERS.save()
+        except OSError as e:
+            print(f"⚠️ состояние кластеров не сохранено: {e}")
+    return _CLUSTERS
 
-    assigned = [False] * len(items)
-    clusters = []
 
-    for i, item in enumerate(items):
-        if assigned[i]:
-            continue
-        assigned[i] = True
-        group = [item]
-        words_i = _words(item)
-        domain_i = _domain(item)
+def _cluster_by_theme(items: list, key_field: str = "topic",
+                      state: ClusterState | None = None) -> list:
+    """Кластеризует сигналы по близости тем.
 
-        for j in range(i + 1, len(items)):
-            if assigned[j]:
-                continue
-            words_j = _words(items[j])
-            domain_j = _domain(items[j])
-            # Кластер: совпадение домена + ≥1 слово ИЛИ ≥3 общих слова
-            common = len(words_i & words_j)
-            same_domain = domain_i and domain_i == domain_j
-            if (same_domain and common >= 1) or common >= 3:
-                assigned[j] = True
-                group.append(items[j])
+    Группирует записи по URL-домену + keyword overlap (≥3 общих слов из topic/signal/insight).
+    С state — по сохранённым кластерам (id стабилен между запусками), без — заново.
+    Возвращает список кластеров: [{"lead": item, "related": [items], "cluster_label": str,
+    "cluster_id": str | None}]. Одиночные записи → кластер из 1.
+    """
+    if not items:
+        return []
 
+    # Инвертированный индекс слов: каждая запись токенизируется один раз,
+    # сравниваются только пары с общими словами (см. themecluster.py)
+    groups = state.groups(items) if state is not None else cluster_groups(items, key_field)
+    clusters = []
+    for group in groups:
+        group = [items[no] for no in group]
         # Lead — с наивысшим urgency или первый
         _urg_rank = {"now": 0, "hot": 0, "week": 1, "warm": 1, "month": 2, "cold": 2}
         group.sort(key=lambda x: _urg_rank.get(x.get("urgency", ""), 9))
         lead = group[0]
         related = group[1:]
         label = lead.get(key_field, lead.get("pattern", ""))
-        clusters.append({"lead": lead, "related": related, "cluster_label": label})
+        cid = state.cluster_of(lead.get("url", "")) if state is not None else None
+        clusters.append({"lead": lead, "related": related, "cluster_label": label, "cluster_id": cid})
 
     return clusters
 
@@ -472,6 +458,7 @@ _HOLLOW_PHRASES = [
     "может повысить", "может снизить", "повышение производительности",
     "улучшение пользовательского опыта", "интеграция современных",
 ]
+_HOLLOW_MATCHER = KeywordMatcher({"hollow": _HOLLOW_PHRASES})
 
 
 def _is_hollow_signal(s: dict) -> bool:
@@ -479,22 +466,23 @@ def _is_hollow_signal(s: dict) -> bool:
     Проверяет ТОЛЬКО текст signal на hollow phrases.
     Не отсекает сигналы с конкретными action."""
     sig = (s.get("signal", "") or "").lower()
-    return any(p in sig for p in _HOLLOW_PHRASES)
+    return _HOLLOW_MATCHER.any(sig)
 
     return clusters
 
 
-def _enrich_urgency(signals: list) -> list:
-    """Обогащает сигналы urgency из triage-cache.
+_TRIAGE_TO_URGENCY = {"hot": "now", "warm": "week", "cold": "month"}
+
+
+def _enrich_urgency(s: dict) -> dict:
+    """Обогащает сигнал urgency из triage-cache (на месте).
     Triage пишет hot/warm/cold → маппим в now/week/month для совместимости."""
-    URGENCY_MAP = {"hot": "now", "warm": "week", "cold": "month"}
-    for s in signals:
-        if not s.get("urgency"):
-            t = get_triage(s.get("url", ""))
-            if t:
-                raw = t.get("urgency", "")
-                s["urgency"] = URGENCY_MAP.get(raw, raw)
-    return signals
+    if not s.get("urgency"):
+        t = get_triage(s.get("url", ""))
+        if t:
+            raw = t.get("urgency", "")
+            s["urgency"] = _TRIAGE_TO_URGENCY.get(raw, raw)
+    return s
 
 
 def build_recon_section(signals: list, decided: tuple | None = None) -> str:
@@ -503,45 +491,40 @@ def build_recon_section(signals: list, decided: tuple | None = None) -> str:
         return ("### 📡 Разведка\n"
                 "*(нет сигналов — появятся после следующего прогона в 06:00)*")
 
-    # Обогащаем urgency из triage-cache
-    signals = _enrich_urgency(signals)
-
-    # Дедупликация: убираем сигналы с решениями из прошлых брифингов
     if decided is None:
         decided = _load_decided_items()
     decided_urls, decided_topics = decided
-    signals = [s for s in signals if not _signal_is_decided(s, decided_urls, decided_topics)]
-
-    # Только сигналы с urgency (остальные пойдут в Новости)
-    triaged = [s for s in signals if s.get("urgency")]
-
-    # Дедупликация по topic: один сигнал на topic (оставляем с наивысшим urgency)
     _urg_rank = {"now": 0, "week": 1, "month": 2}
-    seen_topics: dict[str, int] = {}  # topic → best urgency rank
-    deduped: list = []
-    for s in sorted(triaged, key=lambda x: _urg_rank.get(x.get("urgency", ""), 9)):
-        topic_key = s.get("topic", "").lower().strip()[:30]
-        if topic_key and topic_key in seen_topics:
-            continue
-        seen_topics[topic_key] = _urg_rank.get(s.get("urgency", ""), 9)
-        deduped.append(s)
-    triaged = deduped
+
+    # Один проход: urgency из triage-cache (обогащаются все сигналы — их же
+    # потом видит build_ideas_section) → без решённых в прошлых брифингах →
+    # только с urgency (остальные пойдут в Новости)
+    candidates = (query(signals)
+                  .map(_enrich_urgency)
+                  .where(lambda s: not _signal_is_decided(s, decided_urls, decided_topics))
+                  .where(lambda s: s.get("urgency")))
+
+    # Дедупликация по topic: один сигнал на topic (оставляем с наивысшим urgency);
+    # кроме совпадения префикса — почти-дубликаты по MinHash (neardup.py)
+    topics = NearDup(known=feed_signatures(MARKET_FILE, "topic"))
+    triaged = (query(sorted(candidates, key=lambda x: _urg_rank.get(x.get("urgency", ""), 9)))
+               .dedupe_by(lambda s: s.get("topic", "").lower().strip()[:30])
+               .where(lambda s: topics.admit(s.get("topic", "")))
+               .list())
     if not triaged:
         return ("### 📡 Разведка\n"
                 "*(все сигналы — в секции Новости, triage не добавил urgency)*")
 
     # Quality gate: cold без action или с hollow текстом не попадает в Разведку
     # Hot/warm проходят всегда
-    triaged = [s for s in triaged
-               if s.get("urgency") != "month" or (s.get("action") and not _is_hollow_signal(s))]
-
-    urgent  = [s for s in triaged if s.get("urgency") == "now"]
-    weekly  = [s for s in triaged if s.get("urgency") == "week"]
-    monthly = [s for s in triaged if s.get("urgency") == "month"]
+    triaged = (query(triaged)
+               .where(lambda s: s.get("urgency") != "month"
+                      or (s.get("action") and not _is_hollow_signal(s)))
+               .list())
 
-    # Кластеризация по теме
-    all_ordered = urgent + weekly + monthly
-    clusters = _cluster_by_theme(all_ordered, key_field="topic") or []
+    # Кластеризация по теме; triaged уже упорядочен now → week → month
+    all_ordered = query(triaged).where(lambda s: s.get("urgency") in _urg_rank).list()
+    clusters = _cluster_by_theme(all_ordered, key_field="topic", state=signal_clusters(signals)) or []
 
     # Лимит: до 10 кластеров
     clusters = clusters[:10]
@@ -566,7 +549,8 @@ def build_recon_section(signals: list, decided: tuple | None = None) -> str:
         topic = lead.get("topic", lead.get("impact", lead.get("trend", "")))
         signal_text = lead.get("signal", lead.get("idea", ""))
         count_suffix = f" (+{len(related)})" if related else ""
-        lines.append(f"{icon} **{num}. {topic}**{count_suffix} *{dt_pfx}{link}*")
+        cid = f" `{cl['cluster_id']}`" if cl.get("cluster_id") else ""
+        lines.append(f"{icon} **{num}. {topic}**{count_suffix} *{dt_pfx}{link}*{cid}")
         if signal_text:
             lines.append(f"→ *Что*: {signal_text}")
         also_parts = []
@@ -596,11 +580,9 @@ def build_claude_section(ideas: list, decided: tuple | None = None) -> str:
     if not ideas:
         return "### 💡 Клод\n*(нет инсайтов за неделю)*"
 
-    # Дедупликация: убираем идеи с решениями из прошлых брифингов
     if decided is None:
         decided = _load_decided_items()
     decided_urls, decided_topics = decided
-    ideas = [i for i in ideas if not _signal_is_decided(i, decided_urls, decided_topics)]
 
     MAX = 7
     # Приоритет категорий: дефицитные важные — выше; cost последний (избыток)
@@ -611,26 +593,41 @@ def build_claude_section(ideas: list, decided: tuple | None = None) -> str:
 
     # Фильтр нерелевантных (нет UI/фронтенда → design-system не нужна, и т.п.)
     _IRRELEVANT_PATTERNS = {"design-system", "ui kit", "ui-kit", "фронтенд компонент"}
-    ideas = [i for i in ideas
-             if not any(p in i.get("pattern", "").lower() for p in _IRRELEVANT_PATTERNS)]
-
-    # Дедупликация: один инсайт на паттерн, плюс семантический dedup по keyword overlap
-    seen_patterns: set[str] = set()
-    deduped: list = []
-    for idea in reversed(ideas):  # reversed → свежие первыми при dedup
-        key = idea.get("pattern", "").lower().strip()[:40]
-        if key and key not in seen_patterns:
-            # Семантический dedup: проверяем overlap слов с уже принятыми
-            words = set(re.findall(r'[a-zA-Z]{4,}', key))
-            is_dup = False
-            for existing_key in seen_patterns:
-                existing_words = set(re.findall(r'[a-zA-Z]{4,}', existing_key))
-                if len(words & existing_words) >= 2:
-                    is_dup = True
-                    break
-            if not is_dup:
-                seen_patterns.add(key)
-                deduped.append(idea)
+    # Убираем идеи с решениями из прошлых брифингов и нерелевантные
+    ideas = (query(ideas)
+             .where(lambda i: not _signal_is_decided(i, decided_urls, decided_topics))
+             .where(lambda i: not any(p in i.get("pattern", "").lower() for p in _IRRELEVANT_PATTERNS))
+             .list())
+
+    # Дедупликация: один инсайт на паттерн
+    def _pattern_key(idea) -> str:
+        return idea.get("pattern", "").lower().strip()[:40]
+
+    # Семантический dedup: ≥2 общих слова с уже принятым паттерном.
+    # Общие слова считаются по postings слово → принятые паттерны (как в
+    # themecluster), а не перебором всех принятых
+    postings: dict[str, list[int]] = {}
+    accepted = 0
+
+    def _novel(idea) -> bool:
+        nonlocal accepted
+        words = set(re.findall(r'[a-zA-Z]{4,}', _pattern_key(idea)))
+        common: dict[int, int] = {}
+        for w in words:
+            for no in postings.get(w, ()):
+                common[no] = common.get(no, 0) + 1
+                if common[no] >= 2:
+                    return False
+        for w in words:
+            postings.setdefault(w, []).append(accepted)
+        accepted += 1
+        return True
+
+    deduped = (query(reversed(ideas))  # reversed → свежие первыми при dedup
+               .where(_pattern_key)
+               .dedupe_by(_pattern_key)
+               .where(_novel)
+               .list())
     deduped.reverse()  # вернуть хронологический порядок
 
     # Приоритет: ideas с action/why выше (обогащённые полезнее при walkthrough)
@@ -641,15 +638,10 @@ def build_claude_section(ideas: list, decided: tuple | None = None) -> str:
 
     # Отбираем MAX инсайтов с cap 2 на категорию для разнообразия
     MAX_PER_CAT = 2
-    cat_counts: dict[str, int] = {}
-    selected: list = []
-    for idea in sorted_ideas:
-        cat = idea.get("category", "other")
-        if cat_counts.get(cat, 0) < MAX_PER_CAT:
-            selected.append(idea)
-            cat_counts[cat] = cat_counts.get(cat, 0) + 1
-        if len(selected) >= MAX:
-            break
+    selected = (query(sorted_ideas)
+                .cap_by(lambda i: i.get("category", "other"), MAX_PER_CAT)
+                .first(MAX)
+                .list())
 
     shown_count = len(selected)
     lines = [f"### 🧠 Развитие Клода — {shown_count}/{len(ideas)}", ""]
@@ -677,15 +669,15 @@ def build_claude_section(ideas: list, decided: tuple | None = None) -> str:
 
 def build_ideas_section(signals: list, decided: tuple | None = None) -> str:
     dir_icon = {"рост": "↑", "новое": "★", "спад": "↓", "зрелость": "→"}
-    relevant = [s for s in signals if s.get("relevant_to_oleg")]
-    # T-088: убираем сигналы, уже отслеживаемые через SURVEILLANCE-CONFIG
-    relevant = [s for s in relevant
-                if not (get_triage(s.get("url", "")) or {}).get("already_tracked")]
-    # Убираем только hot/warm сигналы — они в секции Разведка. Cold остаются в Новостях.
     _recon_urgencies = {"hot", "warm", "now", "week"}
-    relevant = [s for s in relevant
-                if (s.get("urgency", "") not in _recon_urgencies
-                    and (get_triage(s.get("url", "")) or {}).get("urgency", "") not in _recon_urgencies)]
+    relevant = (query(signals)
+                .where(lambda s: s.get("relevant_to_oleg"))
+                # T-088: убираем сигналы, уже отслеживаемые через SURVEILLANCE-CONFIG
+                .where(lambda s: not (get_triage(s.get("url", "")) or {}).get("already_tracked"))
+                # Убираем только hot/warm сигналы — они в секции Разведка. Cold остаются в Новостях.
+                .where(lambda s: s.get("urgency", "") not in _recon_urgencies
+                       and (get_triage(s.get("url", "")) or {}).get("urgency", "") not in _recon_urgencies)
+                .list())
     if not relevant:
         return "### 📬 Новости\n*(нет новостей за 3 дня)*"
 
@@ -693,29 +685,30 @@ def build_ideas_section(signals: list, decided: tuple | None = None) -> str:
     if decided is None:
         decided = _load_decided_items()
     decided_urls, decided_topics = decided
-    fresh = [s for s in relevant if not _signal_is_decided(s, decided_urls, decided_topics)]
-
-    # Фильтр generic/hollow сигналов (reuse _is_hollow из build_recon_section)
-    fresh = [s for s in fresh if not _is_hollow_signal(s)]
+    # Только с action ИЛИ actionability >= 4 попадают в топ (tier 0);
+    # если таких мало — добираем из actionability >= 3 (tier 1)
+    def _tier(s) -> int:
+        act = int(s.get("actionability", 1))
+        return 0 if s.get("action") or act >= 4 else 1 if act >= 3 else 2
 
     # Сортируем: has_action первым, потом actionability, потом direction
     dir_priority = {"новое": 0, "рост": 1, "зрелость": 2, "спад": 3}
-    sorted_rel = sorted(fresh, key=lambda s: (
-        0 if s.get("action") else 1,
-        -int(s.get("actionability", 1)),
-        dir_priority.get(s.get("direction", ""), 9),
-    ))
-    # Только с action ИЛИ actionability >= 4 попадают в топ
-    high_value = [s for s in sorted_rel
-                  if s.get("action") or int(s.get("actionability", 1)) >= 4]
-    # Если мало — добираем из actionability >= 3
-    if len(high_value) < 3:
-        rest = [s for s in sorted_rel
-                if s not in high_value and int(s.get("actionability", 1)) >= 3]
-        high_value = (high_value + rest)
-    shown_items = high_value[:5]
+    shown_items = (query(relevant)
+                   .where(lambda s: not _signal_is_decided(s, decided_urls, decided_topics))
+                   # Фильтр generic/hollow сигналов (reuse _is_hollow из build_recon_section)
+                   .where(lambda s: not _is_hollow_signal(s))
+                   .where(lambda s: _tier(s) < 2)
+                   .top_k_by(5, key=lambda s: (
+                       _tier(s),
+                       0 if s.get("action") else 1,
+                       -int(s.get("actionability", 1)),
+                       dir_priority.get(s.get("direction", ""), 9),
+                   ))
+                   .list())
+    if sum(1 for s in shown_items if _tier(s) == 0) >= 3:
+        shown_items = [s for s in shown_items if _tier(s) == 0]
     # Кластеризация
-    clusters = _cluster_by_theme(shown_items, key_field="topic") or []
+    clusters = _cluster_by_theme(shown_items, key_field="topic", state=signal_clusters(signals)) or []
     clusters = clusters[:5]
     lines = [f"### 📬 Новости — {len(clusters)}/{len(relevant)}", ""]
     for num, cl in enumerate(clusters, 1):
@@ -730,9 +723,10 @@ def build_ideas_section(signals: list, decided: tuple | None = None) -> str:
         dt_pfx = f"({dt}) " if dt else ""
         link   = _sig_link(s)
         count_suffix = f" (+{len(related)})" if related else ""
+        cid = f" `{cl['cluster_id']}`" if cl.get("cluster_id") else ""
         if num > 1:
             lines.append("")
-        lines.append(f"{icon} {pfx}**{num}. {topic}**{count_suffix} *{dt_pfx}{link}*")
+        lines.append(f"{icon} {pfx}**{num}. {topic}**{count_suffix} *{dt_pfx}{link}*{cid}")
         lines.append(f"→ *Что*: {signal}")
         also_parts = []
         for r in related[:2]:
@@ -831,66 +825,35 @@ def briefing_date_str(today=None) -> str:
 BRIEFINGS_DIR = VAULT / "Брифинги"
 
 
-def _load_decided_items(days: int = 14) -> tuple[set[str], set[str]]:
-    """Собирает URL и topic из прошлых брифингов, где есть *Решение*:.
+DECIDED_DAYS = 14   # окно решений прошлых брифингов (--decided-days)
+_DECIDED = None     # lazy: индекс решений (briefinglib.DecidedIndex)
 
-    Разбивает текст на блоки (по пустым строкам), берёт только блоки
-    содержащие *Решение*:. Из них извлекает:
-    - URL из markdown-ссылок [text](url)
-    - **bold topic** (Развитие Клода, Новости)
-    - текст после ⚡/📡/🔭 маркеров (Тренды)
-    """
-    decided_urls: set[str] = set()
-    decided_topics: set[str] = set()
-    today = datetime.now().date()
-    for i in range(1, days + 1):
-        d = today - timedelta(days=i)
-        path = BRIEFINGS_DIR / f"Брифинг {briefing_date_str(d)}.md"
-        if not path.exists():
-            continue
-        try:
-            text = path.read_text(encoding="utf-8")
-        except Exception:
-            continue
-        if "*Решение*:" not in text:
-            continue
-        # Разбиваем на блоки (пункты разделены пустыми строками)
-        blocks = re.split(r"\n\n+", text)
-        for block in blocks:
-            if "*Решение*:" not in block:
-                continue
-            # URL из markdown-ссылок (нормализация: убираем utm_* параметры)
-            for m in re.finditer(r"\]\((https?://[^)]+)\)", block):
-                decided_urls.add(_normalize_url(m.group(1)))
-            # **bold topic** (Развитие Клода, Новости)
-            for m in re.finditer(r"\*\*([^*]+)\*\*", block):
-                val = m.group(1).strip().lower()
-                if val and val != "решение":
-                    decided_topics.add(val)
-            # Тренды: текст после emoji-маркеров ⚡/📡/🔭
-            for m in re.finditer(
-                r"^(?:⚡|📡|🔭)\s*(?:🔴|🟡|⚪)?\s*(?:hot|warm|cold)?\s*(.+)$",
-                block, re.MULTILINE,
-            ):
-                val = m.group(1).strip().lower()
-                if len(val) > 15:
-                    decided_topics.add(val)
-    return decided_urls, decided_topics
-
-
-def _normalize_url(url: str) -> str:
-    """Убирает utm_* параметры из URL для дедупликации."""
-    from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-    parsed = urlparse(url)
-    params = {k: v for k, v in parse_qs(parsed.query).items() if not k.startswith("utm_")}
-    clean_query = urlencode(params, doseq=True)
-    return urlunparse(parsed._replace(query=clean_query))
-
-
-def _signal_is_decided(signal: dict, decided_urls: set[str], decided_topics: set[str]) -> bool:
-    """Проверяет, был ли сигнал уже рассмотрен в предыдущем брифинге."""
+
+def _load_decided_items(days: int | None = None) -> tuple[set[int], set[str]]:
+    """Собирает URL и topic из прошлых брифингов, где есть *Решение*:
+    (индекс briefinglib.DecidedIndex: разбираются только изменённые брифинги).
+    URL — как id в реестре urlindex."""
+    global _DECIDED
+    if days is None:
+        days = DECIDED_DAYS
+    index = url_index()
+    store = _feed_store()
+    if store is not None:
+        urls, topics = store.decided(days)
+        return {index.intern(u) for u in urls}, topics
+
+    if _DECIDED is None:
+        _DECIDED = DecidedIndex.load(BRIEFINGS_DIR)
+    urls, topics = _DECIDED.decided(days)
+    _DECIDED.save()
+    return {index.intern(u) for u in urls}, topics
+
+
+def _signal_is_decided(signal: dict, decided_urls: set[int], decided_topics: set[str]) -> bool:
+    """Проверяет, был ли сигнал уже рассмотрен в предыдущем брифинге.
+    decided_urls — id URL в реестре (urlindex)."""
     url = signal.get("url", "")
-    if url and _normalize_url(url) in decided_urls:
+    if url and url_index().id_of(url) in decided_urls:
         return True
     for field in ("topic", "pattern", "impact", "trend"):
         val = signal.get(field, "").strip().lower()
@@ -975,49 +938,128 @@ def briefing_note_path(today=None) -> Path:
     return BRIEFINGS_DIR / f"Брифинг {briefing_date_str(today)}.md"
 
 
+# ---------- Мемоизация секций (tools/sectionmemo.py) ----------
+# Секция пересчитывается, только если изменился отпечаток её входов:
+# файлы (inode/size/mtime), дата, окно сигналов, код. Остальное — из кэша.
+SECTIONS_MEMO = SECTIONS_DIR / "daily-inject.json"
+_SECTION_MODULES = ("feedlib", "feedquery", "urlindex", "briefinglib", "kwmatch",
+                    "themecluster", "neardup", "triagecache", "feedstore", "sectionmemo",
+                    "taskindex")
+_MEMO = None  # lazy
+
+
+def section_memo() -> SectionMemo:
+    global _MEMO
+    if _MEMO is None:
+        code = [Path(__file__)] + [Path(sys.modules[m].__file__) for m in _SECTION_MODULES]
+        _MEMO = SectionMemo(SECTIONS_MEMO, code=code)
+    return _MEMO
+
+
+def memo_section(name: str, build, inputs=(), key=()):
+    """build() через кэш секций; дата (а с ней день недели) — всегда часть ключа."""
+    today = datetime.now().date().isoformat()
+    return section_memo().section(name, build, inputs=inputs, key=[today, *key])
+
+
+def _machine_log_dirs() -> list:
+    """Каталоги логов машин: от них зависят метки 💤 в задачах."""
+    return [VAULT / "AI" / "Claude Code" / d for d in MACHINE_LOG_DIRS.values()]
+
+
+def _decided_inputs(days: int | None = None) -> list:
+    """Файлы, из которых _load_decided_items берёт решения прошлых брифингов."""
+    if days is None:
+        days = DECIDED_DAYS
+    store = _feed_store()
+    if store is not None:
+        # WAL: свежие изменения базы — в -wal, сам файл может не меняться
+        return [store.path, store.path.with_name(store.path.name + "-wal")]
+    today = datetime.now().date()
+    return [BRIEFINGS_DIR / f"Брифинг {briefing_date_str(today - timedelta(days=i))}.md"
+            for i in range(1, days + 1)]
+
+
+def tasks_section() -> str | None:
+    return memo_section("tasks", build_tasks_section, inputs=[TASKS_INDEX, *_machine_log_dirs()])
+
+
+def alerts_section() -> str | None:
+    return memo_section("alerts", build_alerts_section, inputs=[ALERTS_FILE], key=[_YAML_OK])
+
+
+def news_section(mkt_signals: list, decided=None) -> str:
+    """📬 Новости через кэш; decided — функция, возвращающая решённые пункты, или None.
+
+    Сигналы обогащаются urgency здесь же, а не полагаются на то, что их уже
+    обогатила Разведка: она могла быть взята из кэша."""
+    def build():
+        for s in mkt_signals:
+            _enrich_urgency(s)
+        return build_ideas_section(mkt_signals, decided() if decided else None)
+    return memo_section("news", build, inputs=[TRIAGE_CACHE, *_decided_inputs()],
+                        key=[records_key(mkt_signals)])
+
+
 def write_briefing_note(today, ag_signals: list, cl_ideas: list, mkt_signals: list):
     """Создаёт/обновляет заметку-брифинг с аналитическими секциями."""
     path = briefing_note_path(today)
 
-    tasks_section = build_tasks_section()
-    alerts_section = build_alerts_section()
+    tasks = tasks_section()
+    alerts = alerts_section()
     parts = [f"# Брифинг {briefing_date_str(today)}\n"]
-    if alerts_section:
-        parts += [alerts_section, "", "---", ""]
-    if tasks_section:
-        parts += [tasks_section, "", "---", ""]
+    if alerts:
+        parts += [alerts, "", "---", ""]
+    if tasks:
+        parts += [tasks, "", "---", ""]
 
-    compliance_section = build_compliance_section()
+    compliance_section = memo_section("compliance", build_compliance_section,
+                                      inputs=[HARNESS_VIOLATIONS, RULES_EVAL])
     if compliance_section:
         parts += [compliance_section, "", "---", ""]
 
-    ecc_section = build_ecc_insights_section()
+    ecc_section = memo_section("ecc", build_ecc_insights_section, inputs=[ECC_INSIGHTS])
     if ecc_section:
         parts += [ecc_section, "", "---", ""]
 
     # Анализ времени + Harness Health — только по вторникам (R-011, weekday() == 1)
     if datetime.now().weekday() == 1:
-        time_section = build_time_analysis_section()
+        # Отчёт считается свежим 36 часов — ключ с точностью до часа
+        time_section = memo_section("time", build_time_analysis_section,
+                                    inputs=[TIME_REPORT], key=[datetime.now().hour])
         if time_section:
             parts += [time_section, "", "---", ""]
+        # Без кэша: оценщики (~/AI/tools) читают свои данные сами, отпечатка
+        # их входов отсюда не построить — считаем на каждом прогоне
         harness_section = build_harness_health_section()
         if harness_section:
             parts += [harness_section, "", "---", ""]
 
-    # Один вызов дедупликации для всех секций (не 3 прохода по файлам)
-    decided = _load_decided_items()
+    # Один вызов дедупликации для всех секций (не 3 прохода по файлам) —
+    # и только если хоть одна из них пересчитывается
+    decided_cache = []
+
+    def decided():
+        if not decided_cache:
+            decided_cache.append(_load_decided_items())
+        return decided_cache[0]
+
+    decided_inputs = _decided_inputs()
 
-    # Разведка: market signals с urgency из triage-cache
+    # Разведка: market signals с urgency из triage-cache.
+    # CLUSTERS_FILE не вход: состояние кластеров выводится из того же окна сигналов
     parts += [
-        build_recon_section(mkt_signals, decided),
+        memo_section("recon", lambda: build_recon_section(mkt_signals, decided()),
+                     inputs=[TRIAGE_CACHE, *decided_inputs], key=[records_key(mkt_signals)]),
         "",
         "---",
         "",
-        build_claude_section(cl_ideas, decided),
+        memo_section("claude", lambda: build_claude_section(cl_ideas, decided()),
+                     inputs=decided_inputs, key=[records_key(cl_ideas)]),
         "",
         "---",
         "",
-        build_ideas_section(mkt_signals, decided),
+        news_section(mkt_signals, decided),
         "",
     ]
 
@@ -1039,8 +1081,8 @@ def inject(note_path: Path):
     # Читаем данные для брифинга
     # ag_signals закрыт 23.03.2026 — AgentNet отключён (KE-BRIEF-001)
     ag_signals  = []
-    cl_ideas    = load_recent(CLAUDE_FILE,  days=7, limit=500)
-    mkt_signals = load_recent(MARKET_FILE,  days=3, limit=1000)
+    cl_ideas    = load_feed(CLAUDE_FILE,  days=7, limit=500, record=Idea)
+    mkt_signals = load_feed(MARKET_FILE,  days=3, limit=1000, record=Signal)
 
     # Брифинг создаём/обновляем каждый раз (данные могут обновиться)
     write_briefing_note(today, ag_signals, cl_ideas, mkt_signals)
@@ -1137,7 +1179,7 @@ def inject_proposals(note_path: Path):
     if marker in text:
         return  # уже вставлено сегодня
 
-    section = build_proposals_section()
+    section = memo_section("proposals", build_proposals_section, inputs=[PENDING_HYPO])
     if section is None:
         return  # предложений ещё нет
 
@@ -1344,12 +1386,12 @@ def patch_empty_news(note_path: Path):
     if EMPTY_MARKER not in text:
         return  # Новости уже заполнены
 
-    mkt_signals = load_recent(MARKET_FILE, days=3, limit=1000)
+    mkt_signals = load_feed(MARKET_FILE, days=3, limit=1000, record=Signal)
     relevant = [s for s in mkt_signals if s.get("relevant_to_oleg")]
     if not relevant:
         return  # Данных нет и у нас — ничего не делаем
 
-    new_section = build_ideas_section(mkt_signals)
+    new_section = news_section(mkt_signals)
     old_section = f"### 📬 Новости\n{EMPTY_MARKER}"
     new_text = text.replace(old_section, new_section)
     briefing_path.write_text(new_text, encoding="utf-8")
@@ -1368,7 +1410,7 @@ def patch_stale_tasks(note_path: Path):
     m = re.search(r"(### (?:📋 (?:Повестка дня|Задачи)|📅 Задачи)[^\n]*\n(?:.*\n)*?)(?=\n---|\Z)", text)
     if not m:
         # Блока задач нет — вставим перед первой секцией (после заголовка)
-        fresh_block = build_tasks_section()
+        fresh_block = tasks_section()
         if fresh_block:
             header_end = text.index("\n", text.index("# Брифинг")) + 1
             new_text = text[:header_end] + "\n" + fresh_block + "\n\n---\n" + text[header_end:]
@@ -1384,7 +1426,7 @@ def patch_stale_tasks(note_path: Path):
     if "→ *Решение*:" in current_block or "→ *решение*:" in current_block.lower():
         return
 
-    fresh_block = build_tasks_section()
+    fresh_block = tasks_section()
     if fresh_block is None:
         fresh_block = ""
 
@@ -1407,7 +1449,7 @@ def patch_stale_alerts(note_path: Path):
     if not m:
         return  # Блока нет — inject сам разберётся
 
-    fresh_section = build_alerts_section()  # None если нет open-алертов
+    fresh_section = alerts_section()  # None если нет open-алертов
 
     if fresh_section is None:
         # Нет открытых алертов — удалить блок целиком (вместе с маркерами и пустой строкой)
@@ -1517,12 +1559,8 @@ def validate_premises() -> list[str]:
     return issues
 
 
-def main():
-    # Принцип 18: premise validation
-    issues = validate_premises()
-    for issue in issues:
-        print(f"[premise] ⚠️ {issue}")
-
+def sync_sources():
+    """git pull agentnet-pilot + sync-tasks.sh — свежие фиды и индекс задач."""
     # Синхронизируем agentnet-pilot перед чтением фидов
     # Без этого Mac/Laptop читают устаревшие сигналы и блок Новости пустой
     try:
@@ -1538,15 +1576,18 @@ def main():
     # Обновляем индекс задач (KE-008: без этого done-задачи попадают в блок Активных)
     sync_tasks_index()
 
+
+def run_once():
+    """Брифинг + инжекция в дневную заметку + патчи. Без pull/sync — их делает вызывающий."""
     # Выходные — без брифинга (сб=5, вс=6)
     if datetime.now().weekday() in (5, 6):
         print("⏭️ Выходной — брифинг не формируется")
-        sys.exit(0)
+        return
 
     # Брифинг создаётся независимо от дневной заметки
     ag_signals  = []
-    cl_ideas    = load_recent(CLAUDE_FILE,  days=7, limit=500)
-    mkt_signals = load_recent(MARKET_FILE,  days=3, limit=1000)
+    cl_ideas    = load_feed(CLAUDE_FILE,  days=7, limit=500, record=Idea)
+    mkt_signals = load_feed(MARKET_FILE,  days=3, limit=1000, record=Signal)
     write_briefing_note(datetime.now().date(), ag_signals, cl_ideas, mkt_signals)
 
     note = today_note_path()
@@ -1560,6 +1601,102 @@ def main():
     else:
         print(f"Заметка не создана ещё: {note.name} — брифинг создан, инжекция ждёт")
 
+    memo = section_memo()
+    try:
+        memo.save()
+    except OSError as e:
+        print(f"⚠️ кэш секций не сохранён: {e}")
+    print(memo.report())
+
+
+# ---------- --daemon ----------
+# Вместо запуска раз в 10 минут: один процесс следит за фидами, индексом задач,
+# алертами и дневными заметками и пересобирает брифинг через секунды после
+# изменения. Какие секции пересчитать, решает кэш секций по отпечаткам входов.
+# pull + sync-tasks — по таймеру (--sync-every); он же страхует смену даты и
+# уход сигналов из окна, которые событий в файлах не дают.
+
+def _watch_dirs() -> list:
+    feeds = [CLAUDE_FILE, MARKET_FILE]
+    return [*(f.parent for f in feeds), *(partition_dir(f) for f in feeds),
+            TRIAGE_CACHE.parent, TASKS_INDEX.parent, ALERTS_FILE.parent, DAYS_DIR,
+            PENDING_HYPO.parent, *_machine_log_dirs()]
+
+
+def _watch_ignored(path: Path) -> bool:
+    """Служебные файлы и собственные записи демона — не повод пересобирать."""
+    name = path.name
+    return (name.startswith(".")
+            or ".tmp" in name or ".compact" in name)
+
+
+def _reset_process_caches():
+    """Ленивые синглтоны прогона: между прогонами демона файлы могли измениться."""
+    global _TRIAGE, _STORE, _CLUSTERS
+    if _TRIAGE is not None:
+        _TRIAGE.close()
+    if _STORE not in (False, None):
+        _STORE.close()
+    _TRIAGE, _STORE, _CLUSTERS = None, False, None
+    invalidate_url_index()
+    section_memo().reset_stats()
+
+
+def run_daemon(debounce: float, sync_every: float, poll: float, force_poll: bool = False):
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with Watcher(_watch_dirs(), ignore=_watch_ignored, poll=poll, force_poll=force_poll) as watcher:
+        print(f"[daemon] {watcher.backend}: {len(watcher.dirs)} каталогов, "
+              f"debounce {debounce:g}с, sync раз в {sync_every:g}с")
+        last_sync = None
+        while True:
+            if last_sync is None or time.monotonic() - last_sync >= sync_every:
+                sync_sources()
+                last_sync = time.monotonic()
+                reason = "таймер"
+            else:
+                changed = watcher.wait(sync_every - (time.monotonic() - last_sync))
+                if not changed:
+                    continue
+                changed |= watcher.settle(quiet=debounce, limit=max(30.0, 10 * debounce))
+                names = sorted({p.name for p in changed})
+                reason = ", ".join(names[:5]) + (f" (+{len(names) - 5})" if len(names) > 5 else "")
+            print(f"[daemon] {datetime.now():%H:%M:%S} прогон: {reason}")
+            _reset_process_caches()
+            try:
+                run_once()
+            except Exception:
+                traceback.print_exc()
+            sys.stdout.flush()
+
+
+def main():
+    global DECIDED_DAYS
+    parser = argparse.ArgumentParser(description="AI-блок и брифинг в ежедневной заметке Obsidian")
+    parser.add_argument("--daemon", action="store_true",
+                        help="не выходить: пересобирать по изменениям файлов (inotify / опрос)")
+    parser.add_argument("--debounce", type=float, default=2.0,
+                        help="секунд тишины после пачки изменений до прогона (по умолчанию 2)")
+    parser.add_argument("--sync-every", type=float, default=600,
+                        help="секунд между git pull + sync-tasks в --daemon (по умолчанию 600)")
+    parser.add_argument("--poll", type=float, default=5.0,
+                        help="интервал опроса, если inotify недоступен (по умолчанию 5)")
+    parser.add_argument("--force-poll", action="store_true", help="опрос даже при наличии inotify")
+    parser.add_argument("--decided-days", type=int, default=DECIDED_DAYS,
+                        help=f"окно решений прошлых брифингов в днях (по умолчанию {DECIDED_DAYS})")
+    args = parser.parse_args()
+    DECIDED_DAYS = args.decided_days
+
+    # Принцип 18: premise validation
+    issues = validate_premises()
+    for issue in issues:
+        print(f"[premise] ⚠️ {issue}")
+
+    if args.daemon:
+        run_daemon(args.debounce, args.sync_every, args.poll, args.force_poll)
+        return
+    sync_sources()
+    run_once()
+
 
 if __name__ == "__main__":
     main()
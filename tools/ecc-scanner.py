@@ -31,6 +31,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path.home() / "AI" / "tools"))
 from shared_env import get_anthropic_key
 
+sys.path.insert(0, str(Path(__file__).parent))
+from neardup import NearDup
+
 REPOS = [
     "affaan-m/everything-claude-code",
     "anthropics/claude-code",
@@ -175,7 +178,7 @@ def is_significant(msg: str) -> bool:
 
 # ── Основная логика ────────────────────────────────────────────────────────────
 
-def scan_repo(repo: str, since_str: str, seen_titles: set) -> list:
+def scan_repo(repo: str, since_str: str, seen_titles: set, seen_near: NearDup) -> list:
     """Сканирует один репозиторий, возвращает список инсайтов."""
     log(f"\n── Репо: {repo} ──")
     path = f"/repos/{repo}/commits?since={urllib.parse.quote(since_str)}&per_page={MAX_COMMITS_PER_REPO}"
@@ -227,7 +230,7 @@ def scan_repo(repo: str, since_str: str, seen_titles: set) -> list:
             continue
 
         title_key = insight["title"].lower()[:30]
-        if title_key in seen_titles:
+        if title_key in seen_titles or not seen_near.admit(insight["title"]):
             log(f"    → дубликат: {insight['title']}")
             continue
 
@@ -261,10 +264,11 @@ def main():
     # Сканируем все репозитории
     all_insights = []
     seen_titles = set()
+    seen_near = NearDup()   # почти-дубликаты заголовков между репо (MinHash/LSH)
     total_significant = 0
 
     for repo in REPOS:
-        repo_insights = scan_repo(repo, since_str, seen_titles)
+        repo_insights = scan_repo(repo, since_str, seen_titles, seen_near)
         all_insights.extend(repo_insights)
         total_significant += len(repo_insights)
 
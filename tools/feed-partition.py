@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+feed-partition.py — партиционирование и компакция JSONL-фидов по времени.
+
+Фиды signals.jsonl / ideas.jsonl растут бесконечно: каждый читатель,
+каждый git pull и diff платят за всю историю. Этот инструмент переносит
+закрытые недели в партиции:
+
+  feeds/market-intel/signals.jsonl            ← голова: текущая неделя, сюда пишут продюсеры
+  feeds/market-intel/signals/2026-W13.jsonl   ← закрытые недели
+  feeds/market-intel/signals/2026-02.jsonl    ← старые недели после компакции (по месяцам)
+  feeds/market-intel/signals/manifest.json    ← диапазон ts и число записей на партицию
+
+Продюсеры (rss-collector) ничего не меняют — они дописывают в голову.
+Читатели (tools/feedlib.py) открывают только партиции, пересекающие окно.
+
+Голова переписывается на месте под fcntl.LOCK_EX (тот же inode), поэтому
+продюсер, ждущий lock, допишет строку уже в новую голову. Повторный запуск
+идемпотентен: строки, уже лежащие в партиции, не дублируются.
+
+Usage:
+  python3 feed-partition.py --migrate                  # все фиды по умолчанию
+  python3 feed-partition.py --migrate feeds/claude-ideas/ideas.jsonl
+  python3 feed-partition.py --compact --keep-weeks 8   # недели старше 8 → месячные партиции
+  python3 feed-partition.py --stat
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import MANIFEST_NAME, MANIFEST_VERSION, load_manifest, partition_dir
+
+REPO = Path(__file__).parent.parent
+DEFAULT_FEEDS = [
+    REPO / "feeds" / "market-intel" / "signals.jsonl",
+    REPO / "feeds" / "claude-ideas" / "ideas.jsonl",
+    REPO / "feeds" / "personalos" / "signals.jsonl",
+]
+KEEP_WEEKS = 8
+UNDATED = "undated"
+
+
+def _ts_of(line: bytes) -> datetime | None:
+    try:
+        return datetime.fromisoformat(json.loads(line)["ts"])
+    except Exception:
+        return None
+
+
+def _week_key(ts: datetime | None) -> str:
+    if ts is None:
+        return UNDATED
+    y, w, _ = ts.isocalendar()
+    return f"{y}-W{w:02d}"
+
+
+def _month_key(ts: datetime | None) -> str:
+    return ts.strftime("%Y-%m") if ts else UNDATED
+
+
+def _read_lines(path: Path) -> list:
+    if not path.exists():
+        return []
+    return [l for l in path.read_bytes().split(b"\n") if l.strip()]
+
+
+def _write_atomic(path: Path, lines: list):
+    tmp = path.with_suffix(f".tmp{os.getpid()}")
+    with open(tmp, "wb") as f:
+        f.write(b"".join(l + b"\n" for l in lines))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _partition_entry(path: Path) -> dict:
+    keys = []
+    for line in _read_lines(path):
+        ts = _ts_of(line)
+        keys.append(ts.isoformat(timespec="seconds")[:19] if ts else "2000-01-01T00:00:00")
+    return {
+        "file": path.name,
+        "min_ts": min(keys) if keys else "",
+        "max_ts": max(keys) if keys else "",
+        "count": len(keys),
+    }
+
+
+def _save_manifest(feed: Path, entries: dict):
+    """entries: file name → entry. Пустые партиции выкидываются."""
+    parts = sorted((e for e in entries.values() if e["count"]), key=lambda e: e["min_ts"])
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "head": feed.name,
+        "updated": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        "partitions": parts,
+    }
+    target = partition_dir(feed) / MANIFEST_NAME
+    tmp = target.with_suffix(f".tmp{os.getpid()}")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, target)
+
+
+def _merge_into(path: Path, new_lines: list, sort: bool = False) -> int:
+    """Дописывает в партицию строки, которых там ещё нет. Возвращает число новых."""
+    existing = _read_lines(path)
+    seen = set(existing)
+    added = []
+    for line in new_lines:
+        if line not in seen:
+            seen.add(line)
+            added.append(line)
+    if not added and not sort:
+        return 0
+    merged = existing + added
+    if sort:
+        merged.sort(key=lambda l: _partition_sort_key(l))
+    _write_atomic(path, merged)
+    return len(added)
+
+
+def _partition_sort_key(line: bytes) -> str:
+    ts = _ts_of(line)
+    return ts.isoformat(timespec="seconds")[:19] if ts else ""
+
+
+def migrate(feed: Path) -> str:
+    """Переносит все закрытые недели из головы в недельные партиции."""
+    if not feed.exists():
+        return f"{feed}: нет файла — пропуск"
+    pdir = partition_dir(feed)
+    pdir.mkdir(exist_ok=True)
+    current_week = _week_key(datetime.now())
+
+    with open(feed, "r+b") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            data = f.read()
+            # Хвост без '\n' (теоретически недописанная строка) остаётся в голове как есть
+            cut = data.rfind(b"\n") + 1
+            complete, partial = data[:cut], data[cut:]
+
+            keep, by_week = [], {}
+            for line in complete.split(b"\n"):
+                if not line.strip():
+                    continue
+                week = _week_key(_ts_of(line))
+                if week == current_week:
+                    keep.append(line)
+                else:
+                    by_week.setdefault(week, []).append(line)
+
+            if not by_week:
+                return f"{feed.name}: закрытых недель нет ({len(keep)} записей в голове)"
+
+            manifest = load_manifest(feed) or {"partitions": []}
+            entries = {e["file"]: e for e in manifest["partitions"]}
+            moved = 0
+            for week, lines in sorted(by_week.items()):
+                part = pdir / f"{week}.jsonl"
+                moved += _merge_into(part, lines)
+                entries[part.name] = _partition_entry(part)
+            # Сначала партиции и манифест, потом голова: при падении между шагами
+            # записи окажутся в обоих местах, а повторный --migrate их схлопнет
+            _save_manifest(feed, entries)
+
+            f.seek(0)
+            f.write(b"".join(l + b"\n" for l in keep) + partial)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+    return (f"{feed.name}: {moved} записей → {len(by_week)} партиций, "
+            f"в голове осталось {len(keep)}")
+
+
+def compact(feed: Path, keep_weeks: int = KEEP_WEEKS) -> str:
+    """Сливает недельные партиции старше keep_weeks в месячные (сортировка по ts, dedup)."""
+    manifest = load_manifest(feed)
+    if not manifest:
+        return f"{feed.name}: не партиционирован — сначала --migrate"
+    pdir = partition_dir(feed)
+    horizon = (datetime.now() - timedelta(weeks=keep_weeks)).isoformat(timespec="seconds")
+    entries = {e["file"]: e for e in manifest["partitions"]}
+
+    old_weeks = [e["file"] for e in manifest["partitions"]
+                 if "-W" in e["file"] and e["max_ts"] < horizon]
+    if not old_weeks:
+        return f"{feed.name}: нечего компактировать (горизонт {keep_weeks} нед.)"
+
+    by_month = {}
+    for name in old_weeks:
+        for line in _read_lines(pdir / name):
+            by_month.setdefault(_month_key(_ts_of(line)), []).append(line)
+
+    for month, lines in sorted(by_month.items()):
+        part = pdir / f"{month}.jsonl"
+        _merge_into(part, lines, sort=True)
+        entries[part.name] = _partition_entry(part)
+    for name in old_weeks:
+        entries.pop(name, None)
+    _save_manifest(feed, entries)
+    # Недельные файлы удаляем только после записи манифеста — читатели
+    # никогда не видят манифест, ссылающийся на несуществующий файл
+    for name in old_weeks:
+        (pdir / name).unlink(missing_ok=True)
+
+    return f"{feed.name}: {len(old_weeks)} недель → {len(by_month)} месячных партиций"
+
+
+def stat(feed: Path) -> str:
+    manifest = load_manifest(feed)
+    head = len(_read_lines(feed))
+    if not manifest:
+        return f"{feed.name}: один файл, {head} записей"
+    lines = [f"{feed.name}: голова {head} записей, {len(manifest['partitions'])} партиций"]
+    for e in manifest["partitions"]:
+        lines.append(f"  {e['file']:<20} {e['count']:>6}  {e['min_ts']} … {e['max_ts']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AgentNet: партиционирование фидов по неделям")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--migrate", action="store_true", help="закрытые недели → партиции")
+    mode.add_argument("--compact", action="store_true", help="старые недели → месячные партиции")
+    mode.add_argument("--stat", action="store_true", help="показать манифест")
+    parser.add_argument("--keep-weeks", type=int, default=KEEP_WEEKS)
+    parser.add_argument("feeds", nargs="*", type=Path)
+    args = parser.parse_args()
+
+    for feed in args.feeds or DEFAULT_FEEDS:
+        feed = feed.expanduser().resolve()
+        if args.migrate:
+            print(migrate(feed))
+        elif args.compact:
+            print(compact(feed, args.keep_weeks))
+        else:
+            print(stat(feed))
+
+
+if __name__ == "__main__":
+    main()
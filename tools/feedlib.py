@@ -0,0 +1,759 @@
+#!/usr/bin/env python3
+"""
+feedlib.py — общий доступ к JSONL-фидам AgentNet.
+
+Заменяет шесть копий load_recent/_load в tools/: каждый читатель раньше
+делал json.loads по всем строкам фида, чтобы оставить хвост за N дней.
+
+Индекс: для каждого фида хранится разреженный индекс ts → байтовый offset
+(блоки по INDEX_BLOCK_LINES строк, у каждого блока min/max ts).
+Запрос days=3 находит первый блок, где max_ts >= cutoff, делает seek
+и парсит только хвост. Индекс дописывается инкрементально, когда фид
+растёт (append-only), и перестраивается, если файл переписан (git pull,
+ручная правка → другой inode или размер меньше).
+
+Хвост: load_recent с limit читает файл блоками с конца (load_tail)
+и останавливается, набрав limit записей или уйдя за cutoff, —
+get_market_signals(days=3, limit=15) стоит O(результата), а не O(файла).
+
+Партиции (опционально): история фида вынесена в signals/2026-W14.jsonl
+с манифестом signals/manifest.json (диапазон ts и число записей на
+партицию), а signals.jsonl остаётся головой, куда пишут продюсеры.
+Читатели открывают только партиции, пересекающие окно. Миграция
+и компакция — tools/feed-partition.py.
+
+Префильтр: market-intel записи несут длинные signal/embedding_hint/tags,
+а большинство строк отсекается датой. ts извлекается из сырой строки
+(raw_ts_key) и json.loads вызывается только для строк внутри окна;
+если быстрый путь не нашёл ts — полный decode, как раньше.
+Замер: python3 tools/perf-bench.py prefilter
+
+Записи: load_* принимают record=Signal|Idea|TriageEntry|TelemetryRecord —
+__slots__ + интернированные категориальные строки вместо dict, с dict-доступом.
+Замер памяти: python3 tools/perf-bench.py records
+
+Кэш разобранных данных: cached() / cached_fold() хранят результат разбора
+файла в ~/.cache/agentnet/parsed/, ключ — (inode, size, mtime_ns). Для
+append-only файлов рост размера разбирает только новые байты. Кэш общий
+для всех tools/: daily-inject каждые 10 минут не разбирает заново то,
+что не менялось.
+
+Индексы лежат в ~/.cache/agentnet/feed-index/ — не в репо.
+
+Использование (как библиотека):
+  sys.path.insert(0, str(Path.home() / "agentnet-pilot" / "tools"))
+  from feedlib import load_recent, load_since
+  signals = load_recent(MARKET_FILE, days=3, limit=1000)
+
+CLI:
+  python3 feedlib.py --reindex ~/agentnet-pilot/feeds/market-intel/signals.jsonl
+  python3 feedlib.py --stat    ~/agentnet-pilot/feeds/market-intel/signals.jsonl
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CACHE_DIR = Path.home() / ".cache" / "agentnet"
+INDEX_DIR = CACHE_DIR / "feed-index"
+PARSED_DIR = CACHE_DIR / "parsed"
+# Окно, которое load_recent_cached держит разобранным на диске
+CACHED_WINDOW_DAYS = 14
+INDEX_VERSION = 2
+INDEX_BLOCK_LINES = 256
+SIG_BYTES = 256
+
+# Обратное чтение хвоста: размер блока и сколько подряд старых записей
+# означают «дальше только история» (допуск на разупорядоченные ts)
+TAIL_BLOCK_BYTES = 64 * 1024
+TAIL_STALE_RUN = 64
+
+# Партиционированный layout: signals.jsonl (голова) + signals/<YYYY-Www>.jsonl
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+_DEFAULT_TS = "2000-01-01T00:00:00"
+
+# Префильтр по сырой строке: ts вытаскивается без json.loads, полностью
+# декодируются только строки внутри окна. False — всегда полный decode.
+PREFILTER = True
+_TS_VALUE = re.compile(rb'\s*:\s*"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)')
+
+
+# ---------- Индекс ts → offset ----------
+
+def _index_path(path: Path) -> Path:
+    key = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:16]
+    return INDEX_DIR / f"{path.stem}-{key}.json"
+
+
+def _ts_key(r: dict) -> str:
+    """Ключ для сравнения в индексе: первые 19 символов ISO ts (до секунд)."""
+    ts = r.get("ts") or _DEFAULT_TS
+    return str(ts)[:19]
+
+
+def raw_ts_key(line: bytes) -> str | None:
+    """Дешёвое извлечение ts из сырой строки без json.loads.
+
+    Ищет первый ключ "ts" и берёт значение, если оно начинается с полного
+    ISO до секунд (YYYY-MM-DDTHH:MM:SS). Возвращает эти 19 символов —
+    их можно сравнивать строкой с cutoff.isoformat(timespec="seconds").
+    None — быстрый путь не сработал (нет ts, другой формат) → полный decode.
+    Фиды плоские, поэтому первый "ts" в строке — это поле записи.
+    """
+    i = line.find(b'"ts"')
+    if i < 0:
+        return None
+    m = _TS_VALUE.match(line, i + 4)
+    return m.group(1).decode("ascii") if m else None
+
+
+def _scan_blocks(f, start: int, end: int) -> list:
+    """Читает [start, end) и режет на блоки [offset, min_ts, max_ts, lines].
+    end всегда указывает сразу за '\\n' — хвост без перевода строки
+    (запись в процессе) не индексируется."""
+    blocks = []
+    f.seek(start)
+    offset = start
+    cur = None
+    while offset < end:
+        raw = f.readline()
+        if not raw:
+            break
+        line_start = offset
+        offset += len(raw)
+        line = raw.strip()
+        if not line:
+            continue
+        key = raw_ts_key(line) if PREFILTER else None
+        if key is None:
+            try:
+                key = _ts_key(json.loads(line))
+            except Exception:
+                continue
+        if cur is None or cur[3] >= INDEX_BLOCK_LINES:
+            cur = [line_start, key, key, 0]
+            blocks.append(cur)
+        if key < cur[1]:
+            cur[1] = key
+        if key > cur[2]:
+            cur[2] = key
+        cur[3] += 1
+    return blocks
+
+
+def complete_end(f, size: int) -> int:
+    """Позиция сразу за последним '\\n' в файле (не дальше size)."""
+    pos = size
+    chunk = 4096
+    while pos > 0:
+        step = min(chunk, pos)
+        f.seek(pos - step)
+        buf = f.read(step)
+        nl = buf.rfind(b"\n")
+        if nl != -1:
+            return pos - step + nl + 1
+        pos -= step
+    return 0
+
+
+def region_sig(f, end: int) -> str:
+    """Подпись первых и последних SIG_BYTES байт до end: ловит перезапись
+    файла на месте, после которой он снова дорос до прежнего размера."""
+    f.seek(0)
+    head = f.read(min(SIG_BYTES, end))
+    f.seek(max(0, end - SIG_BYTES))
+    tail = f.read(min(SIG_BYTES, end))
+    return hashlib.sha1(head + b"|" + tail).hexdigest()
+
+
+def _load_index(path: Path) -> dict | None:
+    try:
+        idx = json.loads(_index_path(path).read_text(encoding="utf-8"))
+        if idx.get("version") == INDEX_VERSION:
+            return idx
+    except Exception:
+        pass
+    return None
+
+
+def _save_index(path: Path, idx: dict):
+    """Атомарная запись (tmp + rename). Ошибки записи не критичны —
+    следующий читатель просто перестроит индекс."""
+    target = _index_path(path)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_text(json.dumps(idx), encoding="utf-8")
+        os.replace(tmp, target)
+    except OSError:
+        pass
+
+
+def feed_index(path: Path) -> dict:
+    """Возвращает актуальный индекс фида, дописывая/перестраивая при необходимости.
+
+    {"version", "inode", "size", "mtime_ns", "end", "sig", "blocks": [[offset, min_ts, max_ts, lines], ...]}
+    end — offset сразу за последней проиндексированной полной строкой,
+    sig — подпись содержимого до end (см. region_sig).
+    """
+    st = path.stat()
+    idx = _load_index(path)
+    if idx and idx["inode"] == st.st_ino and idx["size"] == st.st_size \
+            and idx["mtime_ns"] == st.st_mtime_ns:
+        return idx
+
+    with open(path, "rb") as f:
+        end = complete_end(f, st.st_size)
+        # Файл мог быть переписан на месте (feed-partition.py --migrate) и снова
+        # дорасти — inode тот же, поэтому сверяем подпись уже проиндексированного хвоста
+        appendable = (
+            idx is not None
+            and idx["inode"] == st.st_ino
+            and idx["end"] <= end
+            and idx["blocks"]
+            and idx.get("sig") == region_sig(f, idx["end"])
+        )
+        if appendable:
+            # Append-only рост: пересканируем только последний (возможно неполный) блок
+            last = idx["blocks"].pop()
+            blocks = idx["blocks"] + _scan_blocks(f, last[0], end)
+        else:
+            blocks = _scan_blocks(f, 0, end)
+
+        idx = {
+            "version": INDEX_VERSION,
+            "inode": st.st_ino,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "end": end,
+            "sig": region_sig(f, end),
+            "blocks": blocks,
+        }
+    _save_index(path, idx)
+    return idx
+
+
+def _seek_offset(idx: dict, cutoff_key: str) -> int:
+    """Offset первого блока, в котором могут быть записи >= cutoff.
+    Блоки целиком старше cutoff (max_ts < cutoff) пропускаются — это
+    корректно и при небольшом разупорядочивании ts между блоками."""
+    for offset, _min_ts, max_ts, _n in idx["blocks"]:
+        if max_ts >= cutoff_key:
+            return offset
+    return idx["end"]
+
+
+# ---------- Партиции ----------
+
+def partition_dir(path: Path) -> Path:
+    """feeds/market-intel/signals.jsonl → feeds/market-intel/signals/"""
+    return path.with_suffix("")
+
+
+def load_manifest(path: Path) -> dict | None:
+    """Манифест партиционированного фида или None (обычный один файл).
+
+    {"version": 1, "partitions": [{"file", "min_ts", "max_ts", "count"}, ...]}
+    Партиции отсортированы по min_ts. Головной файл (path) продолжает
+    принимать append от продюсеров и читается всегда.
+    """
+    try:
+        data = json.loads((partition_dir(path) / MANIFEST_NAME).read_text(encoding="utf-8"))
+        if data.get("version") == MANIFEST_VERSION:
+            return data
+    except Exception:
+        pass
+    return None
+
+
+def feed_files(path: Path, cutoff: datetime | None = None) -> list:
+    """Физические файлы фида в порядке времени: партиции, пересекающие
+    окно [cutoff, ∞), затем головной файл. Без манифеста — только path."""
+    files = []
+    manifest = load_manifest(path)
+    if manifest:
+        pdir = partition_dir(path)
+        key = cutoff.isoformat(timespec="seconds") if cutoff else ""
+        for part in manifest["partitions"]:
+            if part["max_ts"] >= key:
+                files.append(pdir / part["file"])
+    if path.exists():
+        files.append(path)
+    return files
+
+
+# ---------- Чтение ----------
+
+def record_ts(r: dict) -> datetime:
+    """ts записи; без ts — 2000-01-01. Битый ts — ValueError."""
+    return datetime.fromisoformat(r.get("ts", _DEFAULT_TS))
+
+
+def _older(line: bytes, cutoff_key: str) -> bool:
+    """True, если по сырому ts строка точно старше cutoff — decode не нужен."""
+    if not PREFILTER:
+        return False
+    key = raw_ts_key(line)
+    return key is not None and key < cutoff_key
+
+
+def _filter_lines(lines, cutoff: datetime, strict: bool, make=None):
+    cutoff_key = cutoff.isoformat(timespec="seconds")
+    for raw in lines:
+        line = raw.strip()
+        if not line or _older(line, cutoff_key):
+            continue
+        try:
+            r = json.loads(line)
+            ts = record_ts(r)
+            if ts > cutoff or (not strict and ts == cutoff):
+                yield make(r) if make else r
+        except Exception:
+            continue
+
+
+def _iter_file_since(path: Path, cutoff: datetime, strict: bool, make=None):
+    try:
+        start = _seek_offset(feed_index(path), cutoff.isoformat(timespec="seconds"))
+    except OSError:
+        start = 0
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        yield from _filter_lines(f, cutoff, strict, make)
+
+
+def iter_since(path: Path, cutoff: datetime, strict: bool = False, record=None):
+    """Генератор записей фида с ts >= cutoff (ts > cutoff при strict) в порядке файла.
+
+    Семантика фильтра совпадает со старыми load_recent: записи без ts
+    считаются 2000-01-01, битые строки и нераспознанный ts пропускаются.
+    Для партиционированного фида открываются только партиции, пересекающие окно.
+    record — класс записи (Signal, Idea, ...) вместо dict.
+    """
+    make = record.from_dict if record else None
+    for f in feed_files(path, cutoff):
+        yield from _iter_file_since(f, cutoff, strict, make)
+
+
+def window_ranges(path: Path, cutoff: datetime, blocks_per_range: int = 32) -> list:
+    """Окно [cutoff, ∞) фида, нарезанное на байтовые диапазоны для параллельной
+    обработки: [(file, start, end), ...] в порядке файла. Границы — блоки
+    ts-индекса (по INDEX_BLOCK_LINES строк), то есть начала строк.
+    Записи из диапазона читает iter_range — фильтр по ts тот же, что в iter_since."""
+    cutoff_key = cutoff.isoformat(timespec="seconds")
+    ranges = []
+    for file in feed_files(path, cutoff):
+        idx = feed_index(file)
+        start = _seek_offset(idx, cutoff_key)
+        offsets = [b[0] for b in idx["blocks"] if b[0] >= start]
+        bounds = offsets[::blocks_per_range] + [idx["end"]]
+        ranges += [(file, a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+    return ranges
+
+
+def iter_range(path: Path, start: int, end: int, cutoff: datetime,
+               strict: bool = False, record=None):
+    """Записи с ts >= cutoff из байт [start, end) файла (см. window_ranges)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    yield from _filter_lines(data.split(b"\n"), cutoff, strict,
+                             record.from_dict if record else None)
+
+
+def load_since(path: Path, cutoff: datetime, strict: bool = False, record=None) -> list:
+    """iter_since, собранный в список."""
+    return list(iter_since(path, cutoff, strict, record))
+
+
+def iter_lines_reverse(path: Path, block_size: int = TAIL_BLOCK_BYTES):
+    """Строки файла от конца к началу (bytes, без '\\n').
+    Читает блоками фиксированного размера с EOF, склеивая строки на стыках."""
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        head = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step) + head
+            lines = chunk.split(b"\n")
+            # Первый кусок может быть продолжением строки из предыдущего блока
+            head = lines.pop(0)
+            for line in reversed(lines):
+                yield line
+        if head:
+            yield head
+
+
+def load_tail(path: Path, cutoff: datetime, limit: int, record=None) -> list:
+    """Последние limit записей с ts >= cutoff — чтением с конца файла.
+
+    Стоимость O(результата), а не O(файла): сканирование останавливается,
+    как только набрано limit записей или подряд встретилось TAIL_STALE_RUN
+    записей старше cutoff. Продюсеры пишут примерно по времени, поэтому
+    небольшие разупорядоченные участки (< TAIL_STALE_RUN строк) не теряются.
+    Порядок результата — как в файле. Партиции читаются от новых к старым.
+    """
+    cutoff_key = cutoff.isoformat(timespec="seconds")
+    records = []
+    stale = 0
+    lines = (raw for f in reversed(feed_files(path, cutoff)) for raw in iter_lines_reverse(f))
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        if _older(line, cutoff_key):
+            fresh = False
+        else:
+            try:
+                r = json.loads(line)
+                fresh = record_ts(r) >= cutoff
+            except Exception:
+                continue
+        if fresh:
+            records.append(record.from_dict(r) if record else r)
+            stale = 0
+            if len(records) >= limit:
+                break
+        else:
+            stale += 1
+            if stale >= TAIL_STALE_RUN:
+                break
+    records.reverse()
+    return records
+
+
+def load_recent(path: Path, days: int = 7, limit: int | None = 20, record=None) -> list:
+    """Записи за последние days дней, не больше limit последних (None — все).
+    С limit читает с конца (load_tail), без limit — через индекс (load_since)."""
+    cutoff = datetime.now() - timedelta(days=days)
+    if limit:
+        return load_tail(path, cutoff, limit, record)
+    return load_since(path, cutoff, record=record)
+
+
+# ---------- Типизированные записи ----------
+
+class FeedRecord:
+    """Компактная запись фида: __slots__ вместо dict + интернированные строки.
+
+    Одни и те же agent_id/source/direction/category/теги повторяются тысячи
+    раз в каждом долгоживущем MCP-процессе; sys.intern оставляет по одной
+    копии строки на процесс. Поля вне FIELDS (action, why, _feed, ...)
+    хранятся в _extra. Dict-доступ (.get, [], in, keys) работает как у dict,
+    поэтому секции daily-inject не переписываются.
+    """
+
+    FIELDS: tuple = ()
+    INTERNED: frozenset = frozenset()
+    _field_set: frozenset = frozenset()
+    __slots__ = ("_extra",)
+
+    def __init__(self, data: dict | None = None):
+        self._extra = None
+        for key, value in (data or {}).items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data)
+
+    def __setitem__(self, key, value):
+        if key in self.INTERNED:
+            value = _intern(value)
+        if key in self._field_set:
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                return object.__getattribute__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def keys(self) -> list:
+        keys = [k for k in self.FIELDS if k in self]
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def items(self) -> list:
+        return [(k, self[k]) for k in self.keys()]
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, FeedRecord):
+            other = other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None  # как у dict: запись изменяемая
+
+    def __reduce__(self):
+        # Через конструктор: строки из pickle интернируются заново
+        return (type(self), (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+
+
+_MISSING = object()
+
+
+def _intern(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        # tags: кортеж интернированных строк — меньше list и без копий строк
+        return tuple(sys.intern(v) if isinstance(v, str) else v for v in value)
+    return value
+
+
+class Signal(FeedRecord):
+    """market-intel / agentnet-project / personalos signals.jsonl"""
+    FIELDS = ("ts", "agent_id", "source", "url", "title_original", "topic",
+              "direction", "signal", "tags", "relevant_to_oleg", "embedding_hint",
+              "urgency", "domain", "trend", "impact", "idea", "relevance",
+              "action", "benefit", "actionability")
+    INTERNED = frozenset({"agent_id", "source", "direction", "tags", "urgency", "domain"})
+    __slots__ = FIELDS
+
+
+class Idea(FeedRecord):
+    """claude-ideas/ideas.jsonl"""
+    FIELDS = ("ts", "agent_id", "source", "url", "title_original", "insight",
+              "pattern", "category", "embedding_hint", "action", "why")
+    INTERNED = frozenset({"agent_id", "source", "category"})
+    __slots__ = FIELDS
+
+
+class TriageEntry(FeedRecord):
+    """feeds/triage-cache.jsonl"""
+    FIELDS = ("url", "feed", "ts_item", "ts_triage", "urgency", "type",
+              "confidence", "reason", "already_tracked")
+    INTERNED = frozenset({"feed", "urgency", "type", "confidence", "reason"})
+    __slots__ = FIELDS
+
+
+class TelemetryRecord(FeedRecord):
+    """agents/<agent>/telemetry/telemetry.jsonl"""
+    FIELDS = ("ts", "agent_id", "task_type", "skill_used", "applied",
+              "exchanges", "success", "notes")
+    INTERNED = frozenset({"agent_id", "task_type", "skill_used"})
+    __slots__ = FIELDS
+
+
+# ---------- Кэш разобранных файлов (общий для всех tools/) ----------
+
+def _parsed_path(path: Path, name: str) -> Path:
+    key = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:16]
+    return PARSED_DIR / f"{path.stem}-{key}-{name}.pickle"
+
+
+def _load_parsed(target: Path) -> dict | None:
+    try:
+        with open(target, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _save_parsed(target: Path, entry: dict):
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+    except Exception:
+        pass
+
+
+def cached(path: Path, build, name: str, version: int = 1):
+    """build(path), закэшированный на диске по (inode, size, mtime_ns).
+
+    Для файлов, которые переписываются целиком: active-alerts.yaml,
+    индекс задач. Кэш общий для всех процессов; при любом изменении
+    файла build вызывается заново. Нет файла — build(path) без кэша.
+    """
+    if not path.exists():
+        return build(path)
+    st = path.stat()
+    stamp = (st.st_ino, st.st_size, st.st_mtime_ns, version)
+    target = _parsed_path(path, name)
+    entry = _load_parsed(target)
+    if entry and entry.get("stamp") == stamp:
+        return entry["state"]
+    state = build(path)
+    _save_parsed(target, {"stamp": stamp, "state": state})
+    return state
+
+
+def cached_fold(path: Path, fold, init, name: str, version: int = 1):
+    """Состояние, свёрнутое по строкам append-only файла, с кэшем на диске.
+
+    fold(state, lines) получает новые полные строки (bytes) и возвращает
+    новое состояние. Если файл только дописан (тот же inode, старое
+    содержимое не менялось — проверка по region_sig), разбираются только
+    новые байты; иначе свёртка начинается заново с init().
+    """
+    if not path.exists():
+        return init()
+    st = path.stat()
+    target = _parsed_path(path, name)
+    entry = _load_parsed(target)
+    if entry and entry.get("version") == version and entry["inode"] == st.st_ino \
+            and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return entry["state"]
+
+    with open(path, "rb") as f:
+        end = complete_end(f, st.st_size)
+        appendable = (
+            entry is not None
+            and entry.get("version") == version
+            and entry["inode"] == st.st_ino
+            and entry["end"] <= end
+            and entry["sig"] == region_sig(f, entry["end"])
+        )
+        state, start = (entry["state"], entry["end"]) if appendable else (init(), 0)
+        f.seek(start)
+        lines = [l for l in f.read(end - start).split(b"\n") if l.strip()]
+        state = fold(state, lines)
+        sig = region_sig(f, end)
+
+    _save_parsed(target, {
+        "version": version,
+        "inode": st.st_ino,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "end": end,
+        "sig": sig,
+        "state": state,
+    })
+    return state
+
+
+def read_appended(path: Path, mark: dict | None) -> tuple[list | None, dict | None]:
+    """Полные строки, дописанные в файл после mark, и новый mark.
+
+    mark — {"inode", "end", "sig"} с прошлого чтения (как в cached_fold).
+    lines = None, если mark нет или файл с тех пор переписан: тогда
+    вызывающий читает файл заново сам. Файла нет — (None, None).
+    """
+    try:
+        st = path.stat()
+    except OSError:
+        return None, None
+    with open(path, "rb") as f:
+        end = complete_end(f, st.st_size)
+        appendable = (
+            mark is not None
+            and mark.get("inode") == st.st_ino
+            and mark.get("end", end + 1) <= end
+            and mark.get("sig") == region_sig(f, mark["end"])
+        )
+        lines = None
+        if appendable:
+            f.seek(mark["end"])
+            lines = [l for l in f.read(end - mark["end"]).split(b"\n") if l.strip()]
+        new_mark = {"inode": st.st_ino, "end": end, "sig": region_sig(f, end)}
+    return lines, new_mark
+
+
+def decode_lines(lines: list, record=None) -> list:
+    """json.loads по строкам, битые строки пропускаются."""
+    out = []
+    for line in lines:
+        try:
+            r = json.loads(line)
+            out.append(record.from_dict(r) if record else r)
+        except Exception:
+            continue
+    return out
+
+
+def load_recent_cached(path: Path, days: int = 7, limit: int | None = 20, record=None) -> list:
+    """load_recent поверх кэша разобранного окна последних CACHED_WINDOW_DAYS.
+
+    Для 10-минутных запусков daily-inject: пока фид не менялся, записи
+    берутся из pickle без json.loads; после append разбираются только
+    новые строки. Партиционированные фиды и окна шире кэша — обычный load_recent.
+    """
+    if days > CACHED_WINDOW_DAYS or load_manifest(path):
+        return load_recent(path, days, limit, record)
+
+    def fold(window: list, lines: list) -> list:
+        floor = (datetime.now() - timedelta(days=CACHED_WINDOW_DAYS)).isoformat(timespec="seconds")
+        fresh = [l for l in lines if not _older(l, floor)]
+        window = [r for r in window if _ts_key(r) >= floor]
+        return window + decode_lines(fresh, record)
+
+    name = f"window{CACHED_WINDOW_DAYS}-{record.__name__ if record else 'dict'}"
+    window = cached_fold(path, fold, list, name)
+    cutoff = datetime.now() - timedelta(days=days)
+    records = []
+    for r in window:
+        try:
+            if record_ts(r) >= cutoff:
+                records.append(r)
+        except Exception:
+            continue
+    return records[-limit:] if limit else records
+
+
+# ---------- CLI ----------
+
+def main():
+    args = sys.argv[1:]
+    if len(args) != 2 or args[0] not in ("--reindex", "--stat"):
+        print(__doc__)
+        sys.exit(1)
+    path = Path(args[1]).expanduser()
+    if not path.exists():
+        print(f"Фид не найден: {path}")
+        sys.exit(1)
+    if args[0] == "--reindex":
+        _index_path(path).unlink(missing_ok=True)
+    idx = feed_index(path)
+    lines = sum(b[3] for b in idx["blocks"])
+    first = idx["blocks"][0][1] if idx["blocks"] else "—"
+    last = idx["blocks"][-1][2] if idx["blocks"] else "—"
+    print(f"{path.name}: {lines} записей, {len(idx['blocks'])} блоков, "
+          f"{idx['end']} байт | {first} … {last}")
+    print(f"Индекс: {_index_path(path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+feedquery.py — ленивый конвейер запросов к фидам.
+
+Вместо цепочки list comprehension (каждая — полный проход и новый список)
+шаги собираются в один генератор и выполняются за один проход:
+
+  from feedquery import query
+  top = (query(MARKET_FILE, record=Signal)
+         .window(days=3)
+         .where(lambda s: s.get("relevant_to_oleg"))
+         .dedupe_by(lambda s: s.get("url"))
+         .top_k_by(5, key=lambda s: dir_priority.get(s.get("direction", ""), 9))
+         .list())
+
+Источник — путь к фиду (записи читаются потоково через feedlib.iter_since,
+окно отрезается по ts-индексу) или любой iterable уже загруженных записей.
+
+Память ограничена независимо от размера окна: where/map/window держат
+одну запись, top_k_by — k записей (heap), last — n записей (deque),
+dedupe_by/cap_by — только ключи. Полный список появляется лишь
+в .list() / sorted().
+"""
+
+import heapq
+import sys
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import iter_since, load_tail, record_ts
+
+
+class _Rerun:
+    """Iterable шага: каждый iter() строит поток заново от источника."""
+
+    def __init__(self, make):
+        self._make = make
+
+    def __iter__(self):
+        return iter(self._make())
+
+
+class Query:
+    """Цепочка шагов над потоком записей. Каждый шаг возвращает новый Query.
+
+    Query над генератором одноразовый, как и сам генератор; Query над
+    фидом или списком (и любой производный от него) можно итерировать
+    повторно: шаг хранит не генератор, а функцию, которая строит его
+    от источника при каждом проходе.
+    """
+
+    def __init__(self, source, path: Path | None = None, record=None):
+        self._source = source
+        # Для фида, который ещё не начали читать: window/last уходят в feedlib
+        # (seek по индексу, чтение хвоста) вместо фильтра по всему файлу
+        self._path = path
+        self._record = record
+        self._cutoff = None
+
+    def _then(self, step) -> "Query":
+        """step(records) → iterator; вызывается заново на каждый проход."""
+        return Query(_Rerun(lambda: step(self._records())))
+
+    @staticmethod
+    def _lazy(build):
+        # Шаги, которым нужен весь поток (heap, deque), выполняются при первом next()
+        yield from build()
+
+    def _records(self):
+        if self._path is None:
+            return iter(self._source)
+        cutoff = self._cutoff or datetime(1970, 1, 1)
+        return iter_since(self._path, cutoff, record=self._record)
+
+    def __iter__(self):
+        return self._records()
+
+    def window(self, days: float | None = None, since: datetime | None = None,
+               until: datetime | None = None) -> "Query":
+        """Записи с since <= ts (или за последние days дней) и ts <= until."""
+        if days is not None:
+            since = datetime.now() - timedelta(days=days)
+        if self._path is not None and until is None:
+            q = Query(None, self._path, self._record)
+            q._cutoff = max(filter(None, (self._cutoff, since)), default=None)
+            return q
+
+        def gen(records):
+            for r in records:
+                try:
+                    ts = record_ts(r)
+                    if (since is None or ts >= since) and (until is None or ts <= until):
+                        yield r
+                except Exception:
+                    continue
+        return self._then(gen)
+
+    def where(self, pred) -> "Query":
+        return self._then(lambda records: (r for r in records if pred(r)))
+
+    def map(self, fn) -> "Query":
+        return self._then(lambda records: (fn(r) for r in records))
+
+    def dedupe_by(self, key) -> "Query":
+        """Первая запись на каждый ключ. Записи с пустым ключом не схлопываются."""
+        def gen(records):
+            seen = set()
+            for r in records:
+                k = key(r)
+                if k:
+                    if k in seen:
+                        continue
+                    seen.add(k)
+                yield r
+        return self._then(gen)
+
+    def cap_by(self, key, n: int) -> "Query":
+        """Не больше n записей на каждый ключ (для разнообразия категорий)."""
+        def gen(records):
+            counts = {}
+            for r in records:
+                k = key(r)
+                if counts.get(k, 0) < n:
+                    counts[k] = counts.get(k, 0) + 1
+                    yield r
+        return self._then(gen)
+
+    def top_k_by(self, k: int, key, reverse: bool = False) -> "Query":
+        """k записей с наименьшим (reverse — наибольшим) key, как sorted(...)[:k].
+        Порядок при равных ключах — порядок потока."""
+        pick = heapq.nlargest if reverse else heapq.nsmallest
+        return self._then(lambda records: self._lazy(lambda: pick(k, records, key=key)))
+
+    def last(self, n: int) -> "Query":
+        """Последние n записей потока (n=None/0 — все)."""
+        if not n:
+            return self
+        if self._path is not None:
+            cutoff = self._cutoff or datetime(1970, 1, 1)
+            return self._then(lambda _: self._lazy(lambda: load_tail(self._path, cutoff, n, self._record)))
+        return self._then(lambda records: self._lazy(lambda: deque(records, maxlen=n)))
+
+    def first(self, n: int) -> "Query":
+        def gen(records):
+            for i, r in enumerate(records):
+                if i >= n:
+                    return
+                yield r
+        return self._then(gen)
+
+    def list(self) -> list:
+        return list(self._records())
+
+    def count(self) -> int:
+        return sum(1 for _ in self._records())
+
+
+def query(source, record=None) -> Query:
+    """Query над фидом (Path) или над iterable записей."""
+    if isinstance(source, Path):
+        return Query(None, source, record)
+    return Query(source)
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+feedstore.py — опциональное SQLite-хранилище фидов, triage, алертов и решений.
+
+Источник правды остаётся прежним (JSONL/YAML в репо, брифинги в vault);
+SQLite — синхронизируемая копия для быстрых запросов на длинной истории:
+
+  items      — сигналы и идеи всех фидов (feed, ts, url, urgency, topic, body)
+  items_fts  — FTS5 по topic/signal/insight
+  triage     — записи triage-cache.jsonl (url, urgency, type, confidence, ...)
+  alerts     — alerts/active-alerts.yaml (перечитывается целиком при изменении)
+  decisions  — URL/topic из блоков с *Решение*: прошлых брифингов
+  sources    — состояние синхронизации: файл → (inode, end, sig, mtime)
+
+Синхронизация инкрементальна по offset: для каждого файла фида хранится
+end/sig (та же схема, что у ts-индекса feedlib), после append в базу идут
+только новые строки; переписанный файл (feed-partition.py --migrate)
+удаляется из базы и загружается заново.
+
+Хранилище включается созданием базы (--init). Пока базы нет, open_store()
+возвращает None и все tools работают напрямую с JSONL.
+
+Usage:
+  python3 feedstore.py --init            # создать базу и загрузить всё
+  python3 feedstore.py --sync            # догрузить изменения
+  python3 feedstore.py --search "mcp memory" [--feed claude-ideas]
+  python3 feedstore.py --stat
+
+  from feedstore import open_store
+  store = open_store()                   # None, если хранилище не включено
+  store.recent("market-intel", days=3, limit=1000)
+  store.search("agent memory", limit=10)
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from briefinglib import briefing_date, parse_decisions
+from feedlib import CACHE_DIR, complete_end, feed_files, record_ts, region_sig
+
+try:
+    import yaml as _yaml
+    _YAML_OK = True
+except ImportError:
+    _YAML_OK = False
+
+REPO = Path(__file__).parent.parent
+FEEDS = {
+    "market-intel":     REPO / "feeds" / "market-intel"     / "signals.jsonl",
+    "claude-ideas":     REPO / "feeds" / "claude-ideas"     / "ideas.jsonl",
+    "agentnet-project": REPO / "feeds" / "agentnet-project" / "signals.jsonl",
+    "personalos":       REPO / "feeds" / "personalos"       / "signals.jsonl",
+    "startup":          REPO / "feeds" / "startup"          / "signals.jsonl",
+}
+TRIAGE_CACHE = REPO / "feeds" / "triage-cache.jsonl"
+ALERTS_FILE  = REPO / "alerts" / "active-alerts.yaml"
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY, kind TEXT, feed TEXT,
+    inode INTEGER, size INTEGER, mtime_ns INTEGER, end INTEGER, sig TEXT
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY, feed TEXT, source TEXT, offset INTEGER,
+    ts TEXT, url TEXT, urgency TEXT, topic TEXT, body TEXT
+);
+CREATE INDEX IF NOT EXISTS items_feed_ts ON items (feed, ts);
+CREATE INDEX IF NOT EXISTS items_url ON items (url);
+CREATE INDEX IF NOT EXISTS items_urgency ON items (urgency);
+CREATE INDEX IF NOT EXISTS items_source ON items (source);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5 (topic, signal, insight);
+CREATE TABLE IF NOT EXISTS triage (
+    id INTEGER PRIMARY KEY, source TEXT, offset INTEGER, url TEXT, ts_triage TEXT,
+    urgency TEXT, type TEXT, confidence TEXT, already_tracked INTEGER, body TEXT
+);
+CREATE INDEX IF NOT EXISTS triage_url ON triage (url);
+CREATE INDEX IF NOT EXISTS triage_urgency ON triage (urgency);
+CREATE INDEX IF NOT EXISTS triage_source ON triage (source);
+CREATE TABLE IF NOT EXISTS alerts (
+    id TEXT PRIMARY KEY, status TEXT, severity TEXT, title TEXT, body TEXT
+);
+CREATE INDEX IF NOT EXISTS alerts_status ON alerts (status, severity);
+CREATE TABLE IF NOT EXISTS decisions (
+    briefing TEXT, day TEXT, kind TEXT, value TEXT
+);
+CREATE INDEX IF NOT EXISTS decisions_day ON decisions (day);
+CREATE INDEX IF NOT EXISTS decisions_value ON decisions (kind, value);
+"""
+
+
+def store_path() -> Path:
+    key = hashlib.sha1(str(REPO.resolve()).encode()).hexdigest()[:12]
+    return CACHE_DIR / f"feedstore-{key}.sqlite"
+
+
+def _ts_or_none(r: dict) -> str | None:
+    """ts как в фильтрах feedlib: без ts — 2000-01-01, нераспознанный/aware — None."""
+    try:
+        ts = record_ts(r)
+        if ts.tzinfo is not None:
+            return None
+        return ts.isoformat(timespec="seconds")
+    except Exception:
+        return None
+
+
+def _text(value) -> str:
+    return value if isinstance(value, str) else ""
+
+
+class FeedStore:
+    def __init__(self, path: Path):
+        self.path = path
+        self.db = sqlite3.connect(str(path), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.db.execute("INSERT OR IGNORE INTO meta VALUES ('version', ?)", (str(SCHEMA_VERSION),))
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    # ---------- синхронизация ----------
+
+    def sync(self, briefings_dir: Path | None = None) -> dict:
+        """Догружает изменения всех источников. Возвращает {источник: новых строк}."""
+        stats = {}
+        with self.db:
+            live = set()
+            for feed, head in FEEDS.items():
+                for path in feed_files(head):
+                    live.add(str(path))
+                    stats[feed] = stats.get(feed, 0) + self._sync_jsonl(path, "items", feed)
+            if TRIAGE_CACHE.exists():
+                live.add(str(TRIAGE_CACHE))
+                stats["triage"] = self._sync_jsonl(TRIAGE_CACHE, "triage", "triage")
+            gone = [p for (p,) in self.db.execute(
+                "SELECT path FROM sources WHERE kind IN ('items', 'triage')") if p not in live]
+            for p in gone:
+                self._drop(p)
+            stats["alerts"] = self._sync_alerts()
+            if briefings_dir is not None:
+                stats["decisions"] = self._sync_briefings(briefings_dir)
+        return stats
+
+    def _source(self, path: str):
+        return self.db.execute(
+            "SELECT inode, size, mtime_ns, end, sig FROM sources WHERE path = ?", (path,)
+        ).fetchone()
+
+    def _drop(self, path: str):
+        self.db.execute("DELETE FROM items_fts WHERE rowid IN "
+                        "(SELECT id FROM items WHERE source = ?)", (path,))
+        self.db.execute("DELETE FROM items WHERE source = ?", (path,))
+        self.db.execute("DELETE FROM triage WHERE source = ?", (path,))
+        self.db.execute("DELETE FROM decisions WHERE briefing = ?", (path,))
+        self.db.execute("DELETE FROM sources WHERE path = ?", (path,))
+
+    def _sync_jsonl(self, path: Path, kind: str, feed: str) -> int:
+        key = str(path)
+        st = path.stat()
+        src = self._source(key)
+        if src and src[:3] == (st.st_ino, st.st_size, st.st_mtime_ns):
+            return 0
+        with open(path, "rb") as f:
+            end = complete_end(f, st.st_size)
+            appendable = (src is not None and src[0] == st.st_ino
+                          and src[3] <= end and src[4] == region_sig(f, src[3]))
+            if not appendable and src is not None:
+                self._drop(key)
+            start = src[3] if appendable else 0
+            f.seek(start)
+            data = f.read(end - start)
+            sig = region_sig(f, end)
+
+        added = 0
+        offset = start
+        for line in data.split(b"\n"):
+            line_offset, offset = offset, offset + len(line) + 1
+            if not line.strip():
+                continue
+            try:
+                r = json.loads(line)
+                if not isinstance(r, dict):
+                    continue
+            except Exception:
+                continue
+            if kind == "items":
+                self._insert_item(feed, key, line_offset, r)
+            else:
+                self._insert_triage(key, line_offset, r)
+            added += 1
+
+        self.db.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, kind, feed, st.st_ino, st.st_size, st.st_mtime_ns, end, sig),
+        )
+        return added
+
+    def _insert_item(self, feed: str, source: str, offset: int, r: dict):
+        topic = _text(r.get("topic") or r.get("pattern") or r.get("impact"))
+        signal = _text(r.get("signal") or r.get("idea"))
+        insight = _text(r.get("insight") or r.get("trend"))
+        cur = self.db.execute(
+            "INSERT INTO items (feed, source, offset, ts, url, urgency, topic, body) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (feed, source, offset, _ts_or_none(r), _text(r.get("url")),
+             _text(r.get("urgency")), topic, json.dumps(r, ensure_ascii=False)),
+        )
+        self.db.execute("INSERT INTO items_fts (rowid, topic, signal, insight) VALUES (?, ?, ?, ?)",
+                        (cur.lastrowid, topic, signal, insight))
+
+    def _insert_triage(self, source: str, offset: int, r: dict):
+        self.db.execute(
+            "INSERT INTO triage (source, offset, url, ts_triage, urgency, type, confidence, "
+            "already_tracked, body) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (source, offset, _text(r.get("url")), _text(r.get("ts_triage")),
+             _text(r.get("urgency")), _text(r.get("type")), _text(r.get("confidence")),
+             1 if r.get("already_tracked") else 0, json.dumps(r, ensure_ascii=False)),
+        )
+
+    def _stale(self, path: Path):
+        """stat файла, если он изменился с последней записанной версии, иначе None."""
+        st = path.stat()
+        src = self._source(str(path))
+        if src and src[:3] == (st.st_ino, st.st_size, st.st_mtime_ns):
+            return None
+        return st
+
+    def _record(self, path: Path, kind: str, st):
+        """Запомнить версию файла — только после того, как он загружен."""
+        self.db.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, '', ?, ?, ?, 0, '')",
+            (str(path), kind, st.st_ino, st.st_size, st.st_mtime_ns),
+        )
+
+    def _sync_alerts(self) -> int:
+        if not ALERTS_FILE.exists() or not _YAML_OK:
+            return 0
+        st = self._stale(ALERTS_FILE)
+        if st is None:
+            return 0
+        data = _yaml.safe_load(ALERTS_FILE.read_text(encoding="utf-8")) or {}
+        self.db.execute("DELETE FROM alerts")
+        alerts = [a for a in data.get("alerts", []) if isinstance(a, dict)]
+        for a in alerts:
+            self.db.execute(
+                "INSERT OR REPLACE INTO alerts VALUES (?, ?, ?, ?, ?)",
+                (str(a.get("id", "?")), a.get("status"), a.get("severity"), a.get("title"),
+                 json.dumps(a, ensure_ascii=False, default=str)),
+            )
+        self._record(ALERTS_FILE, "alerts", st)
+        return len(alerts)
+
+    def _sync_briefings(self, briefings_dir: Path) -> int:
+        """Решения изменённых брифингов; решения удалённых брифингов — долой.
+
+        Брифинг сначала разбирается, и только потом его старые решения
+        заменяются новыми (DELETE + INSERT в транзакции sync) и записывается
+        его версия: битый файл оставляет прежние решения и разбирается снова
+        на следующем sync.
+        """
+        added = 0
+        paths = briefings_dir.glob("Брифинг *.md") if briefings_dir.exists() else ()
+        for path in paths:
+            day = briefing_date(path)
+            if day is None:
+                continue
+            try:
+                st = self._stale(path)
+                if st is None:
+                    continue
+                urls, topics = parse_decisions(path.read_text(encoding="utf-8"))
+            except Exception:
+                continue
+            rows = [(str(path), day.isoformat(), "url", u) for u in urls]
+            rows += [(str(path), day.isoformat(), "topic", t) for t in sorted(topics)]
+            self.db.execute("DELETE FROM decisions WHERE briefing = ?", (str(path),))
+            self.db.executemany("INSERT INTO decisions VALUES (?, ?, ?, ?)", rows)
+            self._record(path, "briefing", st)
+            added += len(rows)
+
+        known = {p for (p,) in self.db.execute("SELECT path FROM sources WHERE kind = 'briefing'")}
+        known.update(p for (p,) in self.db.execute("SELECT DISTINCT briefing FROM decisions"))
+        for p in known:
+            if not Path(p).exists():
+                self._drop(p)
+        return added
+
+    # ---------- запросы ----------
+
+    def query(self, sql: str, params: tuple = ()) -> list:
+        return self.db.execute(sql, params).fetchall()
+
+    def recent(self, feed: str, days: int = 7, limit: int | None = 20, record=None) -> list:
+        """Как feedlib.load_recent: записи за days дней, последние limit (по ts)."""
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat(timespec="seconds")
+        sql = "SELECT body FROM items WHERE feed = ? AND ts >= ? ORDER BY ts DESC, id DESC"
+        params = (feed, cutoff)
+        if limit:
+            sql += " LIMIT ?"
+            params += (limit,)
+        rows = [json.loads(b) for (b,) in self.db.execute(sql, params)]
+        rows.reverse()
+        return [record.from_dict(r) for r in rows] if record else rows
+
+    def search(self, text: str, feed: str | None = None, limit: int = 20) -> list:
+        """Полнотекстовый поиск по topic/signal/insight (FTS5, ранжирование bm25)."""
+        terms = " ".join(f'"{t}"' for t in text.replace('"', " ").split())
+        if not terms:
+            return []
+        sql = ("SELECT items.feed, items.body FROM items_fts JOIN items ON items.id = items_fts.rowid "
+               "WHERE items_fts MATCH ?")
+        params = (terms,)
+        if feed:
+            sql += " AND items.feed = ?"
+            params += (feed,)
+        sql += " ORDER BY bm25(items_fts) LIMIT ?"
+        params += (limit,)
+        return [dict(json.loads(body), _feed=f) for f, body in self.db.execute(sql, params)]
+
+    def triage(self, url: str) -> dict | None:
+        """Последняя triage-запись по url."""
+        row = self.db.execute(
+            "SELECT body FROM triage WHERE url = ? ORDER BY id DESC LIMIT 1", (url,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def open_alerts(self, severity: str | None = None) -> list:
+        sql = "SELECT body FROM alerts WHERE status = 'open'"
+        params = ()
+        if severity:
+            sql += " AND severity = ?"
+            params = (severity,)
+        sql += " ORDER BY rowid"
+        return [json.loads(b) for (b,) in self.db.execute(sql, params)]
+
+    def decided(self, days: int = 14) -> tuple[set[str], set[str]]:
+        """URL и topic решений из брифингов за последние days дней (не считая сегодня)."""
+        today = datetime.now().date()
+        lo, hi = (today - timedelta(days=days)).isoformat(), today.isoformat()
+        urls, topics = set(), set()
+        for kind, value in self.db.execute(
+                "SELECT kind, value FROM decisions WHERE day >= ? AND day < ?", (lo, hi)):
+            (urls if kind == "url" else topics).add(value)
+        return urls, topics
+
+
+def open_store(sync: bool = True, briefings_dir: Path | None = None) -> FeedStore | None:
+    """Хранилище, если оно включено (база создана через --init), иначе None."""
+    path = store_path()
+    if not path.exists():
+        return None
+    try:
+        store = FeedStore(path)
+        if sync:
+            store.sync(briefings_dir)
+        return store
+    except sqlite3.Error:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AgentNet: SQLite-хранилище фидов")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--init", action="store_true", help="создать базу и загрузить всё")
+    mode.add_argument("--sync", action="store_true", help="догрузить изменения")
+    mode.add_argument("--search", metavar="TEXT", help="полнотекстовый поиск")
+    mode.add_argument("--stat", action="store_true", help="размер таблиц")
+    parser.add_argument("--feed", help="ограничить поиск фидом")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--briefings", type=Path, help="папка Брифинги (для decisions)")
+    args = parser.parse_args()
+
+    path = store_path()
+    if not args.init and not path.exists():
+        print(f"Хранилище не создано: {path} — запустите --init")
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    store = FeedStore(path)
+
+    if args.init or args.sync:
+        for source, n in store.sync(args.briefings).items():
+            print(f"  {source:<18} +{n}")
+        print(f"✅ {path}")
+    elif args.search:
+        for r in store.search(args.search, args.feed, args.limit):
+            title = r.get("topic") or r.get("pattern") or r.get("impact", "")
+            print(f"[{r['_feed']}] {r.get('ts', '')[:10]} {title}  {r.get('url', '')}")
+    else:
+        for table in ("items", "triage", "alerts", "decisions"):
+            (n,) = store.query(f"SELECT count(*) FROM {table}")[0]
+            print(f"  {table:<10} {n}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+feedwriter.py — общий append-писатель JSONL-фидов с групповым коммитом.
+
+Раньше каждый продюсер (write_record в idea-triage, log-telemetry) на каждую
+запись открывал файл, брал flock и писал одну строку. AppendWriter копит
+записи в буфере и сбрасывает пачку за одно взятие flock и один write():
+
+  from feedwriter import AppendWriter, schema_from_doc
+  schema = schema_from_doc(REPO / "feeds" / "market-intel" / "README.md")
+  with AppendWriter(path, schema=schema, batch_size=256, fsync=True) as w:
+      for rec in records:
+          w.append(rec)          # ValueError (SchemaError) — запись не по схеме
+
+Гарантии:
+- Строки разных писателей не перемешиваются: пачка пишется одним write()
+  в файл с O_APPEND под fcntl.LOCK_EX.
+- Оборванной строки не остаётся: если write() записал пачку не целиком,
+  файл обрезается до размера на момент взятия lock. Если предыдущий писатель
+  упал посреди строки, следующий под lock обрезает хвост до последнего '\\n'.
+- fsync=True — fsync после каждой пачки (по умолчанию выключен, как раньше).
+- Файл подменили, пока ждали lock (triagecache.py --compact): пачка пишется
+  в новый файл, а не в удалённый старый.
+- atomic=True — пачка видна читателям целиком или никак. Перед write()
+  кладётся маркер ~/.cache/agentnet/pending/<feed>-<hash пути>.pending
+  (не в рабочем дереве git) с inode и offset начала пачки и снимается после. Писатель упал посреди пачки — маркер остаётся, и
+  следующий писатель (или компакция) под lock обрезает файл до этого
+  offset. Читатели берут конец файла через committed_end: под LOCK_SH
+  и не дальше незавершённой пачки.
+
+Схема берётся из README фида (первый ```json блок после заголовка со словом
+Schema): известные поля проверяются по типу значения из примера, null
+допустим всегда, лишние поля разрешены. required — поля, без которых запись
+не пишется (по умолчанию только ts).
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from feedlib import CACHE_DIR, complete_end
+
+PENDING_DIR = CACHE_DIR / "pending"
+
+
+class SchemaError(ValueError):
+    pass
+
+
+class Schema:
+    def __init__(self, fields: dict, required: tuple = ("ts",)):
+        self.fields = fields          # поле → тип (str/bool/int/float/list/dict) или None
+        self.required = tuple(required)
+
+    @classmethod
+    def from_fields(cls, names, required: tuple = ("ts",)) -> "Schema":
+        return cls({n: None for n in names}, required)
+
+    def errors(self, record) -> list:
+        if not isinstance(record, dict):
+            return [f"запись должна быть объектом, а не {type(record).__name__}"]
+        errs = [f"нет поля {f}" for f in self.required if f not in record]
+        for key, expected in self.fields.items():
+            value = record.get(key)
+            if value is None or expected is None:
+                continue
+            ok = (type(value) is bool) if expected is bool else \
+                 (isinstance(value, expected) and not isinstance(value, bool))
+            if expected is float and isinstance(value, int) and not isinstance(value, bool):
+                ok = True
+            if not ok:
+                errs.append(f"{key}: ожидался {expected.__name__}, получен {type(value).__name__}")
+        return errs
+
+    def check(self, record):
+        errs = self.errors(record)
+        if errs:
+            raise SchemaError("; ".join(errs))
+
+
+_SCHEMA_BLOCK = re.compile(r"^#+ [^\n]*Schema[^\n]*\n.*?```json\n(.*?)```", re.MULTILINE | re.DOTALL)
+
+
+def schema_from_doc(doc: Path, required: tuple = ("ts",)) -> Schema:
+    """Схема из первого ```json примера после заголовка «... Schema» в README/спеке."""
+    text = doc.read_text(encoding="utf-8")
+    m = _SCHEMA_BLOCK.search(text)
+    if not m:
+        raise SchemaError(f"{doc}: нет ```json блока после заголовка со Schema")
+    example = json.loads(m.group(1))
+    return Schema({k: type(v) if v is not None else None for k, v in example.items()}, required)
+
+
+def pending_path(path: Path) -> Path:
+    key = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:16]
+    return PENDING_DIR / f"{path.name}-{key}.pending"
+
+
+def _pending_start(path: Path, inode: int) -> int | None:
+    """Offset незавершённой пачки в файле inode или None."""
+    try:
+        marker = json.loads(pending_path(path).read_text(encoding="utf-8"))
+        if marker["inode"] == inode:
+            return marker["start"]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def rollback_pending(fd: int, path: Path) -> bool:
+    """Под LOCK_EX: откатывает пачку упавшего atomic-писателя. True — был откат."""
+    marker = pending_path(path)
+    if not marker.exists():
+        return False
+    start = _pending_start(path, os.fstat(fd).st_ino)
+    if start is not None and os.fstat(fd).st_size > start:
+        os.ftruncate(fd, start)
+    marker.unlink(missing_ok=True)     # маркер от подменённого файла — просто убираем
+    return start is not None
+
+
+def committed_end(f, path: Path) -> int:
+    """Конец целых строк файла f без незавершённой atomic-пачки (для читателей)."""
+    fd = f.fileno()
+    fcntl.flock(fd, fcntl.LOCK_SH)
+    try:
+        end = complete_end(f, os.fstat(fd).st_size)
+        start = _pending_start(path, os.fstat(fd).st_ino)
+        return end if start is None else min(end, start)
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def _repair_tail(fd: int, size: int) -> int:
+    """Обрезает недописанную последнюю строку (без '\\n'). Возвращает новый размер."""
+    if size == 0:
+        return 0
+    pos = size
+    while pos > 0:
+        step = min(4096, pos)
+        buf = os.pread(fd, step, pos - step)
+        if pos == size and buf.endswith(b"\n"):
+            return size
+        nl = buf.rfind(b"\n")
+        if nl != -1:
+            pos = pos - step + nl + 1
+            break
+        pos -= step
+    os.ftruncate(fd, pos)
+    return pos
+
+
+class AppendWriter:
+    """Буферизованный писатель с групповым коммитом. Потокобезопасен."""
+
+    def __init__(self, path: Path, schema: Schema | None = None,
+                 batch_size: int | None = 256, fsync: bool = False, atomic: bool = False):
+        self.path = Path(path)
+        self.schema = schema
+        self.batch_size = batch_size      # None — копить до flush()
+        self.fsync = fsync
+        self.atomic = atomic
+        self._buf: list[bytes] = []
+        self._mutex = threading.Lock()
+        self.written = 0
+        self.batches = 0
+
+    def append(self, record: dict):
+        if self.schema is not None:
+            self.schema.check(record)
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+        with self._mutex:
+            self._buf.append(line)
+            if self.batch_size is not None and len(self._buf) >= self.batch_size:
+                self._commit()
+
+    def flush(self):
+        with self._mutex:
+            self._commit()
+
+    def _commit(self):
+        if not self._buf:
+            return
+        data = b"".join(self._buf)
+        fd = self._open_locked()
+        try:
+            try:
+                rollback_pending(fd, self.path)
+                start = _repair_tail(fd, os.fstat(fd).st_size)
+                if self.atomic:
+                    self._mark_pending(fd, start)
+                try:
+                    n = os.write(fd, data)
+                except OSError:
+                    n = -1
+                if n != len(data):
+                    # Пачка целиком или никак: хвост откатываем, записи остаются в буфере
+                    os.ftruncate(fd, start)
+                    pending_path(self.path).unlink(missing_ok=True)
+                    raise OSError(f"{self.path}: неполная запись пачки ({n}/{len(data)} байт)")
+                if self.fsync:
+                    os.fsync(fd)
+                if self.atomic:
+                    pending_path(self.path).unlink()
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+        self.written += len(self._buf)
+        self.batches += 1
+        self._buf = []
+
+    def _mark_pending(self, fd: int, start: int):
+        marker = pending_path(self.path)
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        tmp = marker.with_name(f"{marker.name}.tmp{os.getpid()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"inode": os.fstat(fd).st_ino, "start": start}, f)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, marker)
+
+    def _open_locked(self) -> int:
+        """fd файла под LOCK_EX; если файл подменили (rename), пока ждали lock, — заново."""
+        flags = os.O_RDWR | os.O_APPEND | os.O_CREAT
+        while True:
+            try:
+                fd = os.open(self.path, flags, 0o644)
+            except FileNotFoundError:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd = os.open(self.path, flags, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.stat(self.path).st_ino == os.fstat(fd).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+fswatch.py — ожидание изменений в наборе каталогов: inotify или опрос.
+
+Для долгоживущих процессов (daily-inject --daemon): вместо запуска по
+таймеру — реакция на изменение файлов через секунды после записи.
+
+- Linux: inotify через ctypes (без зависимостей). Следятся каталоги, а не
+  файлы: фиды дописываются, YAML и индексы подменяются через tmp + rename —
+  и то и другое видно как событие в каталоге с именем файла.
+- Остальные системы (macOS) или inotify недоступен: опрос — раз в poll
+  секунд снимок (inode, size, mtime_ns) файлов каталогов, без рекурсии.
+
+  from fswatch import Watcher
+  with Watcher([feeds_dir, tasks_dir], ignore=lambda p: p.name.endswith(".idx")) as w:
+      changed = w.wait(timeout=600)       # set[Path], пустой — таймаут
+      changed |= w.settle(quiet=2.0)      # дождаться конца пачки записей
+
+settle — debounce: продюсер пишет пачками (AppendWriter, compact,
+sync-tasks.sh), и пересборка после каждого события пачки бесполезна.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ONLYDIR = 0x01000000
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_ONLYDIR)
+
+_EVENT = struct.Struct("iIII")    # wd, mask, cookie, len (struct inotify_event)
+POLL_INTERVAL = 5.0
+
+
+class _Inotify:
+    def __init__(self, dirs: list):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.dirs: dict[int, Path] = {}
+        for d in dirs:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(d), WATCH_MASK)
+            if wd >= 0:
+                self.dirs[wd] = d
+        if not self.dirs:
+            os.close(self.fd)
+            raise OSError("inotify: ни один каталог не доступен")
+
+    def read(self, timeout: float) -> set:
+        """Изменённые пути за время ожидания; переполнение очереди — все каталоги."""
+        ready, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if not ready:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos + _EVENT.size <= len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, pos)
+                name = data[pos + _EVENT.size:pos + _EVENT.size + length].rstrip(b"\0")
+                pos += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    changed.update(self.dirs.values())
+                elif wd in self.dirs and name:
+                    changed.add(self.dirs[wd] / os.fsdecode(name))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _Poller:
+    def __init__(self, dirs: list, poll: float):
+        self.dirs = dirs
+        self.poll = poll
+        self.state = self._snapshot()
+
+    def _snapshot(self) -> dict:
+        state = {}
+        for d in self.dirs:
+            try:
+                with os.scandir(d) as it:
+                    for e in it:
+                        try:
+                            st = e.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        state[d / e.name] = (st.st_ino, st.st_size, st.st_mtime_ns)
+            except OSError:
+                continue
+        return state
+
+    def read(self, timeout: float) -> set:
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            current = self._snapshot()
+            changed = {p for p in current.keys() | self.state.keys()
+                       if current.get(p) != self.state.get(p)}
+            self.state = current
+            left = deadline - time.monotonic()
+            if changed or left <= 0:
+                return changed
+            time.sleep(min(self.poll, left))
+
+    def close(self):
+        pass
+
+
+class Watcher:
+    """Изменения файлов в каталогах dirs (без рекурсии); ignore(path) — отбросить событие."""
+
+    def __init__(self, dirs, ignore=None, poll: float = POLL_INTERVAL, force_poll: bool = False):
+        self.dirs = [Path(d) for d in dict.fromkeys(dirs) if Path(d).is_dir()]
+        self.ignore = ignore
+        self._impl = None
+        if not force_poll and sys.platform.startswith("linux"):
+            try:
+                self._impl = _Inotify(self.dirs)
+            except (OSError, AttributeError):
+                self._impl = None
+        self.backend = "inotify" if self._impl is not None else "poll"
+        if self._impl is None:
+            self._impl = _Poller(self.dirs, poll)
+
+    def _filter(self, paths: set) -> set:
+        return {p for p in paths if not (self.ignore and self.ignore(p))}
+
+    def wait(self, timeout: float) -> set:
+        """Ждёт первое изменение не дольше timeout секунд; set() — таймаут."""
+        deadline = time.monotonic() + timeout
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return set()
+            changed = self._filter(self._impl.read(left))
+            if changed:
+                return changed
+
+    def settle(self, quiet: float = 2.0, limit: float = 30.0) -> set:
+        """Debounce: собирает изменения, пока нет паузы в quiet секунд (не дольше limit)."""
+        changed = set()
+        deadline = time.monotonic() + limit
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return changed
+            more = self._filter(self._impl.read(min(quiet, left)))
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self):
+        self._impl.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -25,6 +25,9 @@ from pathlib import Path
 
 import yaml
 
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import load_since
+
 REPO         = Path(__file__).parent.parent
 CLAUDE_IDEAS = REPO / "feeds" / "claude-ideas" / "ideas.jsonl"
 AGENTNET_SIG = REPO / "feeds" / "agentnet-project" / "signals.jsonl"
@@ -104,22 +107,7 @@ def _save_run_ts():
 
 def _load_new_ideas() -> list:
     """Загружает claude-ideas, появившиеся после последнего прогона."""
-    if not CLAUDE_IDEAS.exists():
-        return []
-    cutoff = _last_run_ts()
-    ideas = []
-    for line in CLAUDE_IDEAS.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            r = json.loads(line)
-            ts = datetime.fromisoformat(r.get("ts", "2000-01-01T00:00:00"))
-            if ts > cutoff:
-                ideas.append(r)
-        except Exception:
-            continue
-    return ideas
+    return load_since(CLAUDE_IDEAS, _last_run_ts(), strict=True)
 
 
 def _load_open_pains() -> list:
@@ -8,26 +8,67 @@ idea-triage.py — Idea Triage Agent (keyword-based).
 Читает: signals.jsonl, ideas.jsonl (последние N дней)
         SURVEILLANCE-CONFIG.md (tracked topics для дедупликации)
 Пишет: feeds/triage-cache.jsonl  (url → {urgency, type, confidence})
+       ~/.cache/agentnet/idea-triage-checkpoint.json (докуда прочитаны фиды)
 Запуск: cron 06:15 (после rss-collector 06:00, до daily-inject 06:30)
 
 v2: keyword-based вместо Ollama. Мгновенная обработка, без лимита батча.
 
+Инкрементальный запуск: checkpoint хранит для каждого фида offset
+прочитанного, читаются только дописанные строки. Если фид переписан
+(feed-partition.py --migrate, git pull с новым inode), он читается заново
+за всё окно DAYS_BACK: в переписанном фиде могут быть вмерженные записи
+старше прошлого чтения, а уже триажированные отсекает join с triage-cache.
+Если подменён или удалён сам triage-cache, checkpoint фидов сбрасывается
+и окно триажится заново по той же причине. Статистика кэша тоже обновляется
+на записанные за запуск URL, полный разбор — только если triage-cache
+менял кто-то ещё.
+
+Перетриаж истории (после смены наборов ключевых слов):
+  python3 idea-triage.py --rebuild --since 2025-10-01 [--workers 8]
+Окно фидов режется на диапазоны по ts-индексу, диапазоны триажатся
+пулом процессов, результаты пишет один AppendWriter во временный сегмент,
+который затем атомарно подменяет записи этих URL в triage-cache
+(triagecache.compact, last writer wins).
+
+Каждая запись кэша хранит вектор признаков (features: счётчики по
+наборам, hot_hits, is_generic, has_action, relevant) с версиями
+features_v и rules. Поменялись только пороги в decide — хватает
+  python3 idea-triage.py --redecide
+решения пересчитываются по признакам без текста, в лог идут URL,
+у которых изменилась urgency.
+
 Urgency: hot | warm | cold
 Type:    инфра | клод | бизнес | знание | шум
 Confidence: high (детерминированные правила)
 """
 
+import argparse
+import hashlib
 import json
+import os
 import re
-import fcntl
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
 AGENTNET = Path.home() / "agentnet-pilot"
+sys.path.insert(0, str(AGENTNET / "tools"))
+from feedlib import (CACHE_DIR, TriageEntry, cached, decode_lines, iter_range, load_since,
+                     read_appended, record_ts, window_ranges)
+from feedwriter import AppendWriter, Schema
+from kwmatch import KeywordMatcher
+from triagecache import TriageCache, compact, url_key
+from urlindex import url_index
+
 SIGNALS_FILE = AGENTNET / "feeds" / "market-intel" / "signals.jsonl"
 IDEAS_FILE   = AGENTNET / "feeds" / "claude-ideas" / "ideas.jsonl"
 TRIAGE_CACHE = AGENTNET / "feeds" / "triage-cache.jsonl"
 LOG_FILE     = Path.home() / "logs" / "idea-triage.log"
+CHECKPOINT   = CACHE_DIR / "idea-triage-checkpoint.json"
+CHECKPOINT_VERSION = 1
+
+FEED_FILES = {"signals": SIGNALS_FILE, "ideas": IDEAS_FILE}
 
 _VAULT_CANDIDATES = [
     Path.home() / "obsidian-vault",
@@ -94,6 +135,24 @@ _KW_HOT = {
     "income", "доход", "монетиз", "учёный",
 }
 
+# Все наборы — один автомат, собирается при импорте (см. kwmatch.py)
+_KW_MATCHER = KeywordMatcher({
+    "клод": _KW_CLAUDE,
+    "инфра": _KW_INFRA,
+    "бизнес": _KW_BUSINESS,
+    "шум": _KW_NOISE,
+    "hot": _KW_HOT,
+})
+_GENERIC_MATCHER = KeywordMatcher({"generic": _GENERIC_PHRASES})
+
+# Версии в каждой записи кэша (см. --redecide). FEATURES_VERSION меняется
+# сам при правке наборов слов (признаки надо считать заново, по тексту);
+# RULES_VERSION — вручную, при правке лестницы в decide.
+FEATURES_VERSION = "1-" + hashlib.blake2b(json.dumps(
+    [sorted(s) for s in (_KW_CLAUDE, _KW_INFRA, _KW_BUSINESS, _KW_NOISE, _KW_HOT, _GENERIC_PHRASES)],
+    ensure_ascii=False).encode("utf-8"), digest_size=6).hexdigest()
+RULES_VERSION = 1
+
 
 def log(msg: str):
     LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
@@ -102,18 +161,25 @@ def log(msg: str):
         f.write(f"{ts} [idea-triage] {msg}\n")
 
 
-def load_triage_cache() -> dict:
-    """url → triage dict"""
-    cache = {}
-    if not TRIAGE_CACHE.exists():
-        return cache
-    for line in TRIAGE_CACHE.read_text(encoding="utf-8").splitlines():
-        try:
-            r = json.loads(line)
-            cache[r["url"]] = r
-        except Exception:
-            pass
-    return cache
+def load_checkpoint() -> dict:
+    """feeds: {feed: {inode, end, sig}}, stats: статистика кэша + его mark."""
+    try:
+        cp = json.loads(CHECKPOINT.read_text(encoding="utf-8"))
+        if cp.get("version") == CHECKPOINT_VERSION:
+            return cp
+    except (OSError, ValueError):
+        pass
+    return {"version": CHECKPOINT_VERSION, "feeds": {}, "stats": None}
+
+
+def save_checkpoint(cp: dict):
+    try:
+        CHECKPOINT.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CHECKPOINT.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_text(json.dumps(cp, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, CHECKPOINT)
+    except OSError as e:
+        log(f"checkpoint не сохранён: {e}")
 
 
 def load_tracked_topics() -> list[dict]:
@@ -139,42 +205,82 @@ def load_tracked_topics() -> list[dict]:
                     topics.append({"theme": theme, "status": "active", "task": task})
         elif in_table and not line.startswith("|"):
             break
-    log(f"Tracked topics: {len(topics)} ({sum(1 for t in topics if t['status'] == 'closed')} closed)")
     return topics
 
 
-def is_already_tracked(item: dict, tracked: list[dict]) -> str | None:
-    """Проверяет совпадение сигнала с tracked topic. Возвращает тему или None."""
-    text = build_text(item).lower()
-    for t in tracked:
-        keywords = [w.lower() for w in re.findall(r'[a-zA-Zа-яА-ЯёЁ]{4,}', t["theme"])]
-        if not keywords:
-            continue
-        matches = sum(1 for kw in keywords if kw in text)
-        if matches >= 2 or (len(keywords) <= 2 and matches >= 1):
-            return t["theme"]
+_THEME_WORD = re.compile(r'[a-zA-Zа-яА-ЯёЁ]{4,}')
+
+
+def build_tracked_index(topics: list[dict]) -> dict:
+    """Tracked topics → инвертированный индекс keyword → [(№ темы, кратность)].
+
+    Ключевые слова темы — слова от 4 букв из её названия; все слова всех
+    тем собраны в один KeywordMatcher, текст записи проходится один раз.
+    """
+    themes, need = {}, []
+    for no, t in enumerate(topics):
+        keywords = [w.lower() for w in _THEME_WORD.findall(t["theme"])]
+        need.append(len(keywords))
+        for kw in set(keywords):
+            themes.setdefault(kw, []).append((no, keywords.count(kw)))
+    return {"topics": topics, "need": need, "themes": themes,
+            "matcher": KeywordMatcher({"tracked": themes})}
+
+
+def load_tracked_index() -> dict:
+    """Индекс tracked topics; пересобирается только при изменении SURVEILLANCE-CONFIG."""
+    return cached(SURVEILLANCE_CONFIG, lambda _: build_tracked_index(load_tracked_topics()),
+                  "idea-triage-tracked")
+
+
+def is_already_tracked(item: dict, tracked: dict) -> str | None:
+    """Проверяет совпадение сигнала с tracked topic. Возвращает тему или None.
+
+    Тема совпала, если в тексте есть 2 её ключевых слова (подстрокой), а для
+    темы из 1–2 слов — хотя бы одно. При нескольких совпавших — первая по конфигу.
+    """
+    hits = {}
+    for kw in tracked["matcher"].found(build_text(item).lower()):
+        for no, n in tracked["themes"][kw]:
+            hits[no] = hits.get(no, 0) + n
+    for no in sorted(hits):
+        if hits[no] >= 2 or (tracked["need"][no] <= 2 and hits[no] >= 1):
+            return tracked["topics"][no]["theme"]
     return None
 
 
-def load_recent_items() -> list:
-    cutoff = datetime.now() - timedelta(days=DAYS_BACK)
-    items = []
+def _in_window(r, cutoff: datetime) -> bool:
+    try:
+        return isinstance(r, dict) and record_ts(r) >= cutoff
+    except Exception:
+        return False
 
-    for path in [SIGNALS_FILE, IDEAS_FILE]:
-        if not path.exists():
-            continue
-        feed = "signals" if "market-intel" in str(path) else "ideas"
-        for line in path.read_text(encoding="utf-8").splitlines():
-            try:
-                r = json.loads(line.strip())
-                ts = datetime.fromisoformat(r.get("ts", "2000-01-01T00:00:00"))
-                if ts >= cutoff:
-                    r["_feed"] = feed
-                    items.append(r)
-            except Exception:
-                pass
 
-    return items
+def load_recent_items(checkpoint: dict | None = None) -> tuple[list, dict]:
+    """Свежие записи (за DAYS_BACK дней) и новые marks фидов для checkpoint.
+
+    С checkpoint читаются только строки, дописанные после прошлого запуска;
+    переписанный фид — всё окно заново.
+    """
+    cutoff = datetime.now() - timedelta(days=DAYS_BACK)
+    seen = (checkpoint or {}).get("feeds", {})
+    items, marks = [], {}
+
+    for feed, path in FEED_FILES.items():
+        prev = seen.get(feed)
+        # mark берётся до чтения: дописанное во время запуска прочитается в следующий раз
+        lines, mark = read_appended(path, prev)
+        if lines is not None:
+            records = [r for r in decode_lines(lines) if _in_window(r, cutoff)]
+        else:
+            records = load_since(path, cutoff)
+        for r in records:
+            r["_feed"] = feed
+        items.extend(records)
+        if mark:
+            marks[feed] = mark
+
+    return items, marks
 
 
 def build_text(item: dict) -> str:
@@ -195,29 +301,38 @@ def build_text(item: dict) -> str:
     return " ".join(parts) or item.get("url", "")
 
 
-def _count_kw_hits(text: str, kw_set: set) -> int:
-    """Считает сколько ключевых слов из набора встречаются в тексте."""
-    return sum(1 for kw in kw_set if kw in text)
-
+def triage_features(item: dict) -> dict:
+    """Вектор признаков записи — всё, что keyword_triage берёт из текста.
 
-def keyword_triage(item: dict) -> dict:
-    """Классифицирует запись по keyword rules. Всегда возвращает результат."""
+    Дорогая часть триажа (проходы по тексту); хранится в triage-cache
+    рядом с решением, чтобы decide можно было перезапустить без текста.
+    """
     text = build_text(item).lower()
-    relevant = item.get("relevant_to_oleg", False)
-    has_action = bool(item.get("action") and item.get("why"))
-    feed = item.get("_feed", "?")
-
-    # --- Generic signal detection ---
+    # Сколько разных слов каждого набора в тексте — за один проход
+    scores = _KW_MATCHER.counts(text)
+    hot_hits = scores.pop("hot")
     signal_text = (item.get("signal", "") or "").lower()
-    is_generic = any(phrase in signal_text for phrase in _GENERIC_PHRASES)
+    return {
+        "scores": scores,
+        "hot_hits": hot_hits,
+        "is_generic": _GENERIC_MATCHER.any(signal_text),
+        "has_action": bool(item.get("action") and item.get("why")),
+        "relevant": bool(item.get("relevant_to_oleg", False)),
+    }
+
+
+def decide(features: dict, feed: str) -> dict:
+    """Лестница правил по вектору признаков: тип и urgency. Текст не нужен.
+
+    Поменяли пороги или порядок правил — увеличьте RULES_VERSION.
+    """
+    scores = features["scores"]
+    hot_hits = features["hot_hits"]
+    is_generic = features["is_generic"]
+    has_action = features["has_action"]
+    relevant = features["relevant"]
 
     # --- Type ---
-    scores = {
-        "клод": _count_kw_hits(text, _KW_CLAUDE),
-        "инфра": _count_kw_hits(text, _KW_INFRA),
-        "бизнес": _count_kw_hits(text, _KW_BUSINESS),
-        "шум": _count_kw_hits(text, _KW_NOISE),
-    }
     best_type = max(scores, key=scores.get)
     if is_generic and not has_action:
         item_type = "шум"
@@ -229,8 +344,6 @@ def keyword_triage(item: dict) -> dict:
         item_type = best_type
 
     # --- Urgency ---
-    hot_hits = _count_kw_hits(text, _KW_HOT)
-
     if item_type == "шум":
         urgency = "cold"
         reason = "noise keywords"
@@ -266,75 +379,268 @@ def keyword_triage(item: dict) -> dict:
     }
 
 
+def keyword_triage(item: dict) -> dict:
+    """Классифицирует запись по keyword rules. Всегда возвращает результат."""
+    return decide(triage_features(item), item.get("_feed", "?"))
+
+
+# Записи запуска копятся в буфере и уходят в triage-cache одной пачкой:
+# один flock, один write(); atomic — читатели (daily-inject) не видят
+# пачку частично, пачку упавшего запуска откатит следующий писатель
+_WRITER = AppendWriter(TRIAGE_CACHE, schema=Schema.from_fields(
+    TriageEntry.FIELDS, required=("url", "urgency", "ts_triage")),
+    batch_size=None, atomic=True)
+
+
 def write_record(record: dict):
-    """Append record to triage cache with file lock."""
-    with open(TRIAGE_CACHE, "a", encoding="utf-8") as f:
-        fcntl.flock(f, fcntl.LOCK_EX)
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
-        f.flush()
-        fcntl.flock(f, fcntl.LOCK_UN)
+    """Append record to triage cache (one atomic batch per run, see feedwriter)."""
+    _WRITER.append(record)
+
+
+def triage_item(item: dict, tracked: dict) -> dict:
+    """Запись для triage-cache: already tracked по SURVEILLANCE-CONFIG или keyword_triage."""
+    record = {
+        "url": item["url"],
+        "feed": item.get("_feed", "?"),
+        "ts_item": item.get("ts", ""),
+        "ts_triage": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    # Дедупликация по SURVEILLANCE-CONFIG
+    tracked_theme = is_already_tracked(item, tracked)
+    if tracked_theme:
+        record.update({
+            "urgency": "cold",
+            "type": "знание",
+            "confidence": "high",
+            "reason": f"already tracked: {tracked_theme}",
+            "already_tracked": True,
+        })
+        return record
+    features = triage_features(item)
+    result = decide(features, record["feed"])
+    record.update({
+        "urgency": result["urgency"],
+        "type": result["type"],
+        "confidence": result["confidence"],
+        "reason": result["reason"],
+        "features": features,
+        "features_v": FEATURES_VERSION,
+        "rules": RULES_VERSION,
+    })
+    return record
+
+
+# ---------- --rebuild ----------
+
+_REBUILD = {}   # tracked index и cutoff в процессе-воркере (initializer пула)
+
+
+def _init_rebuild_worker(tracked: dict, since: datetime):
+    _REBUILD.update(tracked=tracked, since=since)
+
+
+def _rebuild_range(task: tuple) -> list:
+    feed, path, start, end = task
+    out = []
+    for r in iter_range(path, start, end, _REBUILD["since"]):
+        if isinstance(r, dict) and r.get("url"):
+            r["_feed"] = feed
+            out.append(triage_item(r, _REBUILD["tracked"]))
+    return out
+
+
+def merge_into_cache(records) -> tuple[int, int, int]:
+    """Записи → временный сегмент → compact: в кэше они заменяют записи тех же URL.
+
+    Читатели видят кэш либо до, либо после подмены целиком.
+    Возвращает (записано, строк в кэше было, записей стало).
+    """
+    segment = TRIAGE_CACHE.with_name(f".{TRIAGE_CACHE.stem}-merge{os.getpid()}.jsonl")
+    writer = AppendWriter(segment, schema=_WRITER.schema, batch_size=4096)
+    try:
+        for record in records:
+            writer.append(record)
+        writer.flush()
+        lines, kept = compact(TRIAGE_CACHE, extra=segment if writer.written else None)
+    finally:
+        segment.unlink(missing_ok=True)
+    return writer.written, lines, kept
+
+
+def rebuild(since: datetime, workers: int):
+    """Перетриаж всех записей фидов с since; записи этих URL в кэше заменяются."""
+    started = datetime.now()
+    tracked = load_tracked_index()
+    tasks = [(feed, file, start, end)
+             for feed, path in FEED_FILES.items()
+             for file, start, end in window_ranges(path, since)]
+    log(f"Rebuild с {since:%Y-%m-%d}: {len(tasks)} диапазонов, воркеров: {workers}")
+
+    by_urgency = {"hot": 0, "warm": 0, "cold": 0}
+
+    def records():
+        with ProcessPoolExecutor(workers, initializer=_init_rebuild_worker,
+                                 initargs=(tracked, since)) as pool:
+            # map сохраняет порядок диапазонов — записи идут в порядке фидов
+            for batch in pool.map(_rebuild_range, tasks):
+                for record in batch:
+                    by_urgency[record["urgency"]] = by_urgency.get(record["urgency"], 0) + 1
+                    yield record
+
+    written, lines, kept = merge_into_cache(records())
+    elapsed = (datetime.now() - started).total_seconds()
+    log(f"Rebuild: {written} записей за {elapsed:.1f}s | "
+        f"hot={by_urgency.get('hot', 0)} warm={by_urgency.get('warm', 0)} cold={by_urgency.get('cold', 0)}")
+    log(f"Кэш после rebuild: {lines} строк → {kept} записей")
+
+
+# ---------- --redecide ----------
+
+def redecide():
+    """Решения кэша заново по сохранённым признакам, без чтения фидов.
+
+    Переписываются записи, у которых изменилось решение или устарел
+    RULES_VERSION. Записи без признаков или с признаками от других
+    наборов слов (FEATURES_VERSION) не трогаются — для них нужен --rebuild.
+    """
+    started = datetime.now()
+    cache = TriageCache(TRIAGE_CACHE)
+    changed, updated = [], []
+    tracked = stale = 0
+    try:
+        for r in cache.latest():
+            if r.get("already_tracked"):
+                tracked += 1
+                continue
+            if not r.get("features") or r.get("features_v") != FEATURES_VERSION:
+                stale += 1
+                continue
+            result = decide(r["features"], r.get("feed", "?"))
+            if r.get("rules") == RULES_VERSION and all(r.get(k) == v for k, v in result.items()):
+                continue
+            if r.get("urgency") != result["urgency"]:
+                changed.append((r["url"], r.get("urgency"), result["urgency"], result["reason"]))
+            updated.append({**r, **result, "rules": RULES_VERSION,
+                            "ts_triage": datetime.now().strftime("%Y-%m-%dT%H:%M:%S")})
+    finally:
+        cache.close()
+
+    written, lines, kept = merge_into_cache(updated) if updated else (0, 0, 0)
+    elapsed = (datetime.now() - started).total_seconds()
+    log(f"Redecide (rules v{RULES_VERSION}): переписано {written} за {elapsed:.1f}s, "
+        f"urgency изменилась у {len(changed)} | tracked: {tracked}, без актуальных признаков: {stale}")
+    for url, before, after, reason in changed:
+        log(f"  {before} → {after}: {url} ({reason})")
+    if stale:
+        log(f"  {stale} записей без признаков {FEATURES_VERSION} — нужен --rebuild --since")
+    if written:
+        log(f"Кэш после redecide: {lines} строк → {kept} записей")
+    return changed
+
+
+def _full_cache_stats() -> dict:
+    _, mark = read_appended(TRIAGE_CACHE, None)
+    total, urgency = 0, {"hot": 0, "warm": 0, "cold": 0}
+    cache = TriageCache(TRIAGE_CACHE)
+    for r in cache.latest():
+        total += 1
+        if r.get("urgency") in urgency:
+            urgency[r["urgency"]] += 1
+    cache.close()
+    return {"mark": mark, "total": total, "urgency": urgency}
+
+
+def cache_stats(stats: dict | None, written: dict, records: int) -> dict:
+    """Статистика triage-cache после запуска.
+
+    stats — статистика с прошлого запуска (валидна, если кэш с тех пор не
+    менялся), written — url → urgency записанных сейчас URL (все новые для
+    кэша), records — сколько строк дописано. Если кроме наших строк в кэш
+    писал кто-то ещё — полный подсчёт.
+    """
+    if stats is not None:
+        lines, mark = read_appended(TRIAGE_CACHE, stats["mark"])
+        if lines is not None and len(lines) == records:
+            urgency = dict(stats["urgency"])
+            for u in written.values():
+                urgency[u] = urgency.get(u, 0) + 1
+            return {"mark": mark, "total": stats["total"] + len(written), "urgency": urgency}
+    return _full_cache_stats()
 
 
 def main():
-    log("Запуск idea-triage (keyword-based v2)")
-    cache = load_triage_cache()
-    items = load_recent_items()
-    tracked = load_tracked_topics()
+    parser = argparse.ArgumentParser(description="AgentNet: Idea Triage (keyword-based)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="перетриажить историю с --since и заменить записи в кэше")
+    parser.add_argument("--redecide", action="store_true",
+                        help="пересчитать решения кэша по сохранённым признакам (после правки порогов)")
+    parser.add_argument("--since", type=lambda v: datetime.strptime(v, "%Y-%m-%d"),
+                        metavar="YYYY-MM-DD", help="начало окна для --rebuild")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="процессов для --rebuild (по умолчанию — число ядер)")
+    args = parser.parse_args()
+    if args.rebuild:
+        if args.since is None:
+            parser.error("--rebuild требует --since YYYY-MM-DD")
+        log("Запуск idea-triage --rebuild")
+        rebuild(args.since, max(1, args.workers))
+        return
+    if args.redecide:
+        log("Запуск idea-triage --redecide")
+        redecide()
+        return
 
-    new_items = [i for i in items if i.get("url") and i["url"] not in cache]
+    log("Запуск idea-triage (keyword-based v2)")
+    checkpoint = load_checkpoint()
+    stats = checkpoint.get("stats")
+    if stats is not None:
+        appended = read_appended(TRIAGE_CACHE, stats["mark"])[0]
+        if appended is None:
+            # Кэш подменён или удалён: прочитанное фидов могло в нём пропасть
+            checkpoint["feeds"] = {}
+        if appended != []:
+            stats = None    # кэш менялся не нами — посчитаем заново в конце
+    items, marks = load_recent_items(checkpoint)
+    tracked = load_tracked_index()
+    topics = tracked["topics"]
+    if SURVEILLANCE_CONFIG.exists():
+        log(f"Tracked topics: {len(topics)} ({sum(1 for t in topics if t['status'] == 'closed')} closed)")
+
+    # Join по реестру URL: уже триажированные — те, что встречаются в triage-cache
+    index = url_index()
+    new_items = [i for i in items if i.get("url") and not index.seen_in(i["url"], "triage")]
     log(f"Всего свежих: {len(items)}, не в кэше: {len(new_items)}")
 
     if not new_items:
+        # mark кэша нужен и здесь: по нему следующий запуск заметит подмену кэша
+        save_checkpoint({**checkpoint, "feeds": marks, "stats": stats or _full_cache_stats()})
         log("Всё уже в кэше — выход")
         return
 
     processed = 0
     skipped_tracked = 0
     by_urgency = {"hot": 0, "warm": 0, "cold": 0}
+    written = {}    # URL (нормализованный) → urgency последней записи, для статистики
 
     for item in new_items:
-        # Дедупликация по SURVEILLANCE-CONFIG
-        tracked_theme = is_already_tracked(item, tracked)
-        if tracked_theme:
-            write_record({
-                "url": item["url"],
-                "feed": item.get("_feed", "?"),
-                "ts_item": item.get("ts", ""),
-                "ts_triage": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
-                "urgency": "cold",
-                "type": "знание",
-                "confidence": "high",
-                "reason": f"already tracked: {tracked_theme}",
-                "already_tracked": True,
-            })
+        record = triage_item(item, tracked)
+        write_record(record)
+        written[url_key(item["url"])] = record["urgency"]
+        if record.get("already_tracked"):
             skipped_tracked += 1
             continue
-
-        result = keyword_triage(item)
-
-        record = {
-            "url": item["url"],
-            "feed": item.get("_feed", "?"),
-            "ts_item": item.get("ts", ""),
-            "ts_triage": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
-            "urgency": result["urgency"],
-            "type": result["type"],
-            "confidence": result["confidence"],
-            "reason": result["reason"],
-        }
-        write_record(record)
-        by_urgency[result["urgency"]] = by_urgency.get(result["urgency"], 0) + 1
+        by_urgency[record["urgency"]] = by_urgency.get(record["urgency"], 0) + 1
         processed += 1
 
+    _WRITER.flush()
     log(f"Обработано: {processed}, tracked-skip: {skipped_tracked}")
     log(f"Распределение: hot={by_urgency.get('hot',0)} warm={by_urgency.get('warm',0)} cold={by_urgency.get('cold',0)}")
 
-    # Статистика кэша
-    all_cache = load_triage_cache()
-    hot = sum(1 for v in all_cache.values() if v.get("urgency") == "hot")
-    warm = sum(1 for v in all_cache.values() if v.get("urgency") == "warm")
-    cold = sum(1 for v in all_cache.values() if v.get("urgency") == "cold")
-    log(f"Кэш итого: {len(all_cache)} записей | hot={hot} warm={warm} cold={cold}")
+    # Статистика кэша — инкрементально, по записанному за этот запуск
+    stats = cache_stats(stats, written, _WRITER.written)
+    save_checkpoint({**checkpoint, "feeds": marks, "stats": stats})
+    u = stats["urgency"]
+    log(f"Кэш итого: {stats['total']} записей | hot={u.get('hot', 0)} warm={u.get('warm', 0)} cold={u.get('cold', 0)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+kwmatch.py — поиск наборов ключевых слов за один проход по тексту.
+
+idea-triage (keyword_triage) проверял каждое слово из _KW_CLAUDE, _KW_INFRA,
+_KW_BUSINESS, _KW_NOISE, _KW_HOT и _GENERIC_PHRASES отдельным `kw in text`
+— около сотни проходов по тексту на запись. daily-inject так же проверял
+_HOLLOW_PHRASES. KeywordMatcher собирается один раз при импорте:
+
+  from kwmatch import KeywordMatcher
+  m = KeywordMatcher({"клод": _KW_CLAUDE, "шум": _KW_NOISE})
+  m.counts(text)      # {"клод": 2, "шум": 0} — сколько разных слов класса в тексте
+  m.any(text)         # есть ли хоть одно слово
+
+Семантика та же, что у sum(1 for kw in kws if kw in text): подстроки,
+без учёта границ слов, каждое слово считается один раз; слово может
+входить в несколько классов.
+
+Автомат — слова, собранные в префиксное дерево и скомпилированные
+в одну регулярку (движок re работает в C; пошаговый Aho-Corasick на
+чистом Python медленнее сотни `in`). В автомат идут только слова,
+начинающиеся с ASCII-символа. Тексты фидов русские: первые буквы
+кириллических слов («о», «с», «п», «т»…) стоят почти в каждой позиции,
+регулярка заходит в дерево на каждом символе и проигрывает `in`, а
+латинские начала встречаются редко, и автомат проскакивает текст
+быстро. Поэтому кириллические слова проверяются `in` (_scan), латиница —
+автоматом: на живых фидах с наборами idea-triage это ×1.8 против `in` по
+всем словам (perf-bench.py triage, «живые фиды»). Один findall идёт слева
+направо без перекрытий, в каждой позиции берёт самое длинное слово. Перекрытые
+совпадения восстанавливаются по заранее посчитанным таблицам:
+- слова, целиком лежащие внутри найденного, — замыкание _inner;
+- слово, которое начинается внутри найденного и выходит за его конец,
+  возможно, только если его префикс совпадает с суффиксом найденного
+  (_cross) — только такие кандидаты проверяются обычным `in`.
+"""
+
+import re
+
+
+def _trie_pattern(words) -> str:
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        alts = [re.escape(ch) + build(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        # Жадный необязательный хвост: в каждой позиции — самое длинное слово
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _crossing(word: str, others) -> frozenset:
+    """Слова, которые могут начаться внутри word и закончиться после него."""
+    return frozenset(o for o in others if o != word and
+                     any(word.endswith(o[:n]) for n in range(1, min(len(word), len(o)))))
+
+
+class KeywordMatcher:
+    """Наборы ключевых слов (класс → слова): латиница — автомат, остальное — `in`."""
+
+    def __init__(self, classes: dict):
+        self.classes = {name: frozenset(w for w in words if w) for name, words in classes.items()}
+        words = set().union(*self.classes.values()) if self.classes else set()
+        self._member = {w: tuple(n for n, ws in self.classes.items() if w in ws) for w in words}
+        auto = {w for w in words if w[0].isascii()}
+        self._scan = tuple(sorted(words - auto))
+        self._inner = {w: tuple(o for o in auto if o in w) for w in auto}
+        self._cross = {w: _crossing(w, auto) for w in auto}
+        pattern = re.compile(_trie_pattern(auto)) if auto else None
+        self._findall = pattern.findall if pattern else None
+        self._search = pattern.search if pattern else None
+
+    def found(self, text: str) -> set:
+        """Разные слова всех классов, встречающиеся в тексте."""
+        found = {w for w in self._scan if w in text}
+        if self._findall is None:
+            return found
+        inner, cross = self._inner, self._cross
+        candidates = set()
+        for word in set(self._findall(text)):
+            found.update(inner[word])
+            candidates |= cross[word]
+        for word in candidates - found:
+            if word in text:
+                found.update(inner[word])
+        return found
+
+    def counts(self, text: str) -> dict:
+        """Класс → число разных слов класса в тексте."""
+        counts = dict.fromkeys(self.classes, 0)
+        for word in self.found(text):
+            for name in self._member[word]:
+                counts[name] += 1
+        return counts
+
+    def any(self, text: str) -> bool:
+        if self._search is not None and self._search(text) is not None:
+            return True
+        return any(w in text for w in self._scan)
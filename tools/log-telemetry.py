@@ -14,7 +14,6 @@ Usage:
 """
 
 import argparse
-import json
 import platform
 import socket
 import subprocess
@@ -23,6 +22,11 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 REPO_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(Path(__file__).parent))
+from feedwriter import AppendWriter, SchemaError, schema_from_doc
+
+# Схема записи — spec/PROTOCOL.md, раздел 6.2 (notes — единственное необязательное поле)
+TELEMETRY_REQUIRED = ("ts", "agent_id", "task_type", "skill_used", "applied", "exchanges", "success")
 TASK_TYPES = ["debugging", "new_feature", "refactoring", "research", "writing", "config", "other"]
 
 HOSTNAME_MAP = {
@@ -84,10 +88,14 @@ def main():
         record["notes"] = args.notes[:256]
 
     telemetry_path = REPO_DIR / "agents" / agent / "telemetry" / "telemetry.jsonl"
-    telemetry_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(telemetry_path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    schema = schema_from_doc(REPO_DIR / "spec" / "PROTOCOL.md", required=TELEMETRY_REQUIRED)
+    try:
+        # Append-only лог (PROTOCOL 6.4): flock + fsync, без оборванных строк
+        with AppendWriter(telemetry_path, schema=schema, batch_size=1, fsync=True) as writer:
+            writer.append(record)
+    except SchemaError as e:
+        print(f"AgentNet: ✗ запись не по схеме telemetry: {e}")
+        sys.exit(1)
 
     status    = "✓" if args.success else "✗"
     skill_str = f" | skill: {skill}" if skill else ""
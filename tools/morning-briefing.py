@@ -18,10 +18,13 @@ Usage:
 
 import json
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 
 REPO = Path(__file__).parent.parent
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import load_recent
+
 SIGNALS_FILE    = REPO / "feeds" / "market-intel" / "signals.jsonl"
 CLAUDE_IDEAS    = REPO / "feeds" / "claude-ideas" / "ideas.jsonl"
 AGENTNET_PROJ   = REPO / "feeds" / "agentnet-project" / "signals.jsonl"
@@ -30,25 +33,6 @@ INTEL_DIR       = REPO / "feeds" / "market-intel"
 SHORT_MODE = "--short" in sys.argv
 
 
-def load_recent(path: Path, days: int = 3, limit: int = 30) -> list[dict]:
-    if not path.exists():
-        return []
-    cutoff = datetime.now() - timedelta(days=days)
-    records = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            r = json.loads(line)
-            ts = datetime.fromisoformat(r.get("ts", "2000-01-01T00:00:00"))
-            if ts >= cutoff:
-                records.append(r)
-        except Exception:
-            continue
-    return records[-limit:]
-
-
 def load_latest_freq() -> dict | None:
     files = sorted(INTEL_DIR.glob("freq-*.json"))
     if not files:
@@ -65,7 +49,7 @@ def fmt_direction(d: str) -> str:
 
 def main():
     now = datetime.now()
-    signals  = load_recent(SIGNALS_FILE, days=3)
+    signals  = load_recent(SIGNALS_FILE, days=3, limit=30)
     ideas    = load_recent(CLAUDE_IDEAS, days=7, limit=10)
     ag_proj  = load_recent(AGENTNET_PROJ, days=7, limit=20)
     freq     = load_latest_freq()
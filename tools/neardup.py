@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+neardup.py — поиск почти-дубликатов: MinHash-сигнатуры + LSH-индекс.
+
+Дедупликация в daily-inject (topic[:30] в Разведке) и в ecc-scanner
+(title[:30]) ловила только точные префиксы. Claude-секция здесь ни при
+чём: её правило «≥2 общих слова паттерна» точнее MinHash-порога на
+коротких паттернах и считается по postings слово → принятые паттерны.
+Здесь текст превращается в сигнатуру из NUM_PERM минимумов хешей по
+его словам (без служебных: «и», «в», «для», of, for…); доля совпавших
+позиций двух сигнатур — оценка Jaccard их множеств слов. LSH режет
+сигнатуру на BANDS полос по ROWS значений: кандидаты — записи, совпавшие
+хотя бы в одной полосе целиком, поиск идёт по словарям полос, а не по
+всем записям. Порог, с которого
+пара с вероятностью ½ становится кандидатом, ≈ (1/BANDS)^(1/ROWS) = 0.5;
+при Jaccard 0.6 кандидат находится в ~89% случаев, при 0.7 — в ~99%.
+NearDup проверяет кандидатов точным Jaccard множеств слов: оценка по 64
+позициям ошибается на ±0.06, и пара с 0.67 проходила бы порог в ~8% случаев.
+
+Шинглы — слова целиком, а не 4-граммы внутри слов: с 4-граммами одно
+длинное общее слово решало всё («сенотерапия долголетие» ~ «генотерапия
+долголетия», «фармацевтический венчур» ~ «фармацевтический ai»).
+Порог THRESHOLD = 0.8 проверен на темах market-intel: все 51 пара с
+Jaccard 1.0 — перестановки и служебные слова («биотех фарма» ~ «фарма
+биотех», «ai в drug discovery» ~ «ai для drug discovery»); пары 0.75 — тема
+и она же с уточнением, и среди них разные («agentic engineering anti
+patterns» ~ «agentic engineering patterns»). Размеченные пары — в
+perf-bench.py neardup, проверяются при каждом прогоне бенчмарка.
+
+  from neardup import NearDup, LshIndex, feed_signatures, signature
+  dedup = NearDup(known=feed_signatures(SIGNALS_FILE, "topic"))
+  dedup.admit(text)               # False — почти-дубликат уже принятого
+
+Сигнатуры записей фида считаются один раз — при первом чтении строки
+(feedlib.cached_fold по каждому файлу фида, включая партиции) — и лежат
+в ~/.cache/agentnet/parsed рядом с остальными разобранными фидами.
+Хеши (SHAKE-128) одинаковы во всех процессах, сигнатуры можно хранить
+и сравнивать между запусками.
+"""
+
+import hashlib
+import json
+import re
+import sys
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import cached_fold, feed_files
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# 0.75 склеивает тему с её уточнением: «open source агенты» ~ «open source llm агенты»
+THRESHOLD = 0.8
+SIG_VERSION = 2     # 1 — 4-граммы внутри слов
+
+STOP_WORDS = frozenset({
+    "и", "в", "во", "на", "для", "с", "со", "по", "из", "к", "от",
+    "a", "an", "the", "and", "of", "for", "in", "on", "to", "with", "vs",
+})
+
+_WORD = re.compile(r'\w+')
+_EMPTY = b"\xff" * (4 * NUM_PERM)
+
+
+def normalize(text: str) -> str:
+    return " ".join(_WORD.findall((text or "").lower()))
+
+
+def shingles(text: str) -> set:
+    """Слова текста без служебных: порядок слов не важен."""
+    return {w for w in _WORD.findall((text or "").lower()) if w not in STOP_WORDS}
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def signature(text: str) -> bytes:
+    """MinHash-сигнатура: NUM_PERM × uint32, по минимуму на каждую хеш-функцию.
+
+    NUM_PERM независимых хешей слова — куски одного SHAKE-128 дайджеста;
+    поэлементный минимум считает map(min, zip(...)) в C.
+    """
+    grams = shingles(text)
+    if not grams:
+        return _EMPTY
+    cols = [array("I", hashlib.shake_128(g.encode("utf-8")).digest(4 * NUM_PERM)) for g in grams]
+    return array("I", map(min, zip(*cols))).tobytes()
+
+
+def similarity(a: bytes, b: bytes) -> float:
+    """Оценка Jaccard по двум сигнатурам."""
+    va, vb = array("I", a), array("I", b)
+    return sum(x == y for x, y in zip(va, vb)) / NUM_PERM
+
+
+def _bands(sig: bytes):
+    step = ROWS * 4
+    return [sig[i:i + step] for i in range(0, NUM_PERM * 4, step)]
+
+
+class LshIndex:
+    """LSH по полосам сигнатур: key → сигнатура, кандидаты — за O(BANDS)."""
+
+    def __init__(self):
+        self.sigs: dict = {}
+        self._buckets: list[dict] = [{} for _ in range(BANDS)]
+
+    def __len__(self):
+        return len(self.sigs)
+
+    def add(self, key, sig: bytes):
+        self.sigs[key] = sig
+        for bucket, band in zip(self._buckets, _bands(sig)):
+            bucket.setdefault(band, []).append(key)
+
+    def candidates(self, sig: bytes) -> set:
+        found = set()
+        for bucket, band in zip(self._buckets, _bands(sig)):
+            found.update(bucket.get(band, ()))
+        return found
+
+    def near(self, sig: bytes, threshold: float = THRESHOLD) -> list:
+        """[(key, сходство)] кандидатов с оценкой Jaccard ≥ threshold, по убыванию."""
+        hits = [(key, similarity(sig, self.sigs[key])) for key in self.candidates(sig)]
+        return sorted((h for h in hits if h[1] >= threshold), key=lambda h: -h[1])
+
+
+class NearDup:
+    """Фильтр потока: пропускает текст, если он не почти-дубликат уже пропущенного.
+
+    known — готовые сигнатуры (feed_signatures): normalize(text) → сигнатура;
+    чего там нет, считается на месте. LSH отбирает кандидатов, решение —
+    по точному Jaccard слов с threshold.
+    """
+
+    def __init__(self, threshold: float = THRESHOLD, known: dict | None = None):
+        self.threshold = threshold
+        self.known = known or {}
+        self.index = LshIndex()
+        self.grams: list[set] = []      # слова принятых, по порядку admit
+
+    def signature(self, text: str) -> bytes:
+        return self.known.get(normalize(text)) or signature(text)
+
+    def _match(self, grams: set, sig: bytes):
+        best, best_sim = None, 0.0
+        for key in self.index.candidates(sig):
+            sim = jaccard(grams, self.grams[key])
+            if sim >= self.threshold and sim > best_sim:
+                best, best_sim = key, sim
+        return best
+
+    def match(self, text: str):
+        """Номер ранее принятого почти-дубликата (по порядку admit) или None."""
+        grams = shingles(text)
+        return self._match(grams, self.signature(text)) if grams else None
+
+    def admit(self, text: str) -> bool:
+        grams = shingles(text)
+        if not grams:
+            return True     # пустой текст не с чем сравнивать
+        sig = self.signature(text)
+        if self._match(grams, sig) is not None:
+            return False
+        self.index.add(len(self.grams), sig)
+        self.grams.append(grams)
+        return True
+
+
+def feed_signatures(path: Path, field: str, cutoff=None) -> dict:
+    """normalize(record[field]) → сигнатура для всех записей фида.
+
+    Каждая строка разбирается и хешируется один раз: состояние свёртки
+    хранится по файлу фида и дополняется только дописанными строками.
+    """
+    def fold(state: dict, lines: list) -> dict:
+        for line in lines:
+            try:
+                text = json.loads(line).get(field)
+            except Exception:
+                continue
+            if isinstance(text, str):
+                key = normalize(text)
+                if key and key not in state:
+                    state[key] = signature(text)
+        return state
+
+    sigs: dict = {}
+    for file in feed_files(path, cutoff):
+        sigs.update(cached_fold(file, fold, dict, f"neardup-{field}", SIG_VERSION))
+    return sigs
@@ -0,0 +1,820 @@
+#!/usr/bin/env python3
+"""
+perf-bench.py — замеры производительности общих библиотек tools/.
+
+Все сценарии работают на синтетических данных во временной директории
+и не трогают ~/agentnet-pilot/feeds и ~/.cache/agentnet. Исключение —
+triage: он ещё читает (только читает) живые фиды из feeds/ репозитория.
+
+Usage:
+  python3 perf-bench.py prefilter [--lines 100000] [--days 3]
+  python3 perf-bench.py records [--count 10000]
+  python3 perf-bench.py writer [--count 50000] [--concurrent 8]
+  python3 perf-bench.py triage [--count 100000]
+  python3 perf-bench.py triage-cache [--count 200000] [--urls 50000]
+  python3 perf-bench.py cluster [--count 3000]
+  python3 perf-bench.py neardup [--count 50000] [--queries 300]
+  python3 perf-bench.py decided [--days 180] [--items 40]
+  python3 perf-bench.py tasks [--count 5000]
+"""
+
+import argparse
+import fcntl
+import gc
+import importlib.util
+import json
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import feedlib
+from feedwriter import AppendWriter
+from kwmatch import KeywordMatcher
+import triagecache
+from themecluster import cluster_groups
+import neardup
+import briefinglib
+import taskindex
+
+_WORDS = ("agent memory context pipeline model reasoning tool claude mcp infra "
+          "deploy market startup pricing open-source benchmark local-first "
+          "observability evaluation retrieval embedding latency").split()
+_DIRECTIONS = ["рост", "новое", "спад", "зрелость"]
+_FILLER = ("данные система исследование показывает новый подход работа команда результат "
+           "компания запуск версия пользователи качество задача решение метод статья "
+           "авторы предлагают сравнение оценка открытый проект").split()
+_THEMES = ["Персональный AI-аватар", "Multi-agent системы и оркестрация",
+           "Persistent memory для агентов", "Самообучающиеся агенты", "Claude Code экосистема",
+           "PKM / Obsidian", "Local-first приложения", "Монетизация AI-продуктов",
+           "Доход от open-source", "AI-учёный", "Safety и alignment", "MCP серверы",
+           "Локальные LLM на GPU", "Ollama и ComfyUI", "Автономные агенты в проде",
+           "RAG и retrieval", "Агентные фреймворки", "Оценка моделей (evals)",
+           "Стартапы в AI-инфраструктуре", "Context engineering", "Prompt caching",
+           "Синтетические данные", "Дистилляция моделей", "Observability для LLM"]
+_SOURCES = ["Simon Willison", "Hugging Face Blog", "LangChain Blog", "Hacker News", "The Batch"]
+
+
+def _phrase(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+def make_signals(path: Path, lines: int, span_days: int = 365, seed: int = 1) -> Path:
+    """Синтетический signals.jsonl по схеме market-intel, ts по возрастанию."""
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=span_days)
+    step = span_days * 86400 / lines
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            ts = start + timedelta(seconds=i * step)
+            rec = {
+                "ts": ts.strftime("%Y-%m-%dT%H:%M:%S"),
+                "agent_id": "@oleg-linux",
+                "source": rng.choice(_SOURCES),
+                "url": f"https://example.com/post/{i}?utm_source=rss",
+                "title_original": _phrase(rng, 8),
+                "topic": _phrase(rng, 3),
+                "direction": rng.choice(_DIRECTIONS),
+                "signal": _phrase(rng, 40),
+                "tags": [rng.choice(_WORDS) for _ in range(6)],
+                "relevant_to_oleg": rng.random() < 0.3,
+                "embedding_hint": _phrase(rng, 25),
+            }
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    return path
+
+
+class _CountingJson:
+    """Подменяет feedlib.json, чтобы посчитать вызовы json.loads."""
+
+    def __init__(self):
+        self.loads_calls = 0
+
+    def loads(self, s):
+        self.loads_calls += 1
+        return json.loads(s)
+
+    def __getattr__(self, name):
+        return getattr(json, name)
+
+
+def _naive_load(path: Path, cutoff: datetime) -> list:
+    """Как работали load_recent/_load до feedlib: json.loads каждой строки."""
+    records = []
+    for line in path.read_text(encoding="utf-8").split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            r = json.loads(line)
+            if datetime.fromisoformat(r.get("ts", "2000-01-01T00:00:00")) >= cutoff:
+                records.append(r)
+        except Exception:
+            continue
+    return records
+
+
+def _measure(fn):
+    counter = _CountingJson()
+    real = feedlib.json
+    feedlib.json = counter
+    try:
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+    finally:
+        feedlib.json = real
+    return elapsed, counter.loads_calls, len(result)
+
+
+def bench_prefilter(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        feedlib.INDEX_DIR = tmp / "index"
+        path = make_signals(tmp / "signals.jsonl", args.lines)
+        size_mb = path.stat().st_size / 1e6
+        cutoff = datetime.now() - timedelta(days=args.days)
+        print(f"signals.jsonl: {args.lines} строк, {size_mb:.1f} MB, окно {args.days} дн.\n")
+
+        t0 = time.perf_counter()
+        naive = _naive_load(path, cutoff)
+        naive_t = time.perf_counter() - t0
+        print(f"{'сценарий':<44} {'время':>8} {'json.loads':>11} {'записей':>8}")
+        print(f"{'старый load_recent (decode всех строк)':<44} {naive_t * 1000:>6.0f}ms "
+              f"{args.lines:>11} {len(naive):>8}")
+
+        rows = []
+        for prefilter in (False, True):
+            feedlib.PREFILTER = prefilter
+            label = "prefilter" if prefilter else "без prefilter"
+            for name, fn in [
+                (f"индекс: холодный, {label}", lambda: _cold(path, cutoff)),
+                (f"индекс: тёплый, {label}", lambda: feedlib.load_since(path, cutoff)),
+                (f"хвост load_tail(limit=∞), {label}", lambda: feedlib.load_tail(path, cutoff, 10 ** 9)),
+            ]:
+                rows.append((name, *_measure(fn)))
+        feedlib.PREFILTER = True
+
+        for name, elapsed, calls, n in rows:
+            print(f"{name:<44} {elapsed * 1000:>6.0f}ms {calls:>11} {n:>8}")
+            assert n == len(naive), f"{name}: {n} != {len(naive)}"
+
+        cold_off, cold_on = rows[0][2], rows[3][2]
+        print(f"\nХолодный индекс: json.loads {cold_off} → {cold_on} "
+              f"(−{(1 - cold_on / cold_off) * 100:.1f}% decode)")
+
+
+def _cold(path: Path, cutoff: datetime) -> list:
+    feedlib._index_path(path).unlink(missing_ok=True)
+    return feedlib.load_since(path, cutoff)
+
+
+def _rss_bytes() -> int:
+    """Текущий RSS процесса (Linux: /proc/self/statm, иначе ru_maxrss)."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+        return pages * resource.getpagesize()
+    except OSError:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _records_worker(path: Path, kind: str):
+    """Выполняется в отдельном процессе: держит записи в памяти и печатает прирост RSS."""
+    record = feedlib.Signal if kind == "slots" else None
+    feedlib.INDEX_DIR = path.parent / "index"
+    gc.collect()
+    before = _rss_bytes()
+    held = feedlib.load_since(path, datetime(2000, 1, 1), record=record)
+    gc.collect()
+    print(json.dumps({"rss": _rss_bytes() - before, "count": len(held)}))
+
+
+def bench_records(args):
+    if args.worker:
+        return _records_worker(Path(args.worker[1]), args.worker[0])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_signals(Path(tmp) / "signals.jsonl", args.count)
+        # Индекс строится заранее, чтобы его память не попала в замер
+        feedlib.INDEX_DIR = Path(tmp) / "index"
+        feedlib.feed_index(path)
+        results = {}
+        for kind in ("dict", "slots"):
+            out = subprocess.run(
+                [sys.executable, __file__, "records", "--worker", kind, str(path)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            results[kind] = json.loads(out)
+
+    d, s = results["dict"]["rss"], results["slots"]["rss"]
+    n = results["dict"]["count"]
+    print(f"{n} сигналов в памяти (RSS прирост):")
+    print(f"  dict              {d / 1e6:>7.1f} MB  ({d / n:>5.0f} B/запись)")
+    print(f"  Signal (__slots__) {s / 1e6:>6.1f} MB  ({s / n:>5.0f} B/запись)")
+    print(f"  разница           {(d - s) / 1e6:>7.1f} MB  (−{(1 - s / d) * 100:.0f}%)")
+
+
+def _write_per_record(path: Path, records: list, fsync: bool):
+    # Как было в idea-triage write_record: open + flock + write на каждую запись
+    for rec in records:
+        with open(path, "a", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_batched(path: Path, records: list, fsync: bool, batch: int | None, atomic: bool = False):
+    with AppendWriter(path, batch_size=batch, fsync=fsync, atomic=atomic) as w:
+        for rec in records:
+            w.append(rec)
+
+
+def _writer_worker(path: Path, writer_no: int, count: int, batch: int):
+    with AppendWriter(path, batch_size=batch) as w:
+        for seq in range(count):
+            w.append({"ts": datetime.now().isoformat(timespec="seconds"),
+                      "writer": writer_no, "seq": seq, "pad": "x" * (writer_no * 37 % 300)})
+
+
+def _check_concurrent(tmp: Path, writers: int, count: int, batch: int) -> bool:
+    path = tmp / "concurrent.jsonl"
+    procs = [subprocess.Popen([sys.executable, __file__, "writer", "--worker",
+                               str(path), str(n), str(count), str(batch)])
+             for n in range(writers)]
+    for proc in procs:
+        proc.wait()
+    last = {n: -1 for n in range(writers)}
+    bad = lines = 0
+    for line in path.read_bytes().split(b"\n")[:-1]:
+        lines += 1
+        try:
+            rec = json.loads(line)
+            if rec["seq"] != last[rec["writer"]] + 1:
+                bad += 1
+            last[rec["writer"]] = rec["seq"]
+        except Exception:
+            bad += 1
+    ok = bad == 0 and lines == writers * count and all(v == count - 1 for v in last.values())
+    print(f"{writers} процессов × {count} записей (пачка {batch}): "
+          f"{lines} строк, битых/вне порядка {bad} — {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def bench_writer(args):
+    if args.worker:
+        path, n, count, batch = args.worker
+        return _writer_worker(Path(path), int(n), int(count), int(batch))
+    rng = random.Random(1)
+    records = [{"url": f"https://example.com/{i}", "urgency": rng.choice(["hot", "warm", "cold"]),
+                "category": "infra", "summary": _phrase(rng, 12),
+                "ts_triage": datetime.now().isoformat(timespec="seconds")}
+               for i in range(args.count)]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for fsync in (False, True):
+            # С fsync на каждую запись — меньшая выборка, иначе замер идёт минуты
+            recs = records if not fsync else records[:max(1, args.count // 20)]
+            n = len(recs)
+            print(f"{n} записей, fsync={'да' if fsync else 'нет'}:")
+            runs = [("open+flock на запись", lambda p: _write_per_record(p, recs, fsync))]
+            for batch in (1, 64, 256, 1024):
+                runs.append((f"AppendWriter batch={batch}",
+                             lambda p, b=batch: _write_batched(p, recs, fsync, b)))
+            # Как пишет idea-triage: весь запуск одной atomic-пачкой
+            runs.append(("одна atomic-пачка", lambda p: _write_batched(p, recs, fsync, None, True)))
+            base = None
+            for i, (name, fn) in enumerate(runs):
+                path = tmp / f"w{int(fsync)}-{i}.jsonl"
+                t0 = time.perf_counter()
+                fn(path)
+                dt = time.perf_counter() - t0
+                base = base or dt
+                print(f"  {name:<24} {dt * 1000:>8.0f} ms  {n / dt:>9.0f} зап/с  ×{base / dt:.1f}")
+        if args.concurrent and not _check_concurrent(tmp, args.concurrent, args.per_writer, 50):
+            sys.exit(1)
+
+
+def _load_tool(name: str):
+    """Модуль tools/<name>.py (имена с дефисом не импортируются обычным import)."""
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"),
+                                                  Path(__file__).parent / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bench_triage(args):
+    triage = _load_tool("idea-triage")
+    classes = {"клод": triage._KW_CLAUDE, "инфра": triage._KW_INFRA,
+               "бизнес": triage._KW_BUSINESS, "шум": triage._KW_NOISE, "hot": triage._KW_HOT}
+
+    def naive(text, classes):
+        # Как было: sum(kw in text) по каждому набору
+        return {name: sum(1 for kw in kws if kw in text) for name, kws in classes.items()}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_signals(Path(tmp) / "signals.jsonl", args.count)
+        items = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    # Синтетика make_signals почти целиком из ключевых слов (~28 совпадений
+    # на запись); в живых фидах их 2–3 на запись, текст русский
+    rng = random.Random(2)
+    for it in items[::2]:
+        it["signal"] = " ".join(rng.choice(_WORDS) if rng.random() < 0.05 else rng.choice(_FILLER)
+                                for _ in range(45))
+        it["topic"] = it["title_original"] = " ".join(rng.choice(_FILLER) for _ in range(5))
+    texts = [triage.build_text(it).lower() for it in items]
+    n = len(texts)
+
+    # Набор в 4 раза больше — как растёт цена с числом ключевых слов
+    big = {name: set(kws) | {f"{w[:rng.randint(3, 6)]}{i}" for i, w in
+                             enumerate(rng.choices(_WORDS, k=3 * len(kws)))}
+           for name, kws in classes.items()}
+    print(f"{n} записей, средняя длина текста {sum(map(len, texts)) / n:.0f} символов")
+    for label, cls in (("наборы idea-triage", classes), ("наборы ×4", big)):
+        matcher = KeywordMatcher(cls)
+        words = sum(len(v) for v in cls.values())
+        print(f"  {label} ({words} слов):")
+        for density, sample in (("русский текст", texts[::2]), ("плотный", texts[1::2])):
+            t0 = time.perf_counter()
+            expected = [naive(t, cls) for t in sample]
+            t_naive = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            got = [matcher.counts(t) for t in sample]
+            t_match = time.perf_counter() - t0
+            k = len(sample)
+            print(f"    {density:<14} `kw in text` {t_naive / k * 1e6:>6.1f} µs/запись, "
+                  f"KeywordMatcher {t_match / k * 1e6:>6.1f} µs/запись  ×{t_naive / t_match:.1f}  "
+                  f"{'совпадает' if got == expected else 'РАСХОЖДЕНИЕ'}")
+            if got != expected:
+                sys.exit(1)
+
+    # Живые фиды репозитория — то, что idea-triage реально разбирает
+    feeds = Path(__file__).parent.parent / "feeds"
+    live = []
+    for feed, rel in (("signals", "market-intel/signals.jsonl"), ("ideas", "claude-ideas/ideas.jsonl")):
+        path = feeds / rel
+        if not path.exists():
+            continue
+        for line in path.read_text(encoding="utf-8").splitlines():
+            try:
+                live.append(triage.build_text({**json.loads(line), "_feed": feed}).lower())
+            except (json.JSONDecodeError, TypeError):
+                continue
+    if live:
+        matcher = KeywordMatcher(classes)
+        best_naive = best_match = float("inf")
+        for _ in range(3):
+            t0 = time.perf_counter()
+            expected = [naive(t, classes) for t in live]
+            best_naive = min(best_naive, time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            got = [matcher.counts(t) for t in live]
+            best_match = min(best_match, time.perf_counter() - t0)
+        k = len(live)
+        print(f"  живые фиды ({k} записей, {sum(map(len, live)) / k:.0f} символов), наборы idea-triage:")
+        print(f"    `kw in text` {best_naive / k * 1e6:>6.1f} µs/запись, KeywordMatcher "
+              f"{best_match / k * 1e6:>6.1f} µs/запись  ×{best_naive / best_match:.1f}  "
+              f"{'совпадает' if got == expected else 'РАСХОЖДЕНИЕ'}")
+        if got != expected:
+            sys.exit(1)
+
+    for it in items:
+        it["_feed"] = "signals"
+    t0 = time.perf_counter()
+    for it in items:
+        triage.keyword_triage(it)
+    dt = time.perf_counter() - t0
+    print(f"  keyword_triage целиком: {dt / n * 1e6:.1f} µs/запись, {dt:.2f} s на {n}")
+
+    # --redecide: лестница правил по сохранённым признакам, без текста
+    t0 = time.perf_counter()
+    features = [triage.triage_features(it) for it in items]
+    t_feat = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    decided = [triage.decide(f, "signals") for f in features]
+    t_decide = time.perf_counter() - t0
+    same = decided == [triage.keyword_triage(it) for it in items]
+    print(f"  из них признаки {t_feat / n * 1e6:.1f} µs/запись, decide по признакам "
+          f"{t_decide / n * 1e6:.2f} µs/запись  {'совпадает' if same else 'РАСХОЖДЕНИЕ'}")
+    if not same:
+        sys.exit(1)
+
+    # is_already_tracked: темы в духе SURVEILLANCE-CONFIG
+    topics = [{"theme": t, "status": "active", "task": "—"} for t in _THEMES]
+
+    def naive_tracked(item):
+        # Как было: re.findall по каждой теме и `kw in text` по каждому слову
+        text = triage.build_text(item).lower()
+        for t in topics:
+            keywords = [w.lower() for w in re.findall(r'[a-zA-Zа-яА-ЯёЁ]{4,}', t["theme"])]
+            if not keywords:
+                continue
+            matches = sum(1 for kw in keywords if kw in text)
+            if matches >= 2 or (len(keywords) <= 2 and matches >= 1):
+                return t["theme"]
+        return None
+
+    tracked = triage.build_tracked_index(topics)
+    sample = items[:20_000]
+    t0 = time.perf_counter()
+    expected = [naive_tracked(it) for it in sample]
+    t_naive = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = [triage.is_already_tracked(it, tracked) for it in sample]
+    t_index = time.perf_counter() - t0
+    k = len(sample)
+    print(f"  is_already_tracked, {len(topics)} тем: по темам {t_naive / k * 1e6:.1f} µs/запись, "
+          f"индекс {t_index / k * 1e6:.1f} µs/запись  ×{t_naive / t_index:.1f}  "
+          f"{'совпадает' if got == expected else 'РАСХОЖДЕНИЕ'}")
+    if got != expected:
+        sys.exit(1)
+
+
+def bench_triage_cache(args):
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "triage-cache.jsonl"
+        with open(path, "w", encoding="utf-8") as f:
+            for i in range(args.count):
+                f.write(json.dumps({
+                    "url": f"https://example.com/post/{rng.randrange(args.urls)}",
+                    "feed": "signals", "ts_item": "", "ts_triage": f"2026-01-01T00:00:{i % 60:02d}",
+                    "urgency": rng.choice(["hot", "warm", "cold"]), "type": "клод",
+                    "confidence": "high", "reason": _phrase(rng, 4),
+                }, ensure_ascii=False) + "\n")
+        probe = [f"https://example.com/post/{rng.randrange(args.urls * 2)}" for _ in range(1000)]
+
+        t0 = time.perf_counter()
+        full = {}
+        for line in path.read_bytes().split(b"\n"):
+            if line:
+                r = json.loads(line)
+                full[triagecache.url_key(r["url"])] = r
+        expected = [full.get(triagecache.url_key(u)) for u in probe]
+        t_full = time.perf_counter() - t0
+        print(f"{args.count} строк, {len(full)} URL; 1000 get_triage:")
+        print(f"  полный разбор в dict     {t_full * 1000:>8.0f} ms")
+
+        for label, prepare in (("индекс, без компакции", triagecache.build_index),
+                               ("после --compact", triagecache.compact)):
+            t0 = time.perf_counter()
+            prepare(path)
+            t_prep = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            cache = triagecache.TriageCache(path)
+            got = [cache.get(u) for u in probe]
+            t_get = time.perf_counter() - t0
+            cache.close()
+            print(f"  {label:<24} {t_get * 1000:>8.1f} ms  (подготовка {t_prep * 1000:.0f} ms, "
+                  f"файл {path.stat().st_size / 1e6:.1f} MB)  "
+                  f"{'совпадает' if got == expected else 'РАСХОЖДЕНИЕ'}")
+            if got != expected:
+                sys.exit(1)
+
+
+def _naive_clusters(items: list, key_field: str = "topic") -> list:
+    """Как было в daily-inject._cluster_by_theme: все пары, токенизация в цикле."""
+    def words(item):
+        text = f"{item.get(key_field, '')} {item.get('signal', '')} {item.get('insight', '')}"
+        return set(re.findall(r'[a-zA-Zа-яА-ЯёЁ]{3,}', text.lower()))
+
+    def domain(item):
+        m = re.search(r'https?://(?:www\.)?([^/]+)', item.get("url", ""))
+        return m.group(1) if m else ""
+
+    assigned = [False] * len(items)
+    groups = []
+    for i, item in enumerate(items):
+        if assigned[i]:
+            continue
+        assigned[i] = True
+        group = [i]
+        words_i, domain_i = words(item), domain(item)
+        for j in range(i + 1, len(items)):
+            if assigned[j]:
+                continue
+            common = len(words_i & words(items[j]))
+            if (domain_i and domain_i == domain(items[j]) and common >= 1) or common >= 3:
+                assigned[j] = True
+                group.append(j)
+        groups.append(group)
+    return groups
+
+
+def make_recon_items(count: int, seed: int = 4) -> list:
+    """Сигналы в духе 30-дневной разведки: тема, текст из словаря с Zipf-частотами
+    (как в живых фидах: немного частых слов, длинный хвост редких), десяток доменов."""
+    rng = random.Random(seed)
+    letters = "абвгдежзиклмнопрстуфхцчшэюя"
+    vocab = _FILLER + ["".join(rng.choice(letters) for _ in range(rng.randint(4, 9)))
+                       for _ in range(20_000)]
+    weights = [1 / (rank + 300) for rank in range(len(vocab))]
+    domains = ["habr.com", "huggingface.co", "simonwillison.net", "news.ycombinator.com",
+               "blog.langchain.dev", "mltimes.ai", "arxiv.org", "github.com", "vc.ru", "t.me"]
+    items = []
+    for i in range(count):
+        words = rng.choices(vocab, weights, k=25)
+        items.append({"topic": rng.choice(_THEMES).lower(), "signal": " ".join(words),
+                      "url": f"https://{rng.choice(domains)}/p/{i}",
+                      "urgency": rng.choice(["now", "week", "month"])})
+    return items
+
+
+def bench_cluster(args):
+    items = make_recon_items(args.count)
+    t0 = time.perf_counter()
+    expected = _naive_clusters(items)
+    t_naive = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = cluster_groups(items)
+    t_index = time.perf_counter() - t0
+    print(f"{len(items)} сигналов, {len(got)} кластеров:")
+    print(f"  все пары            {t_naive * 1000:>8.0f} ms")
+    print(f"  индекс слов         {t_index * 1000:>8.0f} ms  ×{t_naive / t_index:.1f}  "
+          f"{'совпадает' if got == expected else 'РАСХОЖДЕНИЕ'}")
+    if got != expected:
+        sys.exit(1)
+
+
+# Размеченные пары тем market-intel: (a, b, почти-дубликат). Ложные
+# склейки прежних 4-грамм и пары «тема ~ тема с уточнением» — не дубликаты
+_NEARDUP_LABELED = [
+    ("биотех фарма", "фарма биотех", True),
+    ("ai в drug discovery", "ai для drug discovery", True),
+    ("облачная инфраструктура llm", "облачная инфраструктура для llm", True),
+    ("политика и регуляция ai", "регуляция ai политика", True),
+    ("diffusion models генерация изображений", "генерация изображений diffusion models", True),
+    ("ai в healthcare", "ai in healthcare", True),
+    ("генная терапия rnai", "генная терапия мышц", False),
+    ("сенотерапия долголетие", "генотерапия долголетия", False),
+    ("mcp инструменты для агентов", "ide инструменты агентов", False),
+    ("здравоохранение, франшиза", "政策 + здравоохранение", False),
+    ("фармацевтический венчур", "фармацевтический ai", False),
+    ("agentic engineering anti patterns", "agentic engineering patterns", False),
+    ("open source агенты", "open source llm агенты", False),
+    ("ai assisted development", "ai assisted skill development", False),
+    ("детектирование ai в образовании", "ai в образовании", False),
+]
+
+
+def bench_neardup(args):
+    wrong = []
+    for a, b, dup in _NEARDUP_LABELED:
+        dedup = neardup.NearDup()
+        dedup.admit(a)
+        if dedup.admit(b) == dup:
+            wrong.append(f"{a} ~ {b}: {'пропущен' if dup else 'склеен'}")
+    print(f"размеченные пары: {len(_NEARDUP_LABELED) - len(wrong)}/{len(_NEARDUP_LABELED)} верно")
+    for w in wrong:
+        print(f"  {w}")
+
+    rng = random.Random(5)
+    vocab = [w for t in _THEMES for w in re.findall(r'\w{3,}', t.lower())] + _FILLER + _WORDS
+    history = [" ".join(rng.sample(vocab, rng.randint(2, 5))) for _ in range(args.count)]
+
+    def mutate(text):
+        # Почти-дубликат: слова переставлены, слово заменено или добавлено
+        words = text.split()
+        r = rng.random()
+        if r < 0.4:
+            rng.shuffle(words)
+        elif r < 0.7:
+            words[rng.randrange(len(words))] = rng.choice(vocab)
+        else:
+            words.append(rng.choice(vocab))
+        return " ".join(words)
+
+    queries = [mutate(rng.choice(history)) for _ in range(args.queries)]
+    t0 = time.perf_counter()
+    sigs = [neardup.signature(t) for t in history]
+    t_sig = time.perf_counter() - t0
+    index = neardup.LshIndex()
+    for no, sig in enumerate(sigs):
+        index.add(no, sig)
+    print(f"{args.count} текстов: сигнатуры {t_sig / args.count * 1e6:.0f} µs/текст, "
+          f"порог {neardup.THRESHOLD}")
+
+    grams = [neardup.shingles(t) for t in history]
+    t0 = time.perf_counter()
+    exact = []
+    for q in queries:
+        g = neardup.shingles(q)
+        exact.append({no for no, h in enumerate(grams) if neardup.jaccard(g, h) >= neardup.THRESHOLD})
+    t_scan = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    found = []
+    for q in queries:
+        # Как NearDup: кандидаты LSH, решение — точным Jaccard слов
+        g = neardup.shingles(q)
+        found.append({no for no in index.candidates(neardup.signature(q))
+                      if neardup.jaccard(g, grams[no]) >= neardup.THRESHOLD})
+    t_lsh = time.perf_counter() - t0
+    hits = sum(len(e & f) for e, f in zip(exact, found))
+    total = sum(map(len, exact))
+    extra = sum(len(f - e) for e, f in zip(exact, found))
+    k = len(queries)
+    print(f"  Jaccard по всем      {t_scan / k * 1000:>8.2f} ms/запрос")
+    print(f"  LSH                  {t_lsh / k * 1000:>8.2f} ms/запрос  ×{t_scan / t_lsh:.0f}  "
+          f"найдено {hits}/{total} пар ≥ порога, лишних {extra}")
+    if wrong:
+        sys.exit(1)
+
+
+def make_briefings(bdir: Path, days: int, items: int, seed: int = 6):
+    """Брифинги за days дней до сегодня: items пунктов, у трети — *Решение*:."""
+    rng = random.Random(seed)
+    today = datetime.now().date()
+    bdir.mkdir(parents=True, exist_ok=True)
+    for i in range(1, days + 1):
+        blocks = []
+        for n in range(items):
+            topic = _phrase(rng, 4)
+            url = f"https://example.com/{i}/{n}"
+            block = (f"📡 **{n}. {topic}** *([{rng.choice(_SOURCES)}]({url}))*\n"
+                     f"→ *Что*: {_phrase(rng, 12)}")
+            if rng.random() < 0.33:
+                block += f"\n→ *Решение*: {rng.choice(['сделано', 'отложить', 'нет'])}"
+            blocks.append(block)
+        briefinglib.briefing_path(bdir, today - timedelta(days=i)).write_text(
+            "# Брифинг\n\n" + "\n\n".join(blocks), encoding="utf-8")
+
+
+def _decided_full(bdir: Path, days: int):
+    """Как было в daily-inject._load_decided_items: каждый брифинг окна заново."""
+    urls, topics = set(), set()
+    today = datetime.now().date()
+    for i in range(1, days + 1):
+        path = briefinglib.briefing_path(bdir, today - timedelta(days=i))
+        if path.exists():
+            u, t = briefinglib.parse_decisions(path.read_text(encoding="utf-8"))
+            urls.update(u)
+            topics |= t
+    return urls, topics
+
+
+def bench_decided(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        bdir = tmp / "Брифинги"
+        make_briefings(bdir, args.days, args.items)
+        cache = tmp / "decided.pickle"
+        print(f"{args.days} брифингов по {args.items} пунктов:")
+        for days in (14, args.days):
+            t0 = time.perf_counter()
+            expected = _decided_full(bdir, days)
+            t_full = time.perf_counter() - t0
+            index = briefinglib.DecidedIndex.load(bdir, cache)
+            t0 = time.perf_counter()
+            index.decided(days)
+            index.save()
+            t_cold = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            warm = briefinglib.DecidedIndex.load(bdir, cache)
+            got = warm.decided(days)
+            t_warm = time.perf_counter() - t0
+            ok = got == expected and warm.parsed == 0
+            print(f"  окно {days:>4}д: разбор всех {t_full * 1000:>7.1f} ms | индекс: первый "
+                  f"{t_cold * 1000:>7.1f} ms, повторный {t_warm * 1000:>6.1f} ms  "
+                  f"×{t_full / t_warm:.0f}  {'совпадает' if ok else 'РАСХОЖДЕНИЕ'}")
+            if not ok:
+                sys.exit(1)
+
+
+_AGENTS = ["linux", "mac", "laptop", "all", "", "human", "orchestrator", "market-intel"]
+
+
+def make_tasks_index(path: Path, count: int, seed: int = 7) -> Path:
+    """Индекс задач: count активных (±30 дней от сегодня) и столько же выполненных."""
+    rng = random.Random(seed)
+    today = datetime.now().date()
+    lines = ["# Задачи", "", "## Активные", ""]
+    for n in range(count):
+        day = today + timedelta(days=rng.randint(-30, 30))
+        raw = day.isoformat() if rng.random() > 0.01 else "когда-нибудь"
+        title = f"T-{n % 1000:03d} {_phrase(rng, 4)}" if rng.random() < 0.7 else _phrase(rng, 5)
+        lines.append(f"- {raw} | {rng.choice(_AGENTS)} | "
+                     f"{rng.choice(['', 'none', 'once', 'daily', 'weekly'])} | [[{title}]]")
+    lines += ["", "## Выполненные", ""]
+    lines += [f"- {today.isoformat()} | linux | none | [[T-{n % 1000:03d} сделано]]" for n in range(count)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def _naive_tasks(path: Path) -> list:
+    """Как было в build_tasks_section: split строки, import/регулярка/дата в цикле."""
+    rows = []
+    in_active = False
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.startswith("## Активные"):
+            in_active = True
+            continue
+        if line.startswith("## Выполненные"):
+            break
+        if not in_active or not line.startswith("- "):
+            continue
+        parts = line[2:].split("|")
+        if len(parts) < 4:
+            continue
+        raw_title = parts[3].strip()
+        inner = raw_title[2:-2] if raw_title.startswith("[[") and raw_title.endswith("]]") else raw_title
+        import re as _re
+        t_match = _re.match(r"(T-\d{3})\s+(.*)", inner)
+        title = f"[[{t_match.group(1)}]] {t_match.group(2)}" if t_match else f"[[{inner}]]"
+        try:
+            import datetime as dt
+            deadline = dt.date.fromisoformat(parts[0].strip())
+        except ValueError:
+            continue
+        rows.append((deadline, parts[1].strip(), parts[2].strip(), title,
+                     raw_title.lstrip("[[").rstrip("]]").rstrip()))
+    return rows
+
+
+def bench_tasks(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        feedlib.PARSED_DIR = tmp / "parsed"
+        path = make_tasks_index(tmp / "Claude Code задачи.md", args.count)
+        consumers = 3   # задачи, «Требует действия», patch_stale_tasks
+
+        t0 = time.perf_counter()
+        for _ in range(consumers):
+            expected = _naive_tasks(path)
+        t_naive = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(consumers):
+            taskindex.load_tasks(path)
+        t_cold = time.perf_counter() - t0
+        taskindex._LOADED.clear()   # новый процесс: модель из кэша на диске
+        t0 = time.perf_counter()
+        for _ in range(consumers):
+            tasks = taskindex.load_tasks(path)
+        t_warm = time.perf_counter() - t0
+
+        got = [(t.deadline, t.assignee, t.recurrence, t.link, t.plain)
+               for t in tasks if t.deadline is not None]
+        ok = got == expected
+        print(f"{args.count} задач, {consumers} потребителя за прогон:")
+        print(f"  разбор в каждом         {t_naive * 1000:>8.1f} ms")
+        print(f"  модель, файл изменился  {t_cold * 1000:>8.1f} ms  ×{t_naive / t_cold:.1f}")
+        print(f"  модель, файл тот же     {t_warm * 1000:>8.1f} ms  ×{t_naive / t_warm:.0f}  "
+              f"{'совпадает' if ok else 'РАСХОЖДЕНИЕ'}")
+        if not ok:
+            sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AgentNet: perf-бенчмарки tools/")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    p = sub.add_parser("prefilter", help="raw-ts префильтр против полного decode")
+    p.add_argument("--lines", type=int, default=100_000)
+    p.add_argument("--days", type=int, default=3)
+    p.set_defaults(fn=bench_prefilter)
+    p = sub.add_parser("records", help="память: dict против Signal со __slots__")
+    p.add_argument("--count", type=int, default=10_000)
+    p.add_argument("--worker", nargs=2, metavar=("KIND", "PATH"), help=argparse.SUPPRESS)
+    p.set_defaults(fn=bench_records)
+    p = sub.add_parser("writer", help="append: open+flock на запись против группового коммита")
+    p.add_argument("--count", type=int, default=50_000)
+    p.add_argument("--concurrent", type=int, default=8, metavar="N",
+                   help="проверка N параллельных писателей в один файл (0 — пропустить)")
+    p.add_argument("--per-writer", type=int, default=2000)
+    p.add_argument("--worker", nargs=4, help=argparse.SUPPRESS)
+    p.set_defaults(fn=bench_writer)
+    p = sub.add_parser("triage", help="keyword_triage: `kw in text` против KeywordMatcher")
+    p.add_argument("--count", type=int, default=100_000)
+    p.set_defaults(fn=bench_triage)
+    p = sub.add_parser("triage-cache", help="get_triage: полный разбор против индекса")
+    p.add_argument("--count", type=int, default=200_000)
+    p.add_argument("--urls", type=int, default=50_000)
+    p.set_defaults(fn=bench_triage_cache)
+    p = sub.add_parser("cluster", help="_cluster_by_theme: все пары против индекса слов")
+    p.add_argument("--count", type=int, default=3000)
+    p.set_defaults(fn=bench_cluster)
+    p = sub.add_parser("neardup", help="почти-дубликаты: Jaccard по всем против MinHash/LSH")
+    p.add_argument("--count", type=int, default=50_000)
+    p.add_argument("--queries", type=int, default=300)
+    p.set_defaults(fn=bench_neardup)
+    p = sub.add_parser("decided", help="решения брифингов: разбор окна против индекса")
+    p.add_argument("--days", type=int, default=180)
+    p.add_argument("--items", type=int, default=40)
+    p.set_defaults(fn=bench_decided)
+    p = sub.add_parser("tasks", help="индекс задач: разбор в каждой секции против общей модели")
+    p.add_argument("--count", type=int, default=5000)
+    p.set_defaults(fn=bench_tasks)
+    args = parser.parse_args()
+    args.fn(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+sectionmemo.py — мемоизация секций брифинга по отпечатку входов.
+
+daily-inject запускается каждые 10 минут и каждый раз собирает все секции
+брифинга заново (write_briefing_note вызывается дважды за прогон, патчи
+задач/новостей/алертов строят свои секции ещё раз), хотя большую часть
+дня не меняется ни один вход. SectionMemo хранит готовый markdown каждой
+секции вместе с отпечатком её входов и отдаёт его, пока отпечаток тот же.
+
+Отпечаток секции — blake2b от:
+- (inode, size, mtime_ns) файлов-входов: дописанный фид меняет size,
+  переписанный YAML — inode/mtime; для каталога mtime меняется, когда
+  в нём появляется или пропадает файл. Нет файла — тоже состояние;
+- key — всё остальное, от чего зависит секция: дата (с ней и день
+  недели), отпечаток окна сигналов (records_key) и т.п.;
+- кода: файлы модулей, которые строят секции (code) — правка кода
+  сбрасывает весь кэш.
+
+  memo = SectionMemo(CACHE_DIR / "sections" / "daily-inject.json", code=[Path(__file__)])
+  text = memo.section("tasks", build_tasks_section,
+                      inputs=[TASKS_INDEX], key=[today.isoformat()])
+  memo.save()                  # атомарно, только если что-то пересчитано
+  print(memo.report())         # какие секции пересчитаны, какие из кэша
+
+Значение секции — str или None (JSON). Отпечаток считается до вызова
+build: если вход дописали во время сборки, следующий прогон пересчитает
+секцию ещё раз, а не закэширует её навсегда со старыми данными.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import CACHE_DIR
+
+MEMO_VERSION = 1
+SECTIONS_DIR = CACHE_DIR / "sections"
+
+
+def _stat(path: Path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+def fingerprint(inputs=(), key=(), code=()) -> str:
+    """Отпечаток секции: состояние файлов inputs и code + key (JSON-сериализуемый)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps([
+        MEMO_VERSION,
+        [[str(p), _stat(p)] for p in inputs],
+        [[str(p), _stat(p)] for p in code],
+        list(key),
+    ], ensure_ascii=False, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def records_key(records: list) -> str:
+    """Отпечаток окна фида: url и ts записей по порядку.
+
+    Окно (load_recent_cached) зависит и от фида, и от текущего времени —
+    записи уходят из окна в течение дня; отпечаток самого окна ловит и то,
+    и другое. Записи фида не переписываются, поэтому содержимого хватает
+    url + ts.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for r in records:
+        h.update(f"{r.get('url', '')}\t{r.get('ts', '')}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+class SectionMemo:
+    """Кэш секций: имя → (отпечаток, markdown). Файл — JSON, запись атомарная."""
+
+    def __init__(self, path: Path, code=()):
+        self.path = Path(path)
+        self.code = [Path(p) for p in code]
+        self.entries: dict[str, dict] = {}
+        self.recomputed: list[str] = []
+        self.reused: list[str] = []
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("v") == MEMO_VERSION:
+                self.entries = data["sections"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+
+    def section(self, name: str, build, inputs=(), key=()):
+        """build() или готовое значение, если отпечаток входов не изменился."""
+        stamp = fingerprint(inputs, key, self.code)
+        entry = self.entries.get(name)
+        if isinstance(entry, dict) and entry.get("key") == stamp:
+            if name not in self.reused and name not in self.recomputed:
+                self.reused.append(name)
+            return entry.get("value")
+        value = build()
+        self.entries[name] = {"key": stamp, "value": value}
+        self._dirty = True
+        if name in self.reused:
+            self.reused.remove(name)
+        if name not in self.recomputed:
+            self.recomputed.append(name)
+        return value
+
+    def reset_stats(self):
+        """Новый прогон в том же процессе (daily-inject --daemon): отчёт с нуля."""
+        self.recomputed, self.reused = [], []
+
+    def report(self) -> str:
+        done = ", ".join(self.recomputed) or "—"
+        kept = ", ".join(self.reused) or "—"
+        return f"[sections] пересчитаны: {done} | из кэша: {kept}"
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"v": MEMO_VERSION, "sections": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self._dirty = False
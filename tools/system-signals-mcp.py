@@ -17,15 +17,17 @@ system-signals-mcp — MCP сервер для системных сигнало
       /Users/user/agentnet-pilot/tools/system-signals-mcp.py
 """
 
-import json
 import re
 import subprocess
 import sys
 import yaml
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 from mcp.server.fastmcp import FastMCP
 
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import Signal, load_recent
+
 VAULT          = Path.home() / "obsidian-backup"
 # signals.yaml вне vault — Obsidian переименовывает YAML в AI/Claude Code/ (KE-005)
 SIGNALS_FILE   = Path.home() / "tasks" / "signals.yaml"
@@ -243,22 +245,8 @@ def _load_today_proposals() -> list:
 
 def _load_agentnet_urgent() -> list:
     """Загружает срочные AgentNet сигналы (urgency=now) за неделю."""
-    if not AGENTNET_FILE.exists():
-        return []
-    cutoff = datetime.now() - timedelta(days=7)
-    urgent = []
-    for line in AGENTNET_FILE.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            r = json.loads(line)
-            ts = datetime.fromisoformat(r.get("ts", "2000-01-01"))
-            if ts >= cutoff and r.get("urgency") == "now":
-                urgent.append(r)
-        except Exception:
-            continue
-    return urgent[-3:]
+    records = load_recent(AGENTNET_FILE, days=7, limit=None, record=Signal)
+    return [r for r in records if r.get("urgency") == "now"][-3:]
 
 
 def _run_cmd(cmd: list, timeout: int = 20) -> str:
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+taskindex.py — разобранный индекс задач (Obsidian: 1_Задачи/Claude Code задачи.md).
+
+Секции daily-inject (задачи, «Требует действия») и patch_stale_tasks
+читали индекс каждая по-своему: split строки по '|', а в цикле по
+строкам — import, регулярка T-id и date.fromisoformat. Здесь строка
+разбирается один раз в Task со всеми полями, которые нужны секциям;
+список задач кэшируется на диске (feedlib.cached, по inode/size/mtime) и
+в процессе — пока файл не менялся, повторный запуск и повторный вызов
+в том же прогоне ничего не разбирают.
+
+Формат секции «Активные»: - YYYY-MM-DD | assignee | recurrence | [[title]]
+Секция «Выполненные» и всё после неё не читается.
+
+  from taskindex import load_tasks
+  for t in load_tasks(TASKS_INDEX):
+      t.deadline        # date или None (битая дата)
+      t.link            # [[T-NNN]] Название / [[Название]] — для Obsidian
+"""
+
+import os
+import re
+import sys
+from datetime import date
+from pathlib import Path
+from typing import NamedTuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import cached
+
+MODEL_VERSION = 1
+_TID = re.compile(r"(T-\d{3})\s+(.*)")
+
+
+class Task(NamedTuple):
+    """Строка индекса задач. raw_* — как в файле (без пробелов по краям).
+
+    NamedTuple, а не класс со __slots__: из кэша на диске задача
+    распаковывается одним конструктором кортежа, а не setattr на поле.
+    """
+
+    raw_date: str
+    deadline: date | None     # None — битая дата
+    assignee: str
+    recurrence: str
+    raw_title: str
+    tid: str | None           # T-NNN или None
+    name: str                 # название без T-id и скобок wikilink
+    link: str                 # [[T-NNN]] Название / [[Название]]
+    plain: str                # без скобок wikilink — для «Требует действия»
+
+
+def make_task(raw_date: str, assignee: str, recurrence: str, raw_title: str) -> Task:
+    try:
+        deadline = date.fromisoformat(raw_date)
+    except ValueError:
+        deadline = None
+    # Wikilink кликабелен в Obsidian (R-021): [[T-NNN]] Название — номер
+    # кликабелен, название читаемо
+    if raw_title.startswith("[[") and raw_title.endswith("]]"):
+        inner = raw_title[2:-2]
+    else:
+        inner = raw_title
+    m = _TID.match(inner)
+    tid, name = (m.group(1), m.group(2)) if m else (None, inner)
+    link = f"[[{tid}]] {name}" if m else f"[[{inner}]]"
+    return Task(raw_date, deadline, sys.intern(assignee), sys.intern(recurrence), raw_title,
+                tid, name, link, raw_title.lstrip("[[").rstrip("]]").rstrip())
+
+
+def parse_tasks(path: Path) -> list:
+    """Задачи секции «Активные» по порядку файла."""
+    tasks = []
+    in_active = False
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.startswith("## Активные"):
+            in_active = True
+            continue
+        if line.startswith("## Выполненные"):
+            break  # дальше не читаем
+        if not in_active or not line.startswith("- "):
+            continue
+        parts = line[2:].split("|")
+        if len(parts) >= 4:
+            tasks.append(make_task(parts[0].strip(), parts[1].strip(), parts[2].strip(), parts[3].strip()))
+    return tasks
+
+
+_LOADED: dict = {}   # путь → (stamp, задачи): повторные вызовы в одном процессе
+
+
+def load_tasks(path: Path) -> list:
+    """Задачи индекса; разбор — один раз на версию файла (диск + процесс)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return []
+    stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+    hit = _LOADED.get(path)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    tasks = cached(Path(path), parse_tasks, "tasks-model", MODEL_VERSION)
+    _LOADED[path] = (stamp, tasks)
+    return tasks
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+themecluster.py — кластеризация сигналов по теме через инвертированный индекс.
+
+daily-inject._cluster_by_theme сравнивал каждую пару записей и на каждое
+сравнение заново токенизировал вторую запись регуляркой — O(n²) токенизаций.
+Для окна в 3 дня это незаметно, для 30-дневной разведки на тысячи сигналов —
+секунды. Здесь каждая запись токенизируется один раз, строится индекс
+слово → записи, и для лидера кластера рассматриваются только записи,
+у которых с ним есть общие слова.
+
+Правила те же, что были в _cluster_by_theme:
+- слова записи — [a-zA-Zа-яА-ЯёЁ]{3,} из key_field, signal и insight (lower);
+- запись j попадает в кластер лидера i (j > i, ещё не распределена), если
+  у них ≥3 общих слов или один домен URL и ≥1 общее слово;
+- лидеры берутся по порядку, j сравнивается только с лидером, не со всеми
+  членами кластера.
+Любое совпадение требует общего слова, поэтому кандидатов достаточно искать
+по индексу слов; домен только снижает порог.
+
+  from themecluster import cluster_groups
+  for group in cluster_groups(items, key_field="topic"):
+      ...   # индексы items, первый — лидер, остальные по возрастанию
+
+Состояние между запусками (ClusterState, ~/.cache/agentnet/clusters/): daily-inject
+запускается каждые 10 минут, и кластеризация окна с нуля могла перетасовать
+кластеры между прогонами. ClusterState хранит кластеры с id, центроидом
+(слова основателя и слова, которые есть хотя бы у половины членов, но не
+меньше чем у двух) и членами (URL, ts, слова).
+Новый сигнал сравнивается с центроидами по тем же правилам, что и с лидером
+в cluster_groups, и попадает в лучший подходящий кластер или основывает
+новый; id кластера — хеш URL основателя, он не меняется весь день.
+Члены старше окна выбрасываются, пустые кластеры удаляются.
+
+  state = ClusterState.load(CLUSTERS_FILE)
+  if state.update(signals, cutoff=datetime.now() - timedelta(days=3)):
+      state.save()
+  state.groups(items)        # как cluster_groups, но по сохранённым кластерам
+  state.cluster_of(url)      # id кластера
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from bisect import bisect_right
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import record_ts
+from urlindex import normalize_url
+
+_WORD = re.compile(r'[a-zA-Zа-яА-ЯёЁ]{3,}')
+_DOMAIN = re.compile(r'https?://(?:www\.)?([^/]+)')
+
+MIN_COMMON = 3          # общих слов для кластера без общего домена
+MIN_COMMON_DOMAIN = 1   # общих слов при общем домене
+
+
+def item_words(item, key_field: str = "topic") -> frozenset:
+    text = f"{item.get(key_field, '')} {item.get('signal', '')} {item.get('insight', '')}"
+    return frozenset(_WORD.findall(text.lower()))
+
+
+def item_domain(item) -> str:
+    m = _DOMAIN.search(item.get("url", ""))
+    return m.group(1) if m else ""
+
+
+def cluster_groups(items: list, key_field: str = "topic") -> list[list[int]]:
+    """Кластеры как списки индексов items: [лидер, члены по возрастанию индекса]."""
+    words = [item_words(item, key_field) for item in items]
+    domains = [item_domain(item) for item in items]
+    postings: dict[str, list[int]] = {}
+    for no, ws in enumerate(words):
+        for w in ws:
+            postings.setdefault(w, []).append(no)
+
+    assigned = [False] * len(items)
+    groups = []
+    for i in range(len(items)):
+        if assigned[i]:
+            continue
+        assigned[i] = True
+        common: dict[int, int] = {}
+        for w in words[i]:
+            lst = postings[w]
+            for j in lst[bisect_right(lst, i):]:
+                if not assigned[j]:
+                    common[j] = common.get(j, 0) + 1
+        domain = domains[i]
+        members = sorted(j for j, n in common.items()
+                         if n >= MIN_COMMON or (domain and domains[j] == domain and n >= MIN_COMMON_DOMAIN))
+        for j in members:
+            assigned[j] = True
+        groups.append([i] + members)
+    return groups
+
+
+# ---------- Состояние между запусками ----------
+
+STATE_VERSION = 1
+
+
+def _need(cl: dict) -> int:
+    """Слово в центроиде, если оно есть хотя бы у половины членов (не меньше двух)."""
+    return max(2, (len(cl["members"]) + 1) // 2)
+
+
+def _recount(cl: dict):
+    """Счётчики слов по членам (_counts) и корзины счётчик → слова (_at); в файл не пишутся."""
+    counts: dict[str, int] = {}
+    for m in cl["members"].values():
+        for w in m["words"]:
+            counts[w] = counts.get(w, 0) + 1
+    at: dict[int, set] = {}
+    for w, n in counts.items():
+        at.setdefault(n, set()).add(w)
+    cl["_counts"], cl["_at"] = counts, at
+
+
+class ClusterState:
+    """Кластеры сигналов, сохраняемые между запусками (JSONL, строка на кластер)."""
+
+    def __init__(self, path: Path, key_field: str = "topic"):
+        self.path = Path(path)
+        self.key_field = key_field
+        self.clusters: dict[str, dict] = {}     # id → {id, created, domain, centroid, members}
+        self._of: dict[str, str] = {}           # URL (нормализованный) → id
+        self._postings: dict[str, set] = {}     # слово центроида → id кластеров
+
+    @classmethod
+    def load(cls, path: Path, key_field: str = "topic") -> "ClusterState":
+        state = cls(path, key_field)
+        try:
+            lines = state.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return state
+        for line in lines:
+            try:
+                cl = json.loads(line)
+                if cl.get("v") != STATE_VERSION:
+                    continue
+                cl["centroid"] = set(cl["centroid"])
+                cl["members"] = {m["url"]: m for m in cl["members"]}
+            except (ValueError, KeyError, TypeError):
+                continue
+            _recount(cl)
+            state._index(cl)
+        return state
+
+    def _index(self, cl: dict):
+        self.clusters[cl["id"]] = cl
+        for key in cl["members"]:
+            self._of[key] = cl["id"]
+        for w in cl["centroid"]:
+            self._postings.setdefault(w, set()).add(cl["id"])
+
+    def _set_centroid(self, cl: dict):
+        """Центроид заново по всем членам — после expire (при load он сохранён)."""
+        for w in cl["centroid"]:
+            self._postings[w].discard(cl["id"])
+        _recount(cl)
+        # Якорь — слова основателя (пока он в окне): иначе центроид большого
+        # кластера сжимается до «для»/«это» и по правилу домена тянет всё подряд
+        need = _need(cl)
+        founder = cl["members"].get(cl["founder"])
+        cl["centroid"] = {w for w, n in cl["_counts"].items() if n >= need}
+        if founder is not None:
+            cl["centroid"].update(founder["words"])
+        for w in cl["centroid"]:
+            self._postings.setdefault(w, set()).add(cl["id"])
+
+    def _add_member(self, cl: dict, key: str, member: dict):
+        """Член в кластер: счётчики слов и центроид — только по его словам.
+
+        Пересчёт по всем членам на каждое присоединение делал n присоединений
+        к одному кластеру O(n²). Порог need растёт не больше чем на 1 за
+        члена, поэтому из центроида могут выпасть только слова, у которых
+        счётчик ровно равен прежнему порогу (корзина _at[need]).
+        """
+        old_need = _need(cl)
+        cl["members"][key] = member
+        need = _need(cl)
+        counts, at = cl["_counts"], cl["_at"]
+        for w in member["words"]:
+            n = counts.get(w, 0)
+            if n:
+                at[n].discard(w)
+            counts[w] = n + 1
+            at.setdefault(n + 1, set()).add(w)
+        if need > old_need:
+            founder = cl["members"].get(cl["founder"])
+            anchor = set(founder["words"]) if founder is not None else set()
+            for w in at.get(old_need, ()):
+                if w in cl["centroid"] and w not in anchor:
+                    cl["centroid"].discard(w)
+                    self._postings[w].discard(cl["id"])
+        for w in member["words"]:
+            if counts[w] >= need and w not in cl["centroid"]:
+                cl["centroid"].add(w)
+                self._postings.setdefault(w, set()).add(cl["id"])
+
+    def cluster_of(self, url: str) -> str | None:
+        return self._of.get(normalize_url(url)) if url else None
+
+    def _assign(self, key: str, item, ts: str):
+        words = item_words(item, self.key_field)
+        domain = item_domain(item)
+        common: dict[str, int] = {}
+        for w in words:
+            for cid in self._postings.get(w, ()):
+                common[cid] = common.get(cid, 0) + 1
+        # Лучший подходящий кластер: больше общих слов, при равенстве — старший
+        best = None
+        for cid, n in common.items():
+            cl = self.clusters[cid]
+            if n >= MIN_COMMON or (domain and cl["domain"] == domain and n >= MIN_COMMON_DOMAIN):
+                rank = (-n, cl["created"], cid)
+                if best is None or rank < best[0]:
+                    best = (rank, cl)
+        member = {"url": key, "ts": ts, "words": sorted(words)}
+        if best is not None:
+            cl = best[1]
+            self._add_member(cl, key, member)
+            self._of[key] = cl["id"]
+            return
+        cid = hashlib.blake2b(key.encode("utf-8"), digest_size=4).hexdigest()
+        while cid in self.clusters:
+            cid = hashlib.blake2b(cid.encode(), digest_size=4).hexdigest()
+        cl = {"v": STATE_VERSION, "id": cid, "created": ts, "domain": domain, "founder": key,
+              "centroid": set(words), "members": {key: member}}
+        _recount(cl)
+        self._index(cl)
+
+    def expire(self, cutoff: datetime) -> bool:
+        """Выбрасывает членов старше cutoff; True — что-то изменилось."""
+        key = cutoff.isoformat(timespec="seconds")
+        changed = False
+        for cid, cl in list(self.clusters.items()):
+            old = [u for u, m in cl["members"].items() if m["ts"] < key]
+            if not old:
+                continue
+            changed = True
+            for u in old:
+                del cl["members"][u]
+                self._of.pop(u, None)
+            if cl["members"]:
+                self._set_centroid(cl)
+            else:
+                for w in cl["centroid"]:
+                    self._postings[w].discard(cid)
+                del self.clusters[cid]
+        return changed
+
+    def update(self, items: list, cutoff: datetime | None = None) -> bool:
+        """Распределяет новые (по URL) записи окна; True — состояние изменилось."""
+        changed = self.expire(cutoff) if cutoff else False
+        fresh = {}
+        for item in items:
+            url = item.get("url")
+            key = normalize_url(url) if url else None
+            if key and key not in self._of and key not in fresh:
+                try:
+                    ts = record_ts(item).isoformat(timespec="seconds")
+                except Exception:
+                    continue
+                if cutoff is None or ts >= cutoff.isoformat(timespec="seconds"):
+                    fresh[key] = (ts, item)
+        # В порядке ts — результат не зависит от порядка записей в окне
+        for key, (ts, item) in sorted(fresh.items(), key=lambda kv: (kv[1][0], kv[0])):
+            self._assign(key, item, ts)
+        return changed or bool(fresh)
+
+    def groups(self, items: list) -> list[list[int]]:
+        """Индексы items по сохранённым кластерам, в порядке первого появления.
+
+        Записи без URL или вне состояния — каждая в своей группе.
+        """
+        groups, at = [], {}
+        for no, item in enumerate(items):
+            cid = self.cluster_of(item.get("url", ""))
+            if cid is None:
+                groups.append([no])
+            elif cid in at:
+                groups[at[cid]].append(no)
+            else:
+                at[cid] = len(groups)
+                groups.append([no])
+        return groups
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for cl in sorted(self.clusters.values(), key=lambda c: (c["created"], c["id"])):
+                saved = {k: v for k, v in cl.items() if not k.startswith("_")}
+                f.write(json.dumps({**saved, "centroid": sorted(cl["centroid"]),
+                                    "members": list(cl["members"].values())},
+                                   ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
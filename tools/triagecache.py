@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+triagecache.py — triage-cache.jsonl: компакция и точечный поиск по URL.
+
+idea-triage только дописывает в feeds/triage-cache.jsonl, файл растёт
+без конца, а читатели (daily-inject get_triage, статистика idea-triage)
+разбирали его целиком, чтобы найти запись по одному URL.
+
+Семантика — last writer wins: действует последняя запись по URL
+(нормализованному, см. urlindex.normalize_url). Так повторный триаж
+перекрывает старый результат в любую сторону, в том числе hot → cold.
+
+  --compact   переписывает кэш: одна (последняя) запись на URL в порядке
+              файла, битые строки и записи без url выбрасываются.
+              Под тем же flock, что у feedwriter.AppendWriter; писатель,
+              ждавший lock, после подмены файла переоткрывает его.
+  индекс      ~/.cache/agentnet/triage-index/<кэш>-<hash пути>.idx (не в
+              рабочем дереве git: производное, своё на каждой машине):
+              заголовок (inode/end/sig
+              проиндексированного префикса) и отсортированная таблица
+              (hash64 URL, offset последней записи). Поиск — бинарный
+              по mmap, в память целиком не читается.
+  пачки       idea-triage пишет запуск одной atomic-пачкой (feedwriter):
+              читатели не видят её частично, compact откатывает пачку
+              упавшего писателя.
+  хвост       строки, дописанные после индексации, разбираются при
+              открытии в небольшой dict и перекрывают индекс. Хвост длиннее
+              TAIL_REINDEX строк или переписанный файл — индекс
+              перестраивается (сам кэш при этом не переписывается).
+
+Usage:
+  python3 triagecache.py --compact
+  python3 triagecache.py --stat
+  python3 triagecache.py --lookup URL
+
+  from triagecache import TriageCache
+  cache = TriageCache(path, record=TriageEntry)
+  cache.get(url)                         # запись или None
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import CACHE_DIR, complete_end, region_sig
+from feedwriter import committed_end, rollback_pending
+from urlindex import normalize_url
+
+REPO = Path(__file__).parent.parent
+TRIAGE_CACHE = REPO / "feeds" / "triage-cache.jsonl"
+
+INDEX_DIR = CACHE_DIR / "triage-index"
+INDEX_MAGIC = b"AGTRIX1\n"
+_ENTRY = struct.Struct("<QQ")     # hash64 нормализованного URL, offset строки
+_HEADER_LEN = struct.Struct("<I")
+TAIL_REINDEX = 2000
+
+
+def url_key(url: str) -> str:
+    return normalize_url(url)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def index_path(path: Path) -> Path:
+    key = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:16]
+    return INDEX_DIR / f"{path.name}-{key}.idx"
+
+
+def _scan(data: bytes, base: int = 0):
+    """(offset, key, record) по строкам; битые строки и записи без url пропускаются."""
+    offset = base
+    for line in data.split(b"\n"):
+        start, offset = offset, offset + len(line) + 1
+        if not line.strip():
+            continue
+        try:
+            r = json.loads(line)
+            yield start, url_key(r["url"]), r
+        except Exception:
+            continue
+
+
+def _write_index(path: Path, inode: int, end: int, sig: str, latest: dict):
+    """latest: key → offset. Атомарная запись (tmp + rename)."""
+    entries = sorted((_hash(k), off) for k, off in latest.items())
+    header = json.dumps({"inode": inode, "end": end, "sig": sig, "count": len(entries)}).encode()
+    target = index_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(f".tmp{os.getpid()}")
+    with open(tmp, "wb") as f:
+        f.write(INDEX_MAGIC + _HEADER_LEN.pack(len(header)) + header)
+        f.write(b"".join(_ENTRY.pack(h, off) for h, off in entries))
+    os.replace(tmp, target)
+
+
+def build_index(path: Path):
+    """Индекс по текущему файлу, без переписывания кэша."""
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        end = committed_end(f, path)
+        f.seek(0)
+        data = f.read(end)
+        sig = region_sig(f, end)
+    latest = {key: off for off, key, _ in _scan(data)}
+    _write_index(path, st.st_ino, end, sig, latest)
+
+
+def compact(path: Path, extra: Path | None = None) -> tuple[int, int]:
+    """Одна запись на URL + новый индекс. Возвращает (строк было, записей стало).
+
+    extra — сегмент новых записей (idea-triage --rebuild): его строки идут
+    после строк кэша и по last writer wins заменяют записи тех же URL.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        rollback_pending(fd, path)
+        with os.fdopen(os.dup(fd), "rb") as f:
+            end = complete_end(f, os.fstat(fd).st_size)
+            f.seek(0)
+            data = f.read(end)
+        lines = data.count(b"\n")
+        if extra is not None:
+            with open(extra, "rb") as f:
+                extra_end = complete_end(f, os.fstat(f.fileno()).st_size)
+                f.seek(0)
+                data += f.read(extra_end)
+        latest = {}
+        for off, key, _ in _scan(data):
+            latest.pop(key, None)       # порядок — по позиции последней записи
+            latest[key] = off
+
+        tmp = path.with_suffix(f".compact{os.getpid()}")
+        offsets = {}
+        with open(tmp, "wb") as out:
+            pos = 0
+            for key, off in latest.items():
+                line = data[off:data.index(b"\n", off) + 1]
+                offsets[key] = pos
+                out.write(line)
+                pos += len(line)
+            out.flush()
+            os.fsync(out.fileno())
+            inode = os.fstat(out.fileno()).st_ino
+        with open(tmp, "rb") as f:
+            sig = region_sig(f, pos)
+        os.chmod(tmp, os.fstat(fd).st_mode & 0o777)
+        # Сначала индекс (он ссылается на inode нового файла), потом подмена кэша
+        _write_index(path, inode, pos, sig, offsets)
+        os.replace(tmp, path)
+        return lines, len(latest)
+    finally:
+        os.close(fd)    # закрытие снимает flock
+
+
+class TriageCache:
+    """Точечный поиск triage-записи по URL: индекс (mmap) + разобранный хвост."""
+
+    def __init__(self, path: Path = TRIAGE_CACHE, record=None):
+        self.path = Path(path)
+        self.record = record
+        self._map = None
+        self._data = None
+        self._count = 0
+        self._entries_at = 0
+        self._tail: dict = {}
+        self._open()
+
+    def _load_index(self):
+        """(header, mmap) или None, если индекса нет или он не от этого файла."""
+        try:
+            with open(index_path(self.path), "rb") as f:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            if m[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+                raise ValueError
+            (hlen,) = _HEADER_LEN.unpack_from(m, len(INDEX_MAGIC))
+            at = len(INDEX_MAGIC) + _HEADER_LEN.size
+            header = json.loads(m[at:at + hlen])
+            header["entries_at"] = at + hlen
+            return header, m
+        except Exception:
+            m.close()
+            return None
+
+    def _open(self):
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return
+        st = os.fstat(f.fileno())
+        end = committed_end(f, self.path)    # без пачки, которую сейчас пишут
+        for attempt in (0, 1):
+            loaded = self._load_index()
+            if loaded:
+                header, m = loaded
+                valid = (header["inode"] == st.st_ino and header["end"] <= end
+                         and header["sig"] == region_sig(f, header["end"]))
+                if valid:
+                    f.seek(header["end"])
+                    tail_data = f.read(end - header["end"])
+                    if attempt or tail_data.count(b"\n") <= TAIL_REINDEX:
+                        self._map, self._data = m, f
+                        self._count, self._entries_at = header["count"], header["entries_at"]
+                        for _, key, r in _scan(tail_data, header["end"]):
+                            self._tail[key] = r
+                        return
+                m.close()
+            if attempt:
+                break
+            try:
+                build_index(self.path)
+            except OSError:
+                break
+        # Индекс не записать (read-only и т.п.) или файл подменили — весь файл в хвост
+        f.seek(0)
+        for _, key, r in _scan(f.read(end)):
+            self._tail[key] = r
+        f.close()
+
+    def _offsets(self, h: int):
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _ENTRY.unpack_from(self._map, self._entries_at + mid * _ENTRY.size)[0] < h:
+                lo = mid + 1
+            else:
+                hi = mid
+        while lo < self._count:
+            eh, off = _ENTRY.unpack_from(self._map, self._entries_at + lo * _ENTRY.size)
+            if eh != h:
+                return
+            yield off
+            lo += 1
+
+    def _read(self, offset: int) -> dict | None:
+        self._data.seek(offset)
+        try:
+            return json.loads(self._data.readline())
+        except Exception:
+            return None
+
+    def _make(self, r):
+        return self.record.from_dict(r) if (self.record and r is not None) else r
+
+    def get(self, url: str):
+        if not url:
+            return None
+        key = url_key(url)
+        if key in self._tail:
+            return self._make(self._tail[key])
+        if self._map is None:
+            return None
+        for off in self._offsets(_hash(key)):
+            r = self._read(off)
+            # hash64 может совпасть у разных URL — сверяем сам URL
+            if r is not None and url_key(r.get("url", "")) == key:
+                return self._make(r)
+        return None
+
+    def latest(self):
+        """Все действующие записи (последняя на URL), без порядка."""
+        yield from (self._make(r) for r in self._tail.values())
+        if self._map is None:
+            return
+        for i in range(self._count):
+            _, off = _ENTRY.unpack_from(self._map, self._entries_at + i * _ENTRY.size)
+            r = self._read(off)
+            if r is not None and url_key(r.get("url", "")) not in self._tail:
+                yield self._make(r)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._data.close()
+            self._map = self._data = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AgentNet: компакция и индекс triage-cache")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--compact", action="store_true", help="одна запись на URL + индекс")
+    mode.add_argument("--stat", action="store_true", help="размер кэша и индекса")
+    mode.add_argument("--lookup", metavar="URL", help="действующая запись по URL")
+    parser.add_argument("--cache", type=Path, default=TRIAGE_CACHE)
+    args = parser.parse_args()
+
+    if not args.cache.exists():
+        print(f"Нет кэша: {args.cache}")
+        return
+    if args.compact:
+        before, after = compact(args.cache)
+        print(f"✅ {args.cache.name}: {before} строк → {after} записей")
+        return
+    cache = TriageCache(args.cache)
+    if args.lookup:
+        r = cache.get(args.lookup)
+        print(json.dumps(r, ensure_ascii=False, indent=2) if r else "нет записи")
+    else:
+        total = sum(1 for _ in cache.latest())
+        print(f"{total} URL: в индексе {cache._count}, в хвосте {len(cache._tail)}")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
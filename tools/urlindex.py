@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+urlindex.py — общий реестр URL по всем фидам AgentNet.
+
+Одна и та же статья встречается в market-intel/signals.jsonl,
+claude-ideas/ideas.jsonl, triage-cache.jsonl и в прошлых брифингах.
+Раньше каждый инструмент строил свой dict/set и заново нормализовал URL.
+Реестр делает это один раз:
+
+  нормализованный URL → компактный int id (ids стабильны, только растут)
+  id → где встречается: [(source, byte offset), ...]
+
+Нормализация — как в daily-inject: без utm_* параметров (normalize_url,
+результат кэшируется в процессе). Сам реестр лежит в
+~/.cache/agentnet/url-index-<repo>.pickle и обновляется инкрементально:
+для каждого файла фида хранится end/sig (как в ts-индексе feedlib), так что
+после append разбираются только новые строки. Переписанный файл
+(feed-partition.py --migrate) переиндексируется, id при этом не меняются.
+
+URL достаётся из сырой строки регуляркой — json.loads нужен только для
+строк с escape-последовательностями в url.
+
+Usage:
+  from urlindex import url_index, normalize_url
+  idx = url_index()                      # обновлённый реестр (singleton)
+  idx.id_of(url)                         # id или None
+  idx.seen_in(url, "triage")             # URL уже есть в triage-cache?
+  idx.occurrences(url)                   # [("claude-ideas", path, offset), ...]
+
+  python3 urlindex.py --stat             # размер реестра по фидам
+  python3 urlindex.py --lookup URL
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+
+sys.path.insert(0, str(Path(__file__).parent))
+from feedlib import CACHE_DIR, complete_end, feed_files, region_sig
+
+REPO = Path(__file__).parent.parent
+FEEDS = {
+    "market-intel":     REPO / "feeds" / "market-intel"     / "signals.jsonl",
+    "claude-ideas":     REPO / "feeds" / "claude-ideas"     / "ideas.jsonl",
+    "agentnet-project": REPO / "feeds" / "agentnet-project" / "signals.jsonl",
+    "personalos":       REPO / "feeds" / "personalos"       / "signals.jsonl",
+    "startup":          REPO / "feeds" / "startup"          / "signals.jsonl",
+    "triage":           REPO / "feeds" / "triage-cache.jsonl",
+}
+INDEX_VERSION = 1
+_URL_VALUE = re.compile(rb'"url"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+@lru_cache(maxsize=65536)
+def normalize_url(url: str) -> str:
+    """Убирает utm_* параметры из URL для дедупликации."""
+    parsed = urlparse(url)
+    params = {k: v for k, v in parse_qs(parsed.query).items() if not k.startswith("utm_")}
+    clean_query = urlencode(params, doseq=True)
+    return urlunparse(parsed._replace(query=clean_query))
+
+
+def _raw_url(line: bytes) -> str | None:
+    m = _URL_VALUE.search(line)
+    if not m:
+        return None
+    raw = m.group(1)
+    try:
+        if b"\\" in raw:
+            return json.loads(b'"' + raw + b'"')
+        return raw.decode("utf-8")
+    except Exception:
+        return None
+
+
+class UrlIndex:
+    """Реестр: ids (url → id), urls (id → url), occ (id → [(source_no, offset)]).
+
+    sources — проиндексированные файлы: {path: {"no", "feed", "inode", "end", "sig"}}.
+    epoch меняется только при создании реестра с нуля: кэши, хранящие id
+    на диске, должны включать его в свой ключ.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.epoch = uuid.uuid4().hex[:12]
+        self.ids: dict[str, int] = {}
+        self.urls: list[str] = []
+        self.occ: dict[int, list] = {}
+        self.sources: dict[str, dict] = {}
+        self.dirty = False
+
+    # ---------- id ----------
+
+    def id_of(self, url: str) -> int | None:
+        if not url:
+            return None
+        return self.ids.get(normalize_url(url))
+
+    def intern(self, url: str) -> int | None:
+        """id URL, при необходимости регистрирует новый."""
+        if not url:
+            return None
+        key = normalize_url(url)
+        uid = self.ids.get(key)
+        if uid is None:
+            uid = self.ids[key] = len(self.urls)
+            self.urls.append(key)
+            self.dirty = True
+        return uid
+
+    def url(self, uid: int) -> str:
+        return self.urls[uid]
+
+    # ---------- occurrences ----------
+
+    def _source_names(self) -> dict:
+        return {s["no"]: (s["feed"], p) for p, s in self.sources.items()}
+
+    def occurrences(self, url: str) -> list:
+        """[(feed, path, offset), ...] в порядке индексации."""
+        uid = self.id_of(url)
+        if uid is None:
+            return []
+        names = self._source_names()
+        return [(*names[no], off) for no, off in self.occ.get(uid, ()) if no in names]
+
+    def seen_in(self, url: str, feed: str) -> bool:
+        uid = self.id_of(url)
+        if uid is None:
+            return False
+        nos = {s["no"] for s in self.sources.values() if s["feed"] == feed}
+        return any(no in nos for no, _ in self.occ.get(uid, ()))
+
+    def read(self, path: str, offset: int) -> dict | None:
+        """Запись фида по offset из occurrences."""
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+        except Exception:
+            return None
+
+    # ---------- обновление ----------
+
+    def refresh(self, feeds: dict = FEEDS):
+        """Дописывает в реестр новые строки всех фидов (и их партиций)."""
+        live = set()
+        for feed, head in feeds.items():
+            for path in feed_files(head):
+                live.add(str(path))
+                self._refresh_file(feed, path)
+        for gone in set(self.sources) - live:
+            self._drop_source(gone)
+
+    def _drop_source(self, key: str):
+        no = self.sources.pop(key)["no"]
+        for uid, occ in self.occ.items():
+            if any(n == no for n, _ in occ):
+                self.occ[uid] = [(n, o) for n, o in occ if n != no]
+        self.dirty = True
+
+    def _refresh_file(self, feed: str, path: Path):
+        key = str(path)
+        try:
+            st = path.stat()
+        except OSError:
+            return
+        src = self.sources.get(key)
+        if src and src["inode"] == st.st_ino and src["size"] == st.st_size \
+                and src["mtime_ns"] == st.st_mtime_ns:
+            return
+
+        with open(path, "rb") as f:
+            end = complete_end(f, st.st_size)
+            appendable = (src is not None and src["inode"] == st.st_ino
+                          and src["end"] <= end and src["sig"] == region_sig(f, src["end"]))
+            if not appendable:
+                if src is not None:
+                    self._drop_source(key)
+                no = max((s["no"] for s in self.sources.values()), default=-1) + 1
+                src = {"no": no, "feed": feed, "end": 0}
+            start = src["end"]
+            f.seek(start)
+            offset = start
+            for line in f.read(end - start).split(b"\n"):
+                url = _raw_url(line) if line.strip() else None
+                if url:
+                    self.occ.setdefault(self.intern(url), []).append((src["no"], offset))
+                offset += len(line) + 1
+            src.update(inode=st.st_ino, size=st.st_size, mtime_ns=st.st_mtime_ns,
+                       end=end, sig=region_sig(f, end))
+        self.sources[key] = src
+        self.dirty = True
+
+    def save(self):
+        """Атомарная запись (tmp + rename); ошибки записи не критичны."""
+        if not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".tmp{os.getpid()}")
+            state = {"version": INDEX_VERSION, "epoch": self.epoch, "ids": self.ids,
+                     "urls": self.urls, "occ": self.occ, "sources": self.sources}
+            with open(tmp, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError:
+            pass
+
+    @classmethod
+    def load(cls, path: Path) -> "UrlIndex":
+        idx = cls(path)
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+            if state.get("version") == INDEX_VERSION:
+                idx.epoch = state["epoch"]
+                idx.ids, idx.urls = state["ids"], state["urls"]
+                idx.occ, idx.sources = state["occ"], state["sources"]
+        except Exception:
+            pass
+        return idx
+
+
+def _index_file() -> Path:
+    key = hashlib.sha1(str(REPO.resolve()).encode()).hexdigest()[:12]
+    return CACHE_DIR / f"url-index-{key}.pickle"
+
+
+_INDEX = None
+_STALE = False
+
+
+def invalidate_url_index():
+    """Долгоживущий процесс (daily-inject --daemon): следующий url_index()
+    догрузит строки, дописанные в фиды с прошлого обновления."""
+    global _STALE
+    _STALE = True
+
+
+def url_index() -> UrlIndex:
+    """Реестр, обновлённый по текущему состоянию фидов (один раз на процесс
+    или после invalidate_url_index)."""
+    global _INDEX, _STALE
+    if _INDEX is None:
+        _INDEX = UrlIndex.load(_index_file())
+        _INDEX.refresh()
+        _INDEX.save()
+        # id, выданные через intern() позже, сохраняются при выходе
+        atexit.register(lambda: _INDEX.save())
+    elif _STALE:
+        _INDEX.refresh()
+        _INDEX.save()
+    _STALE = False
+    return _INDEX
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AgentNet: реестр URL по фидам")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--stat", action="store_true", help="размер реестра по фидам")
+    mode.add_argument("--lookup", metavar="URL", help="где встречается URL")
+    args = parser.parse_args()
+
+    idx = url_index()
+    if args.lookup:
+        uid = idx.id_of(args.lookup)
+        print(f"id: {uid}")
+        for feed, path, off in idx.occurrences(args.lookup):
+            print(f"  {feed:<18} {Path(path).name}:{off}")
+        return
+    print(f"{len(idx.urls)} URL (epoch {idx.epoch})")
+    per_feed = {}
+    names = idx._source_names()
+    for occ in idx.occ.values():
+        for no, _ in occ:
+            if no in names:
+                per_feed[names[no][0]] = per_feed.get(names[no][0], 0) + 1
+    for feed, n in sorted(per_feed.items()):
+        print(f"  {feed:<18} {n} вхождений")
+
+
+if __name__ == "__main__":
+    main()